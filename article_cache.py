@@ -0,0 +1,249 @@
+import os
+import zlib
+import hashlib
+import time
+from sqlite_store import SQLiteStore
+
+try:
+    from news import canonical_url # Stessa normalizzazione dei link del news feed
+except ImportError:
+    canonical_url = None
+
+# --- CACHE SU DISCO DEL TESTO DEGLI ARTICOLI ---
+# Il testo estratto da check_url (model.py) viene salvato compresso (zlib),
+# indirizzato per contenuto: il corpo è identificato dal suo hash e più
+# chiavi (link canonico, impronta news.content_hash) possono puntare allo
+# stesso corpo, per esempio un articolo ripubblicato sotto un altro link.
+# Rianalizzare una notizia (prompt o modello nuovo) non richiede più la rete
+# e usa esattamente lo stesso testo.
+#
+# Scadenza: una chiave vale `ttl` secondi dallo scaricamento. Dimensione: se
+# i corpi compressi superano max_bytes si eliminano i meno usati di recente.
+
+DEFAULT_DB_PATH = os.path.join('cache', 'articles.sqlite3')
+DEFAULT_TTL = 30 * 24 * 3600 # Secondi: il testo di un articolo cambia di rado
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024 # Corpi compressi
+DEFAULT_LEVEL = 6 # Livello zlib
+EVICT_TARGET = 0.9 # Dopo un'eviction si scende al 90% di max_bytes
+PRUNE_EVERY = 500 # Scritture tra due pulizie delle chiavi scadute
+TOUCH_EVERY = 60 # Secondi: precisione dell'ultimo accesso usato per l'eviction
+HASH_PREFIX = 'hash:' # Chiavi per impronta del contenuto (le altre sono link)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bodies (
+    hash        TEXT PRIMARY KEY,
+    body        BLOB NOT NULL,
+    raw_len     INTEGER NOT NULL,
+    stored_len  INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    accessed_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS bodies_accessed ON bodies (accessed_at);
+CREATE TABLE IF NOT EXISTS article_keys (
+    key         TEXT PRIMARY KEY,
+    hash        TEXT NOT NULL,
+    fetched_at  REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS article_keys_hash ON article_keys (hash);
+CREATE INDEX IF NOT EXISTS article_keys_fetched ON article_keys (fetched_at);
+"""
+
+
+def normalize_url(url):
+    """Link canonico (senza tracciamento né frammento), come i link delle notizie."""
+    if canonical_url is not None:
+        return canonical_url(url)
+    return url.strip().split('#', 1)[0]
+
+
+def body_hash(text):
+    """Hash del testo: l'indirizzo del corpo nella cache."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ArticleCache(SQLiteStore):
+    """
+    Cache persistente (SQLite, WAL) del testo degli articoli, compresso e
+    indirizzato per contenuto.
+    """
+    def __init__(self, db_path=DEFAULT_DB_PATH, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES,
+                 level=DEFAULT_LEVEL):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.level = level
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._writes = 0
+        super().__init__(db_path, _SCHEMA)
+
+        with self._connect() as conn:
+            self.stored_bytes = conn.execute("SELECT COALESCE(SUM(stored_len), 0) FROM bodies").fetchone()[0]
+        self.prune()
+
+    @staticmethod
+    def _keys(url, content_hash):
+        keys = [normalize_url(url)] if url else []
+        if content_hash:
+            keys.append(HASH_PREFIX + content_hash)
+        return keys
+
+    def get(self, url, content_hash=None):
+        """Testo dell'articolo (per link o impronta del contenuto), o None se assente o scaduto."""
+        keys = self._keys(url, content_hash)
+        if not keys:
+            return None
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            for position, key in enumerate(keys):
+                row = conn.execute(
+                    "SELECT k.hash, k.fetched_at, b.body, b.accessed_at FROM article_keys k "
+                    "JOIN bodies b ON b.hash = k.hash WHERE k.key = ?", (key,)).fetchone()
+                if row is None:
+                    continue
+                digest, fetched_at, body, accessed_at = row
+                if now - fetched_at > self.ttl:
+                    self.expired += 1
+                    continue
+                if now - accessed_at > TOUCH_EVERY:
+                    # Per l'ordine LRU basta un'approssimazione: niente scrittura a ogni lettura
+                    conn.execute("UPDATE bodies SET accessed_at = ? WHERE hash = ?", (now, digest))
+                if position:
+                    # L'articolo trovato per impronta si ritrova anche con questo link
+                    conn.executemany("INSERT OR IGNORE INTO article_keys (key, hash, fetched_at) VALUES (?, ?, ?)",
+                                     [(other, digest, fetched_at) for other in keys[:position]])
+                self.hits += 1
+                return zlib.decompress(body).decode('utf-8')
+        self.misses += 1
+        return None
+
+    def put(self, url, text, content_hash=None):
+        """Salva il testo scaricato da url. Restituisce l'hash del corpo (None se non c'è niente da salvare)."""
+        keys = self._keys(url, content_hash)
+        if not keys or not text:
+            return None
+        digest = body_hash(text)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            if conn.execute("SELECT 1 FROM bodies WHERE hash = ?", (digest,)).fetchone() is None:
+                raw = text.encode('utf-8')
+                body = zlib.compress(raw, self.level)
+                conn.execute("INSERT INTO bodies (hash, body, raw_len, stored_len, created_at, accessed_at) "
+                             "VALUES (?, ?, ?, ?, ?, ?)", (digest, body, len(raw), len(body), now, now))
+                self.stored_bytes += len(body)
+            else:
+                conn.execute("UPDATE bodies SET accessed_at = ? WHERE hash = ?", (now, digest))
+            conn.executemany("INSERT OR REPLACE INTO article_keys (key, hash, fetched_at) VALUES (?, ?, ?)",
+                             [(key, digest, now) for key in keys])
+            if self.stored_bytes > self.max_bytes:
+                self._evict(conn)
+            self._writes += 1
+            prune = self._writes % PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+        return digest
+
+    def _evict(self, conn):
+        """Elimina i corpi meno usati di recente (e le loro chiavi) fino a EVICT_TARGET * max_bytes."""
+        target = self.max_bytes * EVICT_TARGET
+        while self.stored_bytes > target:
+            rows = conn.execute("SELECT hash, stored_len FROM bodies ORDER BY accessed_at LIMIT 200").fetchall()
+            if not rows:
+                self.stored_bytes = 0
+                break
+            victims = []
+            for digest, stored_len in rows:
+                victims.append((digest,))
+                self.stored_bytes -= stored_len
+                if self.stored_bytes <= target:
+                    break
+            conn.executemany("DELETE FROM article_keys WHERE hash = ?", victims)
+            conn.executemany("DELETE FROM bodies WHERE hash = ?", victims)
+            self.evictions += len(victims)
+
+    def prune(self):
+        """Elimina le chiavi scadute e i corpi non più raggiungibili. Restituisce i corpi eliminati."""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM article_keys WHERE fetched_at < ?", (time.time() - self.ttl,))
+            orphans = conn.execute("SELECT hash, stored_len FROM bodies WHERE hash NOT IN "
+                                   "(SELECT hash FROM article_keys)").fetchall()
+            conn.executemany("DELETE FROM bodies WHERE hash = ?", [(digest,) for digest, _ in orphans])
+            self.stored_bytes -= sum(stored_len for _, stored_len in orphans)
+        return len(orphans)
+
+    def __contains__(self, url):
+        with self._connect() as conn:
+            row = conn.execute("SELECT fetched_at FROM article_keys WHERE key = ?", (normalize_url(url),)).fetchone()
+        return row is not None and time.time() - row[0] <= self.ttl
+
+    def stats(self):
+        """Chiavi, corpi, byte (compressi e originali) e contatori di hit/miss/eviction."""
+        with self._connect() as conn:
+            n_keys = conn.execute("SELECT COUNT(*) FROM article_keys").fetchone()[0]
+            n_bodies, raw_bytes, stored_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_len), 0), COALESCE(SUM(stored_len), 0) FROM bodies").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'keys': n_keys,
+            'bodies': n_bodies,
+            'stored_bytes': stored_bytes,
+            'raw_bytes': raw_bytes,
+            'compression': round(raw_bytes / stored_bytes, 2) if stored_bytes else None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            'expired': self.expired,
+            'evictions': self.evictions,
+        }
+
+
+# --- ESECUZIONE (per testare questo file) ---
+if __name__ == "__main__":
+    import random
+    import tempfile
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'articles_test.sqlite3')
+    cache = ArticleCache(db_path)
+
+    # Testi sintetici di lunghezza simile a quelli di check_url (~2000 caratteri)
+    rng = random.Random(0)
+    words = ["shares", "rose", "after", "the", "company", "reported", "quarterly", "revenue", "above",
+             "analyst", "estimates", "guidance", "demand", "chips", "data", "center", "margin", "fell"]
+    n_articles = 5000
+    articles = [(f"https://finance.yahoo.com/news/article-{i}.html?.tsrc=rss",
+                 " ".join(rng.choice(words) for _ in range(330))[:2000], f"{i:016x}")
+                for i in range(n_articles)]
+
+    start = time.perf_counter()
+    for url, text, digest in articles:
+        cache.put(url, text, content_hash=digest)
+    elapsed = time.perf_counter() - start
+    print(f"{n_articles} articoli salvati in {elapsed:.2f}s ({elapsed / n_articles * 1000:.2f} ms ciascuno)")
+
+    start = time.perf_counter()
+    for url, text, _ in articles:
+        assert cache.get(url) == text
+    elapsed = time.perf_counter() - start
+    print(f"{n_articles} letture in {elapsed:.2f}s ({elapsed / n_articles * 1000:.2f} ms ciascuna)")
+
+    # Link diverso, stesso articolo: si ritrova per impronta e da lì anche per link
+    url, text, digest = articles[0]
+    assert cache.get("https://www.reuters.com/markets/article-0", content_hash=digest) == text
+    assert "https://www.reuters.com/markets/article-0" in cache
+    assert cache.get("https://finance.yahoo.com/news/mai-vista.html") is None
+
+    # Scadenza ed eviction per dimensione
+    expiring = ArticleCache(os.path.join(os.path.dirname(db_path), 'ttl.sqlite3'), ttl=0)
+    expiring.put(url, text)
+    time.sleep(0.01)
+    assert expiring.get(url) is None and expiring.prune() == 1
+    small = ArticleCache(os.path.join(os.path.dirname(db_path), 'small.sqlite3'), max_bytes=200_000)
+    for url, text, _ in articles[:2000]:
+        small.put(url, text)
+    small.get(articles[0][0]) # Evicted da tempo: miss
+    print(f"Cache limitata a 200 KB: {small.stats()}")
+    assert small.stats()['stored_bytes'] <= 200_000
+
+    print(f"Statistiche: {cache.stats()}")
+    print(f"File su disco: {os.path.getsize(db_path) / 1024 / 1024:.1f} MB")
@@ -0,0 +1,407 @@
+import re
+from html.parser import HTMLParser
+
+try:
+    import lxml.html # Parser in C: il più veloce, se installato
+except ImportError:
+    lxml = None
+
+# --- ESTRAZIONE DEL TESTO DEGLI ARTICOLI ---
+# check_url (model.py) ha bisogno solo dei primi MAX_CHARS caratteri del
+# corpo dell'articolo. Invece di costruire l'albero BeautifulSoup dell'intera
+# pagina (centinaia di KB di script e menu) e poi troncare, si cerca il
+# contenitore dell'articolo e ci si ferma appena il budget è raggiunto:
+#   1. lxml: parsing in C dell'intera pagina, poi solo i paragrafi del
+#      contenitore fino al budget. Il parsing non si ferma al contenitore: un
+#      parser a blocchi (HTMLPullParser) sulle pagine di prova risparmiava ~1 ms
+#      ma raddoppiava il picco di memoria, quindi lxml analizza sempre tutto.
+#   2. html.parser (libreria standard): in streaming, a blocchi, interrotto
+#      appena il contenitore è chiuso o il budget è pieno
+#   3. BeautifulSoup: il vecchio metodo, se le euristiche non trovano niente
+
+MAX_CHARS = 2000 # Come il vecchio troncamento di check_url
+MIN_CHARS = 200 # Sotto questa soglia il risultato non è credibile: si passa al metodo successivo
+TRUNCATED_SUFFIX = "... (testo troncato)"
+FEED_CHUNK = 16 * 1024 # Caratteri passati per volta al parser in streaming
+
+# Contenitori dell'articolo, in ordine di affidabilità (Yahoo: caas-body e atoms-wrapper).
+# Per lxml come XPath; per il parser in streaming le stesse regole sono in _container_rank.
+CONTAINER_XPATHS = (
+    '//*[@itemprop="articleBody"]',
+    '//*[@data-testid="article-body"]',
+    '//div[contains(concat(" ", normalize-space(@class), " "), " caas-body ")]',
+    '//div[contains(concat(" ", normalize-space(@class), " "), " atoms-wrapper ")]',
+    '//article',
+    '//main',
+)
+CONTAINER_CLASSES = ('caas-body', 'atoms-wrapper')
+CONTAINER_TAGS = ('article', 'main')
+SKIP_TAGS = ('script', 'style', 'noscript', 'template', 'svg', 'iframe', 'nav', 'header', 'footer',
+             'aside', 'form', 'button', 'figure')
+BLOCK_TAGS = ('p', 'h1', 'h2', 'h3', 'h4', 'li', 'blockquote', 'pre')
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _clean(text):
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def _finish(lines, max_chars):
+    """Unisce i paragrafi e tronca come il vecchio check_url."""
+    text = "\n".join(lines)
+    if len(text) > max_chars:
+        text = text[:max_chars] + TRUNCATED_SUFFIX
+    return text
+
+
+def _container_rank(tag, attrs):
+    """
+    Affidabilità del contenitore (0 = corpo dell'articolo, poi article, main), None se non lo è.
+    Le stesse regole di CONTAINER_XPATHS, per un tag e i suoi attributi (coppie nome, valore).
+    """
+    if attrs:
+        attrs = dict(attrs)
+        if attrs.get('itemprop') == 'articleBody' or attrs.get('data-testid') == 'article-body':
+            return 0
+        classes = (attrs.get('class') or '').split()
+        if any(name in classes for name in CONTAINER_CLASSES):
+            return 0
+    if tag in CONTAINER_TAGS:
+        return 1 + CONTAINER_TAGS.index(tag)
+    return None
+
+
+# --- 1. LXML ---
+
+def _collect_blocks(root, max_chars):
+    """Testo dei paragrafi sotto root (senza duplicare blocchi annidati), fino a max_chars."""
+    lines, collected, total = [], set(), 0
+    for element in root.iter(*BLOCK_TAGS):
+        parent = element.getparent()
+        nested = False
+        while parent is not None and parent is not root:
+            if parent in collected:
+                nested = True
+                break
+            parent = parent.getparent()
+        if nested:
+            continue
+        text = _clean(element.text_content())
+        if not text:
+            continue
+        collected.add(element)
+        lines.append(text)
+        total += len(text) + 1
+        if total > max_chars:
+            break # Budget raggiunto: il resto della pagina non serve
+    return lines
+
+
+def extract_lxml(html, max_chars=MAX_CHARS):
+    """Estrazione con lxml (contenitore dell'articolo, poi tutti i <p>). None se non trova abbastanza testo."""
+    if lxml is None or not html:
+        return None
+    try:
+        doc = lxml.html.fromstring(html)
+    except Exception:
+        return None
+    for xpath in CONTAINER_XPATHS:
+        nodes = doc.xpath(xpath)
+        if not nodes:
+            continue
+        container = nodes[0]
+        for skipped in container.xpath(".//*[" + " or ".join(f"self::{tag}" for tag in SKIP_TAGS) + "]"):
+            skipped.drop_tree()
+        lines = _collect_blocks(container, max_chars)
+        if sum(len(line) for line in lines) >= MIN_CHARS:
+            return _finish(lines, max_chars)
+    # Nessun contenitore riconosciuto: paragrafi di tutta la pagina, fuori da menu e script
+    for skipped in doc.xpath("//*[" + " or ".join(f"self::{tag}" for tag in SKIP_TAGS) + "]"):
+        skipped.drop_tree()
+    lines = []
+    total = 0
+    for paragraph in doc.iter('p'):
+        text = _clean(paragraph.text_content())
+        if text:
+            lines.append(text)
+            total += len(text) + 1
+            if total > max_chars:
+                break
+    return _finish(lines, max_chars) if total >= MIN_CHARS else None
+
+
+# --- 2. HTML.PARSER IN STREAMING ---
+
+class _Done(Exception):
+    pass
+
+
+class _StreamExtractor(HTMLParser):
+    """
+    Raccoglie i paragrafi mentre il documento viene letto. Si ferma
+    (eccezione _Done) quando il contenitore dell'articolo si chiude o quando
+    il suo testo supera il budget: il resto della pagina non viene nemmeno analizzato.
+    """
+    def __init__(self, max_chars):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.skip_depth = 0
+        self.container_tag = None
+        self.container_depth = 0
+        self.block_depth = 0
+        self.block = []
+        self.container_lines = []
+        self.container_chars = 0
+        self.page_lines = [] # Paragrafi fuori dal contenitore (se non se ne trova uno)
+        self.page_chars = 0
+        self.container_rank = len(CONTAINER_TAGS) + 1 # Peggiore di qualsiasi contenitore
+
+    def handle_starttag(self, tag, attrs):
+        if self.skip_depth:
+            if tag in SKIP_TAGS:
+                self.skip_depth += 1
+            return
+        if tag in SKIP_TAGS:
+            self.skip_depth = 1
+            return
+        rank = _container_rank(tag, attrs) if self.container_rank else None
+        if rank is not None and rank < self.container_rank:
+            # Primo contenitore, o uno più preciso dentro un <article>/<main>: si riparte da qui
+            self._flush()
+            self.container_tag = tag
+            self.container_depth = 1
+            self.container_rank = rank
+            self.container_lines = []
+            self.container_chars = 0
+        elif tag == self.container_tag:
+            self.container_depth += 1
+        if tag in BLOCK_TAGS:
+            if self.block_depth == 0:
+                self._flush()
+            self.block_depth += 1
+        elif tag == 'br':
+            self.block.append(" ")
+
+    def handle_endtag(self, tag):
+        if self.skip_depth:
+            if tag in SKIP_TAGS:
+                self.skip_depth -= 1
+            return
+        if tag in BLOCK_TAGS and self.block_depth:
+            self.block_depth -= 1
+            if self.block_depth == 0:
+                self._flush()
+        if tag == self.container_tag:
+            self.container_depth -= 1
+            if self.container_depth == 0:
+                self._flush()
+                self.container_tag = None
+                if self.container_chars >= MIN_CHARS:
+                    raise _Done() # Articolo completo
+                self.container_rank = len(CONTAINER_TAGS) + 1 # Contenitore vuoto: si cerca il prossimo
+
+    def handle_data(self, data):
+        if not self.skip_depth and self.block_depth:
+            self.block.append(data)
+
+    def _flush(self):
+        if not self.block:
+            return
+        text = _clean("".join(self.block))
+        self.block = []
+        if not text:
+            return
+        if self.container_tag is not None:
+            self.container_lines.append(text)
+            self.container_chars += len(text) + 1
+            if self.container_chars > self.max_chars:
+                raise _Done() # Budget raggiunto
+        elif self.page_chars <= self.max_chars:
+            self.page_lines.append(text)
+            self.page_chars += len(text) + 1
+
+    def result(self):
+        if self.container_chars >= MIN_CHARS:
+            return _finish(self.container_lines, self.max_chars)
+        if self.page_chars >= MIN_CHARS:
+            return _finish(self.page_lines, self.max_chars)
+        return None
+
+
+def extract_stream(html, max_chars=MAX_CHARS):
+    """Estrazione in streaming con la libreria standard. None se non trova abbastanza testo."""
+    if not html:
+        return None
+    parser = _StreamExtractor(max_chars)
+    try:
+        for start in range(0, len(html), FEED_CHUNK):
+            parser.feed(html[start:start + FEED_CHUNK])
+        parser.close()
+        parser._flush()
+    except _Done:
+        pass
+    except Exception:
+        return None
+    return parser.result()
+
+
+# --- 3. BEAUTIFULSOUP (il vecchio metodo di check_url) ---
+
+def extract_bs4(html, max_chars=MAX_CHARS):
+    """Tutto il testo visibile della pagina, poi troncato. Lento ma senza euristiche."""
+    from bs4 import BeautifulSoup # Lazy: serve solo come ultima risorsa
+    soup = BeautifulSoup(html, 'html.parser')
+
+    for script_or_style in soup(["script", "style", "nav", "footer", "header"]):
+        script_or_style.decompose()
+
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    text = '\n'.join(chunk for chunk in chunks if chunk)
+
+    text = re.sub(r'\n{3,}', '\n\n', text)
+
+    if len(text) > max_chars:
+        text = text[:max_chars] + TRUNCATED_SUFFIX
+    return text
+
+
+def extract_text(html, max_chars=MAX_CHARS):
+    """
+    Testo principale dell'articolo (al più max_chars caratteri, più il
+    suffisso di troncamento). Usa il metodo più veloce disponibile e ricade
+    su BeautifulSoup se le euristiche non trovano il corpo dell'articolo.
+    """
+    text = extract_lxml(html, max_chars) if lxml is not None else extract_stream(html, max_chars)
+    if text is None:
+        text = extract_bs4(html, max_chars)
+    return text
+
+
+# --- ESECUZIONE (per testare questo file) ---
+if __name__ == "__main__":
+    import os
+    import sys
+    import glob
+    import time
+    import random
+    import tempfile
+    import importlib.util
+    import subprocess
+    try:
+        import resource # Solo Unix
+    except ImportError:
+        resource = None
+
+    def synthetic_page(rng, index):
+        """Pagina simile a un articolo Yahoo: molto script e menu, il corpo a metà pagina."""
+        words = ["shares", "rose", "after", "the", "company", "reported", "quarterly", "revenue", "above",
+                 "analyst", "estimates", "guidance", "demand", "chips", "data", "center", "margin", "fell"]
+        sentence = lambda n: " ".join(rng.choice(words) for _ in range(n)).capitalize() + "."
+        state = '{"context":{"dispatcher":{"stores":{' + ",".join(
+            f'"k{i}":"{"x" * 200}"' for i in range(1200)) + '}}}}'
+        nav = "".join(f'<li><a href="/q/{i}">Link {i}</a></li>' for i in range(400))
+        teasers = "".join(f'<li><h3><a href="/news/{i}">{sentence(12)}</a></h3><p>{sentence(20)}</p></li>'
+                          for i in range(60))
+        body = "".join(f'<p class="yf-1pe5jgt">{sentence(40)} <a href="/quote/NVDA">NVDA</a> {sentence(25)}</p>'
+                       for _ in range(30))
+        return (f'<!DOCTYPE html><html><head><title>Article {index}</title>'
+                f'<style>{"." * 20000}</style><script>window.App={state};</script></head><body>'
+                f'<header><nav><ul>{nav}</ul></nav></header>'
+                f'<main><article><div class="caas-title-wrapper"><h1>{sentence(10)}</h1></div>'
+                f'<div class="caas-body">{body}<figure><img src="x.jpg"><figcaption>Foto</figcaption></figure>'
+                f'</div></article><aside><ul>{teasers}</ul></aside></main>'
+                f'<footer><ul>{nav}</ul></footer><script>{state}</script></body></html>')
+
+    def read_page(path):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read()
+
+    def load_corpus(directory):
+        return [read_page(path) for path in sorted(glob.glob(os.path.join(directory, '*.htm*')))]
+
+    def peak_rss():
+        """Picco di memoria residente del processo in byte."""
+        # Su Linux ru_maxrss sopravvive a fork ed exec (partirebbe dal picco del processo
+        # che lancia la misura): VmHWM invece è solo di questo processo
+        try:
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == 'darwin' else usage * 1024 # KB su Linux, byte su macOS
+
+    methods = {'lxml': extract_lxml, 'html.parser': extract_stream, 'extract_text': extract_text,
+               'BeautifulSoup (vecchio)': extract_bs4}
+
+    # Modalità interna: un metodo in un processo nuovo, così il picco di memoria
+    # (compresa quella allocata in C da lxml) è solo suo
+    if sys.argv[1:2] == ['--measure']:
+        # Una pagina alla volta, come check_url: il corpus intero in memoria alzerebbe il
+        # picco più di qualsiasi parser. Import e lettura delle pagine restano fuori dalla misura.
+        extract = methods[sys.argv[2]]
+        paths = sorted(glob.glob(os.path.join(sys.argv[3], '*.htm*')))
+        extract("<html><body><p>x</p></body></html>")
+        for path in paths:
+            read_page(path)
+        baseline = peak_rss()
+        for path in paths:
+            extract(read_page(path))
+        print(peak_rss() - baseline)
+        sys.exit(0)
+
+    # python article_extract.py [cartella con pagine .html salvate]
+    if len(sys.argv) > 1:
+        corpus_dir = sys.argv[1]
+        corpus = load_corpus(corpus_dir)
+        print(f"Corpus: {len(corpus)} pagine da {corpus_dir}")
+    else:
+        rng = random.Random(0)
+        corpus = [synthetic_page(rng, i) for i in range(30)]
+        # Su disco, perché i processi di misura leggano le stesse pagine
+        corpus_dir = tempfile.mkdtemp()
+        for i, page in enumerate(corpus):
+            with open(os.path.join(corpus_dir, f'page_{i:03d}.html'), 'w', encoding='utf-8') as f:
+                f.write(page)
+        print(f"Corpus sintetico: {len(corpus)} pagine")
+    if not corpus:
+        sys.exit("Nessuna pagina trovata.")
+    print(f"Dimensione media: {sum(len(page) for page in corpus) / len(corpus) / 1024:.0f} KB\n")
+
+    names = ['lxml', 'html.parser', 'extract_text']
+    if importlib.util.find_spec('bs4'):
+        names.insert(0, 'BeautifulSoup (vecchio)')
+    else:
+        print("AVVISO: 'bs4' non installato, niente confronto con il vecchio metodo.")
+    if lxml is None:
+        names.remove('lxml')
+        print("AVVISO: 'lxml' non installato: extract_text usa html.parser.")
+    if resource is None:
+        print("AVVISO: modulo 'resource' non disponibile (Windows): niente misura della memoria.")
+
+    baseline = None
+    print(f"{'Metodo':<24} {'ms/pagina':>10} {'picco MB':>9} {'caratteri':>10} {'vuote':>6}")
+    for name in names:
+        extract = methods[name]
+        start = time.perf_counter()
+        results = [extract(page) for page in corpus]
+        elapsed = (time.perf_counter() - start) / len(corpus) * 1000
+        peak_mb = "n/d"
+        if resource is not None:
+            measure = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', name, corpus_dir],
+                                     capture_output=True, text=True)
+            if measure.returncode == 0:
+                peak_mb = f"{int(measure.stdout.split()[-1]) / 1024 / 1024:.1f}"
+        chars = sum(len(text or '') for text in results) / len(corpus)
+        empty = sum(1 for text in results if not text)
+        baseline = baseline or elapsed
+        print(f"{name:<24} {elapsed:10.2f} {peak_mb:>9} {chars:10.0f} {empty:6}"
+              f"  ({baseline / elapsed:.1f}x)")
+
+    sample = extract_text(corpus[0])
+    print(f"\nEsempio ({len(sample)} caratteri):\n{sample[:300]}...")
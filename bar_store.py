@@ -0,0 +1,345 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from sqlite_store import SQLiteStore
+
+# --- ARCHIVIO LOCALE DELLE BARRE OHLCV (SQLite) ---
+# Le serie sono indicizzate per (symbol, interval). Il DataWorker legge prima
+# da qui e scarica da Yahoo solo le barre successive all'ultima salvata.
+
+DEFAULT_DB_PATH = os.path.join('cache', 'bars.sqlite3')
+DEFAULT_MAX_ROWS = 1_000_000 # Budget totale di righe (circa 60-80 MB su disco)
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Ordine dei periodi Yahoo: una serie scaricata con un periodo più lungo
+# "copre" tutti i periodi più corti.
+PERIOD_ORDER = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'max']
+
+PERIOD_OFFSETS = {
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+# Pausa minima (oltre al passo delle barre) che separa due sedute intraday.
+# Le barre intraday sono in UTC naive: la data di calendario spezzerebbe le
+# sedute dei futures (Globex apre alle 22:00/23:00 UTC), le pause no.
+SESSION_GAP = pd.Timedelta(hours=1)
+
+# Dopo quanti secondi una serie va riallineata con Yahoo (per intervallo)
+REFRESH_SECONDS = {
+    '1m': 30,
+    '2m': 60,
+    '5m': 120,
+    '15m': 300,
+    '30m': 600,
+    '1h': 900,
+    '1d': 900,
+    '1wk': 3600,
+    '1mo': 3600,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol   TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    ts       INTEGER NOT NULL,
+    open     REAL,
+    high     REAL,
+    low      REAL,
+    close    REAL,
+    volume   REAL,
+    PRIMARY KEY (symbol, interval, ts)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS series (
+    symbol      TEXT NOT NULL,
+    interval    TEXT NOT NULL,
+    period      TEXT,
+    tz          TEXT,
+    n_rows      INTEGER NOT NULL DEFAULT 0,
+    fetched_at  REAL NOT NULL DEFAULT 0,
+    last_access REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (symbol, interval)
+);
+"""
+
+
+def period_rank(period):
+    """Restituisce la posizione del periodo in PERIOD_ORDER (-1 se sconosciuto)."""
+    try:
+        return PERIOD_ORDER.index(period)
+    except ValueError:
+        return -1
+
+
+def session_starts(index):
+    """
+    Posizioni della prima barra di ogni seduta.
+    Intraday: una seduta inizia dopo una pausa di almeno passo + SESSION_GAP.
+    Barre giornaliere, o mercati sempre aperti (crypto) senza pause: una seduta per data.
+    """
+    if len(index) < 2:
+        return np.zeros(len(index), dtype=np.int64)
+    steps = index[1:] - index[:-1]
+    step = steps.median()
+    if step < pd.Timedelta(days=1):
+        starts = np.flatnonzero(steps >= step + SESSION_GAP) + 1
+        if len(starts) or index[-1] - index[0] < pd.Timedelta(days=1):
+            return np.concatenate(([0], starts))
+    dates = index.normalize()
+    return np.flatnonzero(np.concatenate(([True], dates[1:] != dates[:-1])))
+
+
+def slice_period(data, period):
+    """
+    Taglia una serie alla lunghezza del periodo Yahoo richiesto.
+    '1d'/'5d' contano le sedute (vedi session_starts), gli altri periodi
+    sono calcolati a ritroso dall'ultima barra disponibile.
+    """
+    if data is None or data.empty or not period:
+        return data
+
+    if period in ('1d', '5d'):
+        sessions = int(period[:-1])
+        starts = session_starts(data.index)
+        if len(starts) <= sessions:
+            return data
+        return data.iloc[starts[-sessions]:]
+
+    offset = PERIOD_OFFSETS.get(period)
+    if offset is None:
+        return data
+    cutoff = data.index[-1] - offset
+    return data[data.index > cutoff]
+
+
+def merge_bars(old, new):
+    """
+    Unisce due serie OHLCV. In caso di timestamp duplicato vince la barra
+    nuova (es. la candela ancora in formazione al momento del fetch precedente).
+    """
+    if old is None or old.empty:
+        return new
+    if new is None or new.empty:
+        return old
+    # Fonti diverse (history vs download) possono restituire timezone diversi
+    if old.index.tz is not None and new.index.tz is not None and str(new.index.tz) != str(old.index.tz):
+        new = new.tz_convert(old.index.tz)
+    merged = pd.concat([old, new])
+    merged = merged[~merged.index.duplicated(keep='last')]
+    if not merged.index.is_monotonic_increasing:
+        merged = merged.sort_index()
+    return merged
+
+
+def has_changes(old, new):
+    """
+    True se `new` aggiunge barre a `old` o ne modifica qualcuna
+    (tipicamente la candela ancora in formazione).
+    """
+    if new is None or new.empty:
+        return False
+    if old is None or old.empty:
+        return True
+    if not new.index.isin(old.index).all():
+        return True
+    columns = [col for col in OHLCV_COLUMNS if col in new.columns and col in old.columns]
+    return not np.array_equal(old.loc[new.index, columns].to_numpy(dtype=np.float64),
+                              new[columns].to_numpy(dtype=np.float64), equal_nan=True)
+
+
+def _index_to_utc_ns(index):
+    """Converte un DatetimeIndex (naive o con tz) in nanosecondi UTC int64."""
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.to_numpy(dtype='datetime64[ns]').view('int64')
+
+
+class BarStore(SQLiteStore):
+    """
+    Archivio persistente delle serie OHLCV su SQLite, con budget di righe
+    ed eviction delle serie usate meno di recente.
+    """
+    def __init__(self, db_path=DEFAULT_DB_PATH, max_rows=DEFAULT_MAX_ROWS):
+        self.max_rows = max_rows
+        super().__init__(db_path, _SCHEMA)
+
+    def get_info(self, symbol, interval):
+        """Restituisce i metadati della serie (period, tz, n_rows, fetched_at) o None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT period, tz, n_rows, fetched_at, last_access FROM series "
+                "WHERE symbol = ? AND interval = ?", (symbol, interval)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            'period': row[0],
+            'tz': row[1],
+            'n_rows': row[2],
+            'fetched_at': row[3],
+            'last_access': row[4],
+        }
+
+    def load(self, symbol, interval):
+        """
+        Carica la serie salvata come DataFrame OHLCV.
+        Restituisce (data, info) oppure (None, None) se la serie non esiste.
+        """
+        info = self.get_info(symbol, interval)
+        if info is None or info['n_rows'] == 0:
+            return None, None
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT ts, open, high, low, close, volume FROM bars "
+                "WHERE symbol = ? AND interval = ? ORDER BY ts", (symbol, interval)
+            ).fetchall()
+            with self._lock:
+                conn.execute(
+                    "UPDATE series SET last_access = ? WHERE symbol = ? AND interval = ?",
+                    (time.time(), symbol, interval)
+                )
+
+        if not rows:
+            return None, None
+
+        ts, *columns = zip(*rows)
+        index = pd.to_datetime(np.array(ts, dtype='int64'), unit='ns', utc=True)
+        if info['tz']:
+            index = index.tz_convert(info['tz'])
+        else:
+            index = index.tz_localize(None)
+
+        values = np.array(columns, dtype='float64').T
+        data = pd.DataFrame(values, index=index, columns=OHLCV_COLUMNS)
+        data.index.name = 'Datetime' if interval.endswith(('m', 'h')) else 'Date'
+        return data, info
+
+    def is_fresh(self, info, interval):
+        """True se la serie è stata riallineata con Yahoo da meno di REFRESH_SECONDS."""
+        if not info:
+            return False
+        max_age = REFRESH_SECONDS.get(interval, 900)
+        return (time.time() - info['fetched_at']) < max_age
+
+    def covers(self, info, period):
+        """True se la serie salvata è lunga almeno quanto il periodo richiesto."""
+        if not info or not info['period']:
+            return False
+        return period_rank(info['period']) >= period_rank(period) >= 0
+
+    def save(self, symbol, interval, data, period, replace=False, keep_from=None):
+        """
+        Scrive (upsert) le barre di `data` nella serie (symbol, interval).
+        replace=True sostituisce l'intera serie (fetch completo);
+        keep_from elimina le barre più vecchie di quel timestamp.
+        """
+        if data is None or data.empty:
+            return
+
+        columns = [data[col].to_numpy(dtype='float64') if col in data.columns
+                   else np.full(len(data), np.nan) for col in OHLCV_COLUMNS]
+        ts = _index_to_utc_ns(data.index)
+        rows = [(symbol, interval) + row
+                for row in zip(ts.tolist(), *(col.tolist() for col in columns))]
+        tz = str(data.index.tz) if data.index.tz is not None else None
+        now = time.time()
+
+        with self._lock, self._connect() as conn:
+            if replace:
+                conn.execute("DELETE FROM bars WHERE symbol = ? AND interval = ?",
+                             (symbol, interval))
+            conn.executemany(
+                "INSERT OR REPLACE INTO bars (symbol, interval, ts, open, high, low, close, volume) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            if keep_from is not None:
+                cutoff = int(_index_to_utc_ns(pd.DatetimeIndex([keep_from]))[0])
+                conn.execute("DELETE FROM bars WHERE symbol = ? AND interval = ? AND ts < ?",
+                             (symbol, interval, cutoff))
+
+            n_rows = conn.execute("SELECT COUNT(*) FROM bars WHERE symbol = ? AND interval = ?",
+                                  (symbol, interval)).fetchone()[0]
+            # Il periodo registrato non si accorcia mai con un fetch incrementale
+            previous = conn.execute("SELECT period FROM series WHERE symbol = ? AND interval = ?",
+                                    (symbol, interval)).fetchone()
+            if previous and not replace and period_rank(previous[0]) > period_rank(period):
+                period = previous[0]
+
+            conn.execute(
+                "INSERT OR REPLACE INTO series (symbol, interval, period, tz, n_rows, fetched_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (symbol, interval, period, tz, n_rows, now, now)
+            )
+            self._evict(conn, keep=(symbol, interval))
+
+    def touch(self, symbol, interval):
+        """Segna la serie come appena riallineata (nessuna barra nuova da Yahoo)."""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE series SET fetched_at = ?, last_access = ? WHERE symbol = ? AND interval = ?",
+                (time.time(), time.time(), symbol, interval)
+            )
+
+    def _evict(self, conn, keep=None):
+        """Elimina le serie usate meno di recente finché il totale rientra nel budget."""
+        total = conn.execute("SELECT COALESCE(SUM(n_rows), 0) FROM series").fetchone()[0]
+        if total <= self.max_rows:
+            return
+
+        candidates = conn.execute(
+            "SELECT symbol, interval, n_rows FROM series ORDER BY last_access ASC"
+        ).fetchall()
+        for symbol, interval, n_rows in candidates:
+            if total <= self.max_rows:
+                break
+            if keep and (symbol, interval) == keep:
+                continue
+            conn.execute("DELETE FROM bars WHERE symbol = ? AND interval = ?", (symbol, interval))
+            conn.execute("DELETE FROM series WHERE symbol = ? AND interval = ?", (symbol, interval))
+            total -= n_rows
+            print(f"[BarStore] Eviction serie {symbol} ({interval}), {n_rows} righe.")
+
+    def stats(self):
+        """Restituisce il numero di serie e di righe salvate."""
+        with self._connect() as conn:
+            n_series, n_rows = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(n_rows), 0) FROM series"
+            ).fetchone()
+        return {'series': n_series, 'rows': n_rows, 'max_rows': self.max_rows}
+
+
+# --- ESECUZIONE (per testare questo file) ---
+if __name__ == "__main__":
+    import tempfile
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'bars_test.sqlite3')
+    store = BarStore(db_path, max_rows=300)
+
+    index = pd.date_range('2024-01-01', periods=200, freq='D', tz='America/New_York')
+    frame = pd.DataFrame(np.random.rand(200, 5) + 100, index=index, columns=OHLCV_COLUMNS)
+    store.save('TEST', '1d', frame, '6mo', replace=True)
+
+    loaded, info = store.load('TEST', '1d')
+    print(f"Caricate {len(loaded)} barre, info: {info}")
+    assert (loaded.index == frame.index).all()
+
+    delta = frame.iloc[-2:].copy()
+    delta['Close'] = 1.0
+    merged = merge_bars(loaded, delta)
+    store.save('TEST', '1d', delta, '1mo')
+    loaded, info = store.load('TEST', '1d')
+    assert loaded['Close'].iloc[-1] == 1.0 and info['period'] == '6mo'
+    print(f"Slice 1mo: {len(slice_period(merged, '1mo'))} barre")
+
+    store.save('OTHER', '1d', frame, '6mo', replace=True)
+    print(f"Statistiche dopo eviction: {store.stats()}")
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+# --- CONTENITORE COMPATTO DELLE BARRE OHLCV ---
+# Colonne NumPy contigue e in sola lettura (timestamp int64 in ns UTC):
+# viaggia dal DataWorker al canvas e agli indicatori senza copie.
+# Un DataFrame viene costruito solo dove serve (mplfinance).
+
+PRICE_DTYPE = np.float64
+COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+FRAME_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+def _readonly(values, dtype):
+    array = np.ascontiguousarray(values, dtype=dtype)
+    if array.flags.writeable:
+        if array.base is not None or not array.flags.owndata:
+            array = array.copy() # Non bloccare in scrittura la memoria del chiamante
+        array.flags.writeable = False
+    return array
+
+
+class Bars:
+    """
+    Serie OHLCV immutabile. Lo slicing (bars[a:b]) restituisce viste
+    sugli stessi array, senza copiare i dati.
+    """
+    __slots__ = ('ts', 'open', 'high', 'low', 'close', 'volume', 'tz')
+
+    def __init__(self, ts, open, high, low, close, volume, tz=None, _trusted=False):
+        if _trusted:
+            # Array già in sola lettura (es. viste da uno slice)
+            self.ts, self.open, self.high, self.low = ts, open, high, low
+            self.close, self.volume = close, volume
+        else:
+            self.ts = _readonly(ts, np.int64)
+            self.open = _readonly(open, PRICE_DTYPE)
+            self.high = _readonly(high, PRICE_DTYPE)
+            self.low = _readonly(low, PRICE_DTYPE)
+            self.close = _readonly(close, PRICE_DTYPE)
+            self.volume = _readonly(volume, PRICE_DTYPE)
+        self.tz = tz # Timezone per la visualizzazione (None = naive UTC)
+
+    @classmethod
+    def from_frame(cls, data):
+        """Crea le barre da un DataFrame OHLCV con DatetimeIndex (naive o con tz)."""
+        index = data.index
+        tz = str(index.tz) if index.tz is not None else None
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        ts = index.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        columns = [data[col].to_numpy(dtype=PRICE_DTYPE) if col in data.columns
+                   else np.full(len(data), np.nan) for col in FRAME_COLUMNS]
+        return cls(ts, *columns, tz=tz)
+
+    @property
+    def index(self):
+        """DatetimeIndex delle barre (nel timezone originale)."""
+        index = pd.to_datetime(self.ts, unit='ns', utc=True)
+        return index.tz_convert(self.tz) if self.tz else index.tz_localize(None)
+
+    def timestamp(self, i):
+        """Timestamp della barra i-esima."""
+        stamp = pd.Timestamp(int(self.ts[i]), unit='ns', tz='UTC')
+        return stamp.tz_convert(self.tz) if self.tz else stamp.tz_localize(None)
+
+    def to_frame(self):
+        """DataFrame OHLCV (per mplfinance). Le barre restano immutabili."""
+        return pd.DataFrame({name: getattr(self, col) for name, col in zip(FRAME_COLUMNS, COLUMNS)},
+                            index=self.index)
+
+    def __len__(self):
+        return len(self.ts)
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            raise TypeError("Bars supporta solo lo slicing (bars[a:b]).")
+        return Bars(self.ts[key], self.open[key], self.high[key], self.low[key],
+                    self.close[key], self.volume[key], tz=self.tz, _trusted=True)
+
+    @property
+    def empty(self):
+        return len(self.ts) == 0
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, col).nbytes for col in ('ts',) + COLUMNS)
+
+    def __repr__(self):
+        if self.empty:
+            return "Bars(vuoto)"
+        return f"Bars({len(self)} barre, {self.timestamp(0)} -> {self.timestamp(-1)})"
+
+
+# --- ESECUZIONE (per testare questo file) ---
+if __name__ == "__main__":
+    index = pd.date_range('2024-01-01', periods=1000, freq='D', tz='America/New_York')
+    frame = pd.DataFrame(np.random.rand(1000, 5), index=index, columns=list(FRAME_COLUMNS))
+    bars = Bars.from_frame(frame)
+    window = bars[100:200]
+    assert np.shares_memory(window.close, bars.close) # Slice senza copia
+    assert (bars.to_frame().index == frame.index).all()
+    print(f"{bars} -> {bars.nbytes} byte, DataFrame: {frame.memory_usage().sum()} byte")
+    print(f"Slice: {window}")
@@ -0,0 +1,135 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# --- CACHE IN MEMORIA (TTL + LRU) ---
+# Tiene i DataFrame già puliti per (ticker, timeframe): riaprire un grafico
+# visto da poco non richiede né un thread né una richiesta di rete.
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024 # 256 MB
+
+# Durata (secondi) di una voce in cache, per intervallo delle barre
+INTERVAL_TTL = {
+    '1m': 30,
+    '2m': 60,
+    '5m': 120,
+    '15m': 300,
+    '30m': 600,
+    '1h': 900,
+    '1d': 1800,
+    '1wk': 6 * 3600,
+    '1mo': 12 * 3600,
+}
+DEFAULT_TTL = 300
+
+
+def ttl_for_interval(interval):
+    """Restituisce il TTL in secondi per un intervallo Yahoo ('2m', '1d', ...)."""
+    return INTERVAL_TTL.get(interval, DEFAULT_TTL)
+
+
+def estimate_size(value):
+    """Stima (in byte) l'occupazione in memoria di un valore in cache."""
+    try:
+        if hasattr(value, 'memory_usage'): # DataFrame pandas
+            return int(value.memory_usage(index=True, deep=False).sum())
+        if hasattr(value, 'nbytes'):
+            return int(value.nbytes)
+    except Exception:
+        pass
+    return sys.getsizeof(value)
+
+
+class DataCache:
+    """
+    Cache in memoria con scadenza per voce (TTL), tetto di memoria ed
+    eviction LRU. Thread-safe. Tiene i contatori di hit/miss/eviction.
+    """
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, name="DataCache"):
+        self.max_bytes = max_bytes
+        self.name = name
+        self._entries = OrderedDict() # key -> (value, expires_at, size)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Restituisce il valore in cache o None (se assente o scaduto)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at, size = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.current_bytes -= size
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, ttl=DEFAULT_TTL):
+        """Inserisce (o sostituisce) una voce con il TTL indicato in secondi."""
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return # Troppo grande per stare in cache
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[2]
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, key=None):
+        """Rimuove una voce (o tutte se key è None)."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self.current_bytes = 0
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[2]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Restituisce i contatori della cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits / total) if total else 0.0,
+            }
+
+
+# --- ESECUZIONE (per testare questo file) ---
+if __name__ == "__main__":
+    cache = DataCache(max_bytes=3000)
+    cache.put(('AAPL', '1d'), b'x' * 1000, ttl=ttl_for_interval('2m'))
+    cache.put(('MSFT', '1d'), b'x' * 1000, ttl=0.05)
+    assert cache.get(('AAPL', '1d')) is not None
+    time.sleep(0.1)
+    assert cache.get(('MSFT', '1d')) is None # Scaduta
+    cache.put(('NVDA', '1y'), b'x' * 1000)
+    cache.put(('GOOGL', '1y'), b'x' * 1000)
+    cache.put(('TSLA', '1y'), b'x' * 1000) # Provoca eviction LRU
+    print(f"[{cache.name}] Statistiche: {cache.stats()}")
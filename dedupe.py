@@ -0,0 +1,191 @@
+import hashlib
+import math
+import threading
+import time
+
+# --- DEDUPLICAZIONE A MEMORIA COSTANTE ---
+# Filtri di Bloom a rotazione per riconoscere le notizie già viste (per link)
+# in un monitor che resta acceso per settimane. La memoria è fissata alla
+# creazione e non cresce con il numero di notizie.
+#
+# Finestra: una chiave è ricordata per almeno `horizon` secondi e al più per
+# `generations` volte horizon / (generations - 1); poi viene dimenticata
+# (per il news feed significa rivedere una notizia molto vecchia solo se
+# Yahoo la ripropone dopo giorni).
+#
+# Falsi positivi: una notizia nuova può essere scambiata per già vista con
+# probabilità al più circa generations * error_rate (es. 2 * 0.0001 = 0.02%)
+# finché ogni generazione resta entro `capacity` chiavi; oltre quella soglia
+# la generazione ruota in anticipo, quindi il tasso resta garantito.
+# Non esistono falsi negativi entro la finestra.
+
+DEFAULT_HORIZON = 7 * 24 * 3600 # Secondi
+DEFAULT_CAPACITY = 50_000 # Chiavi per generazione
+DEFAULT_ERROR_RATE = 0.0001 # Per generazione
+DEFAULT_GENERATIONS = 2
+
+
+def bloom_parameters(capacity, error_rate):
+    """Bit (m) e numero di hash (k) ottimali per capacity chiavi con il tasso di errore dato."""
+    bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+class BloomFilter:
+    """Filtro di Bloom su bytearray, con doppio hashing da un solo digest blake2b."""
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.n_bits, self.n_hashes = bloom_parameters(capacity, error_rate)
+        self.bits = bytearray((self.n_bits + 7) // 8)
+        self.count = 0
+        self.created_at = time.time()
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.n_bits for i in range(self.n_hashes)]
+
+    def __contains__(self, key):
+        return self._has(self._positions(key))
+
+    def _has(self, positions):
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in positions)
+
+    def add(self, key):
+        """Aggiunge la chiave. Restituisce True se era (probabilmente) già presente."""
+        return self._add(self._positions(key))
+
+    def _add(self, positions):
+        present = True
+        for p in positions:
+            mask = 1 << (p & 7)
+            if not self.bits[p >> 3] & mask:
+                present = False
+                self.bits[p >> 3] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    def fill_ratio(self):
+        """Frazione di bit a 1 (stima: 1 - e^(-k*n/m))."""
+        return 1 - math.exp(-self.n_hashes * self.count / self.n_bits)
+
+    def false_positive_rate(self):
+        """Tasso di falsi positivi stimato con le chiavi inserite finora."""
+        return self.fill_ratio() ** self.n_hashes
+
+    @property
+    def nbytes(self):
+        return len(self.bits)
+
+
+class RotatingDedupe:
+    """
+    Insieme "già visto" a finestra temporale: `generations` filtri di Bloom,
+    il più recente riceve le chiavi nuove, il più vecchio viene scartato a
+    ogni rotazione. Thread-safe.
+    """
+    def __init__(self, horizon=DEFAULT_HORIZON, capacity=DEFAULT_CAPACITY,
+                 error_rate=DEFAULT_ERROR_RATE, generations=DEFAULT_GENERATIONS, name="Dedupe"):
+        if generations < 2:
+            raise ValueError("Servono almeno 2 generazioni per non dimenticare tutto a ogni rotazione.")
+        self.horizon = horizon
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.generations = generations
+        self.rotate_every = horizon / (generations - 1)
+        self.name = name
+        self._lock = threading.Lock()
+        self._filters = [BloomFilter(capacity, error_rate)]
+        self.checks = 0
+        self.duplicates = 0
+        self.rotations = 0
+
+    def _rotate_if_needed(self):
+        current = self._filters[0]
+        expired = time.time() - current.created_at >= self.rotate_every
+        if expired or current.count >= self.capacity:
+            self._filters.insert(0, BloomFilter(self.capacity, self.error_rate))
+            del self._filters[self.generations:]
+            self.rotations += 1
+
+    def __contains__(self, key):
+        with self._lock:
+            # Stessi parametri per tutte le generazioni: le posizioni si calcolano una volta sola
+            positions = self._filters[0]._positions(key)
+            return any(bloom._has(positions) for bloom in self._filters)
+
+    def check_and_add(self, key):
+        """True se la chiave è nuova (e la registra), False se è già stata vista nella finestra."""
+        with self._lock:
+            self._rotate_if_needed()
+            self.checks += 1
+            current = self._filters[0]
+            positions = current._positions(key)
+            if current._add(positions):
+                self.duplicates += 1
+                return False
+            if any(bloom._has(positions) for bloom in self._filters[1:]):
+                # Vista in una generazione vecchia: ora è anche nella corrente (rinfrescata)
+                self.duplicates += 1
+                return False
+            return True
+
+    def add(self, key):
+        """Registra la chiave senza contarla come controllo."""
+        with self._lock:
+            self._rotate_if_needed()
+            current = self._filters[0]
+            current._add(current._positions(key))
+
+    def stats(self):
+        with self._lock:
+            fp_rate = 1.0
+            for bloom in self._filters:
+                fp_rate *= 1 - bloom.false_positive_rate()
+            return {
+                'checks': self.checks,
+                'duplicates': self.duplicates,
+                'rotations': self.rotations,
+                'keys_current': self._filters[0].count,
+                'bytes': sum(bloom.nbytes for bloom in self._filters),
+                'max_bytes': self.generations * self._filters[0].nbytes,
+                'fp_rate_now': 1 - fp_rate,
+                'fp_rate_max': 1 - (1 - self.error_rate) ** self.generations,
+                'horizon_h': self.horizon / 3600,
+            }
+
+
+# --- ESECUZIONE (per testare questo file) ---
+if __name__ == "__main__":
+    import sys
+
+    dedupe = RotatingDedupe(capacity=50_000, error_rate=0.0001)
+    print(f"Memoria massima: {dedupe.generations * BloomFilter(50_000, 0.0001).nbytes / 1024:.0f} KB, "
+          f"falsi positivi al più {dedupe.stats()['fp_rate_max']:.4%}")
+
+    # Simulazione: molte settimane di link, ognuno visto più volte (ogni ciclo ripropone gli stessi)
+    start = time.perf_counter()
+    n_links = 200_000
+    missed = 0 # Link nuovi scambiati per già visti (falsi positivi)
+    for i in range(n_links):
+        link = f"https://finance.yahoo.com/news/article-{i}.html"
+        missed += not dedupe.check_and_add(link)
+        for _ in range(3):
+            assert not dedupe.check_and_add(link) # Nessun falso negativo a breve distanza
+    elapsed = time.perf_counter() - start
+    print(f"{4 * n_links} controlli in {elapsed:.2f}s ({elapsed / (4 * n_links) * 1e6:.1f} us ciascuno), "
+          f"link nuovi persi: {missed} ({missed / n_links:.4%})")
+
+    # Falsi positivi misurati con chiavi mai viste
+    false_positives = sum(f"https://other.example.com/{i}" in dedupe for i in range(200_000))
+    print(f"Falsi positivi misurati: {false_positives / 200_000:.4%}")
+    print(f"Statistiche: {dedupe.stats()}")
+
+    legacy = {f"https://finance.yahoo.com/news/article-{i}.html" for i in range(n_links)}
+    legacy_bytes = sys.getsizeof(legacy) + sum(sys.getsizeof(link) for link in legacy)
+    print(f"Set di link equivalente: {legacy_bytes / 1024 / 1024:.1f} MB (e continua a crescere)")
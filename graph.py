@@ -1,5 +1,5 @@
 import sys
-import requests
+import numpy as np
 import pandas as pd
 import yfinance as yf
 import mplfinance as mpf
@@ -7,6 +7,8 @@ import json
 import math as m
 import time
 import os
+import queue
+import threading
 try:
     # Importa la sessione speciale richiesta da yfinance
     from curl_cffi.requests import Session as CurlSession
@@ -15,11 +17,17 @@ except ImportError:
     print("Esegui: pip install curl_cffi")
     CurlSession = None
 import ssl
+try:
+    # Pool di sessioni HTTP: sessioni in prestito per le chiamate dirette, una sola per yfinance
+    from http_pool import SessionPool
+except ImportError:
+    print("ERRORE: Impossibile trovare il file 'http_pool.py'.")
+    sys.exit()
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QLineEdit, QListWidget, QListWidgetItem, QLabel,
                              QStackedWidget, QHBoxLayout, QPushButton, QSplitter, QStyle,
                              QButtonGroup, QScrollArea, QDialog)
-from PyQt6.QtCore import (Qt, QThread, pyqtSignal, QTimer, QSize, QUrl, pyqtSlot, 
+from PyQt6.QtCore import (Qt, QThread, QObject, pyqtSignal, QTimer, QSize, QUrl, pyqtSlot, 
                           QRect, QEvent) # Aggiunto QRect, QEvent, pyqtSlot
 from PyQt6.QtGui import (QMovie, QIcon, QDesktopServices)
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
@@ -44,6 +52,50 @@ except ImportError:
     print("ERRORE: Impossibile trovare il file 'news.py'.")
     news = None
 
+try:
+    import bar_store # Archivio locale delle barre OHLCV (SQLite)
+except ImportError:
+    print("ERRORE: Impossibile trovare il file 'bar_store.py'. Lo storico verrà riscaricato ogni volta.")
+    bar_store = None
+
+try:
+    import data_cache # Cache in memoria (TTL/LRU) dei DataFrame già puliti
+except ImportError:
+    print("ERRORE: Impossibile trovare il file 'data_cache.py'. Cache in memoria disabilitata.")
+    data_cache = None
+
+try:
+    import rate_limit # Rate limiter condiviso per tutti gli endpoint Yahoo
+except ImportError:
+    print("ERRORE: Impossibile trovare il file 'rate_limit.py'. Le richieste non saranno limitate.")
+    rate_limit = None
+
+try:
+    import timeframes # Piramide dei timeframe: viste derivate da una sola serie base
+except ImportError:
+    print("ERRORE: Impossibile trovare il file 'timeframes.py'. Ogni timeframe verrà scaricato separatamente.")
+    timeframes = None
+
+try:
+    import search_cache # Cache delle risposte di ricerca (TTL + riuso dei prefissi)
+except ImportError:
+    search_cache = None
+
+try:
+    import symbol_index # Indice locale dei simboli per la ricerca istantanea
+except ImportError:
+    symbol_index = None
+
+try:
+    import news_store # Archivio locale delle notizie (SQLite + FTS5)
+except ImportError:
+    news_store = None
+
+try:
+    import quote_feed # Quotazioni in streaming (opzionale, impostazione 'quote_stream')
+except ImportError:
+    quote_feed = None
+
 # Lazy import per model - verrà caricato solo quando necessario
 # Questo evita errori di import se PyTorch non è disponibile o ha problemi
 model = None
@@ -66,6 +118,42 @@ def load_model():
         model = None
         return None
     
+try:
+    # Normalizzazione vettoriale dei dati scaricati
+    import normalize
+except ImportError:
+    print("ERRORE: Impossibile trovare il file 'normalize.py'.")
+    sys.exit()
+
+try:
+    # Contenitore compatto delle barre (array NumPy in sola lettura)
+    from bars import Bars
+except ImportError:
+    print("ERRORE: Impossibile trovare il file 'bars.py'.")
+    sys.exit()
+
+try:
+    # Deduplicazione delle notizie a memoria costante (filtri di Bloom a rotazione)
+    from dedupe import RotatingDedupe
+except ImportError:
+    print("ERRORE: Impossibile trovare il file 'dedupe.py'.")
+    sys.exit()
+
+try:
+    # Orari di mercato per ticker (il polling delle notizie è in news.NewsFeed)
+    from news_scheduler import market_session
+except ImportError:
+    print("ERRORE: Impossibile trovare il file 'news_scheduler.py'.")
+    sys.exit()
+
+try:
+    # Pool centrale dei worker con corsie di priorità
+    from worker_pool import (WorkerPool, LANE_INTERACTIVE, LANE_SEARCH,
+                             LANE_PREFETCH, LANE_ANALYSIS)
+except ImportError:
+    print("ERRORE: Impossibile trovare il file 'worker_pool.py'.")
+    sys.exit()
+
 try:
     # Importa i nuovi widget UI dal file settings_view.py
     from settings_view import SettingsDialog, NewsSidebar, NewsCard, FlyoutNewsFeed
@@ -180,84 +268,198 @@ STYLESHEET = """
 """
 
 SETTINGS_FILE = 'settings.json'
+PREFETCH_INTERVAL_MS = 15 * 60 * 1000 # Prefetch della watchlist ogni 15 minuti
+SEARCH_QUOTES_COUNT = search_cache.SEARCH_QUOTES_COUNT if search_cache else 10
+LIVE_REFRESH_MS = 30 * 1000 # Aggiornamento live del grafico intraday
+LIVE_TIMEFRAMES = ('1d', '5d')
+QUOTE_FLUSH_MS = 250 # Tick dello stream all'interfaccia al massimo 4 volte al secondo
+QUOTE_CHART_MIN_S = 1.0 # Ridisegno del grafico dallo stream al massimo una volta al secondo
+COMMAND_COALESCE_S = 0.5 # Modifiche ai ticker del NewsWorker in rapida sequenza applicate insieme
 
  
+def limited_call(endpoint, func, *args, **kwargs):
+    """Passa la chiamata dal rate limiter condiviso (se rate_limit.py è disponibile)."""
+    if rate_limit:
+        return rate_limit.limited_call(endpoint, func, *args, **kwargs)
+    kwargs.pop('cost', None)
+    kwargs.pop('host', None)
+    return func(*args, **kwargs)
+
 # --- Worker Threads (SearchWorker, DataWorker, NewsWorker) ---
 class SearchWorker(QThread):
-    results_ready = pyqtSignal(list)
+    results_ready = pyqtSignal(list, bool) # Risultati, True se Yahoo ne ha restituiti il massimo
     error = pyqtSignal(str)
     
     # --- MODIFICATO __init__ ---
-    def __init__(self, query, session):
+    def __init__(self, query, session_pool, generation=0):
         super().__init__()
         self.query = query
-        self.session = session # <-- Aggiunto
+        self.session_pool = session_pool # Ogni ricerca prende in prestito una sessione dal pool
+        self.generation = generation # ID richiesta: i risultati superati vengono scartati
 
     def run(self):
         if not self.query:
-            self.results_ready.emit([])
+            self.results_ready.emit([], False)
             return
+        if self.isInterruptionRequested():
+            return # Ricerca superata prima ancora di partire
         try:
-            url = f"https://query1.finance.yahoo.com/v1/finance/search?q={self.query}"
+            url = "https://query1.finance.yahoo.com/v1/finance/search"
+            params = {'q': self.query, 'quotesCount': SEARCH_QUOTES_COUNT, 'newsCount': 0}
             headers = {'User-Agent': 'Mozilla/5.0'}
             
             # --- MODIFICATA chiamata requests ---
-            response = self.session.get(url, headers=headers, timeout=10) # <-- Usa self.session
+            with self.session_pool.session() as session:
+                response = limited_call('search', session.get, url, params=params, headers=headers, timeout=10)
             
+            if self.isInterruptionRequested():
+                return
             response.raise_for_status()
             data = response.json()
             
             # --- INIZIO LOGICA MANCANTE ---
+            quotes = data.get('quotes', [])
             results = [
-                quote for quote in data.get('quotes', [])
+                quote for quote in quotes
                 if quote.get('quoteType') in ['EQUITY', 'ETF', 'CRYPTOCURRENCY', 'FUTURE']
             ]
-            self.results_ready.emit(results)
+            self.results_ready.emit(results, len(quotes) >= SEARCH_QUOTES_COUNT)
             # --- FINE LOGICA MANCANTE ---
             
         except Exception as e:
             self.error.emit(f"Search failed: {e}")
 
+def clean_history(data, interval, ticker=""):
+    """Normalizza i dati scaricati (vedi normalize.py) e segnala le barre scartate."""
+    data, report = normalize.normalize_ohlcv(data, interval)
+    summary = normalize.describe_report(report)
+    if summary:
+        print(f"[Normalize] {ticker} {interval}: {summary}")
+    return data
+
 class DataWorker(QThread):
-    data_ready = pyqtSignal(pd.DataFrame, str)
+    data_ready = pyqtSignal(object, str) # Bars (niente DataFrame attraverso il segnale)
     error = pyqtSignal(str)
     
     # --- MODIFICATO __init__ ---
-    def __init__(self, ticker, timeframe_params, session): # <-- Riportato a 'session'
+    def __init__(self, ticker, timeframe_params, session_pool, store=None, timeframe=None, cache=None,
+                 generation=0):
         super().__init__()
+        self.generation = generation # ID richiesta: i risultati superati non vengono disegnati
         self.ticker = ticker
         self.timeframe_params = timeframe_params
-        self.session = session # <-- Riportato a 'session'
+        self.session_pool = session_pool # Fornisce la sessione unica di yfinance
+        self.store = store # Archivio locale (BarStore) o None
+        self.timeframe = timeframe # Timeframe UI ('1d', '5y', ...) per la piramide
+        self.cache = cache # Cache in memoria (DataCache) per la serie base
+
+    def _load_incremental(self, tk, params):
+        """
+        Legge la serie dall'archivio locale e scarica solo le barre successive
+        all'ultima salvata. Restituisce None se serve un download completo.
+        """
+        interval = params.get("interval", "1d")
+        period = params.get("period")
+        cached, info = self.store.load(self.ticker, interval)
+        if cached is None or not self.store.covers(info, period):
+            return None
+
+        if self.store.is_fresh(info, interval) or self.isInterruptionRequested():
+            return cached
 
-    def run(self):
         try:
-            # --- MODIFICATA chiamata yf.Ticker ---
-            # Rimuoviamo 'verify' e ripristiniamo 'session'
-            # Ora passiamo la sessione curl_cffi (o None se non è installato)
-            tk = yf.Ticker(self.ticker, session=self.session) 
-            
-            data = tk.history(**self.timeframe_params)
+            # Riscarica anche l'ultima barra salvata: potrebbe essere ancora in formazione.
+            # Il timestamp unix evita ambiguità di timezone con yfinance.
+            start = int(cached.index[-1].timestamp())
+            delta = limited_call('history', tk.history, start=start, interval=interval)
+        except Exception as e:
+            print(f"[DataWorker] Fetch incrementale fallito per {self.ticker}: {e}")
+            return None
+
+        if delta.empty:
+            self.store.touch(self.ticker, interval)
+            return cached
+
+        delta = clean_history(delta, interval, self.ticker)
+        merged = bar_store.merge_bars(cached, delta)
+        merged = bar_store.slice_period(merged, info['period'])
+        self.store.save(self.ticker, interval, delta, period, keep_from=merged.index[0])
+        return merged
+
+    def _fetch_series(self, tk, params):
+        """Restituisce la serie (archivio locale + eventuale gap-fill, o download completo)."""
+        interval = params.get("interval", "1d")
+        data = None
+        if self.store:
+            try:
+                data = self._load_incremental(tk, params)
+            except Exception as e:
+                print(f"[DataWorker] Archivio locale non utilizzabile per {self.ticker}: {e}")
+                data = None
+
+        if data is None:
+            data = limited_call('history', tk.history, **params)
             
             # --- LOGICA RIPRISTINATA ---
             if data.empty:
                 raise ValueError("No data returned from yfinance.")
             
-            if self.timeframe_params.get("interval", "1d").endswith(("m", "h")):
+            data = clean_history(data, interval, self.ticker)
+
+            if self.store and not data.empty:
                 try:
-                    data.index = data.index.tz_convert(None)
-                except TypeError:
-                    pass 
-                    
-            ohlcv_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
-            for col in ohlcv_columns:
-                if col in data.columns:
-                    data[col] = pd.to_numeric(data[col], errors='coerce')
-            data.dropna(inplace=True)
+                    self.store.save(self.ticker, interval, data, params.get("period"), replace=True)
+                except Exception as e:
+                    print(f"[DataWorker] Impossibile salvare {self.ticker} nell'archivio: {e}")
+        return data
+
+    def _fetch_view(self, tk):
+        """Scarica la serie base del timeframe e ne deriva la vista in locale."""
+        base_params = timeframes.get_base_params(self.timeframe)
+        if not base_params:
+            return None
+        try:
+            base = self._fetch_series(tk, base_params)
+        except Exception as e:
+            print(f"[DataWorker] Serie base non disponibile per {self.ticker} ({self.timeframe}): {e}")
+            return None
+
+        if self.cache and base is not None and not base.empty:
+            self.cache.put(timeframes.base_cache_key(self.ticker, self.timeframe), base,
+                           ttl=data_cache.ttl_for_interval(base_params['interval']))
+        return timeframes.derive_view(base, self.timeframe)
+
+    def run(self):
+        # yfinance condivide una sola sessione tra i thread: niente prestito dal pool
+        self._run(self.session_pool.yfinance_session())
+
+    def _run(self, session):
+        try:
+            # --- MODIFICATA chiamata yf.Ticker ---
+            # Rimuoviamo 'verify' e ripristiniamo 'session'
+            # Ora passiamo la sessione curl_cffi (o None se non è installato)
+            tk = yf.Ticker(self.ticker, session=session) 
+            
+            # Cancellazione cooperativa: si controlla prima di ogni fase di rete
+            if self.isInterruptionRequested():
+                return
+
+            data = None
+            if timeframes and self.timeframe:
+                data = self._fetch_view(tk)
+
+            if data is None or data.empty:
+                if self.isInterruptionRequested():
+                    return
+                # Fallback: richiesta diretta con i parametri del timeframe
+                data = self._fetch_series(tk, self.timeframe_params)
+                if bar_store:
+                    data = bar_store.slice_period(data, self.timeframe_params.get("period"))
             
             if data.empty:
                 raise ValueError("No valid data found for this ticker after cleaning.")
                 
-            self.data_ready.emit(data, self.ticker)
+            self.data_ready.emit(Bars.from_frame(data), self.ticker)
             # --- FINE LOGICA ---
             
         except Exception as e:
@@ -267,16 +469,204 @@ class DataWorker(QThread):
             elif "unexpected keyword argument 'verify'" in error_msg:
                  error_msg = "Errore di codice (Rimuovere 'verify' da Ticker)."
             self.error.emit(f"Failed to get data for {self.ticker}: {error_msg}")
+class LiveUpdateWorker(QThread):
+    """
+    Aggiornamento live del grafico intraday: scarica solo le barre a partire
+    dall'ultima mostrata (compresa, perché ancora in formazione) e le unisce
+    alla serie base.
+    """
+    update_ready = pyqtSignal(object, str, bool) # Serie base, ticker, True se è cambiata
+    error = pyqtSignal(str)
+
+    def __init__(self, ticker, timeframe, base, session_pool, store=None, generation=0):
+        super().__init__()
+        self.ticker = ticker
+        self.timeframe = timeframe
+        self.base = base
+        self.session_pool = session_pool
+        self.store = store
+        self.generation = generation
+        self.base_params = timeframes.get_base_params(timeframe)
+
+    def run(self):
+        interval = self.base_params['interval']
+        period = self.base_params['period']
+        try:
+            if self.isInterruptionRequested():
+                return
+            tk = yf.Ticker(self.ticker, session=self.session_pool.yfinance_session())
+            start = int(self.base.index[-1].timestamp())
+            delta = limited_call('history', tk.history, start=start, interval=interval)
+        except Exception as e:
+            self.error.emit(f"Aggiornamento live fallito per {self.ticker}: {e}")
+            return
+        if self.isInterruptionRequested():
+            return
+
+        if delta is not None and not delta.empty:
+            delta = clean_history(delta, interval, self.ticker)
+        if not bar_store.has_changes(self.base, delta):
+            self.update_ready.emit(self.base, self.ticker, False)
+            return
+
+        merged = bar_store.merge_bars(self.base, delta)
+        merged = bar_store.slice_period(merged, period)
+        if self.store:
+            try:
+                self.store.save(self.ticker, interval, delta, period, keep_from=merged.index[0])
+            except Exception as e:
+                print(f"[LiveUpdate] Impossibile salvare {self.ticker} nell'archivio: {e}")
+        self.update_ready.emit(merged, self.ticker, True)
+
+class QuoteStreamBridge(QObject):
+    """
+    Porta i tick del feed (che gira su un thread suo) al thread dell'interfaccia:
+    i tick vengono aggregati nella barra corrente e consegnati a intervalli fissi.
+    """
+    quotes_updated = pyqtSignal(dict) # {symbol: (start, open, high, low, close, volume)}
+
+    def __init__(self, feed, interval_seconds, flush_ms=QUOTE_FLUSH_MS, parent=None):
+        super().__init__(parent)
+        self.feed = feed
+        self.aggregator = quote_feed.TickAggregator(interval_seconds)
+        self.flush_ms = flush_ms
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._flush)
+
+    def start(self, symbols):
+        self.feed.set_symbols(symbols)
+        self.feed.start(self.aggregator.add)
+        self.timer.start(self.flush_ms)
+
+    def set_symbols(self, symbols):
+        self.feed.set_symbols(symbols)
+
+    def stop(self):
+        self.timer.stop()
+        self.feed.stop()
+
+    def _flush(self):
+        updates = self.aggregator.drain()
+        if updates:
+            self.quotes_updated.emit(updates)
+
+class PrefetchWorker(QThread):
+    """
+    Scalda archivio e cache per tutta la watchlist con download multi-ticker
+    (yf.download) invece di una richiesta per simbolo al click.
+    """
+    prefetch_done = pyqtSignal(list) # Ticker scaldati con successo
+
+    def __init__(self, tickers, session_pool, store=None, cache=None, chunk_size=40):
+        super().__init__()
+        self.tickers = list(dict.fromkeys(tickers)) # Niente duplicati, ordine preservato
+        self.session_pool = session_pool
+        self.store = store
+        self.cache = cache
+        self.chunk_size = chunk_size
+        self.base_params = timeframes.BASE_SERIES['daily'] if timeframes else {"period": "1y", "interval": "1d"}
+
+    def _download(self, session, tickers, **kwargs):
+        """Un download multi-ticker; restituisce {ticker: DataFrame}."""
+        # Il costo nel rate limiter è pari al numero di ticker (yf.download fa una richiesta per simbolo)
+        data = limited_call('history', yf.download, tickers, cost=len(tickers),
+                            interval=self.base_params['interval'], group_by='ticker',
+                            auto_adjust=True, actions=False, ignore_tz=False, threads=True,
+                            progress=False, session=session, **kwargs)
+        if data is None or data.empty:
+            return {}
+
+        frames = {}
+        if isinstance(data.columns, pd.MultiIndex):
+            available = set(data.columns.get_level_values(0))
+            for ticker in tickers:
+                if ticker in available:
+                    frames[ticker] = data[ticker].dropna(how='all')
+        elif len(tickers) == 1:
+            frames[tickers[0]] = data.dropna(how='all')
+        return frames
+
+    def _chunks(self, items):
+        for i in range(0, len(items), self.chunk_size):
+            yield items[i:i + self.chunk_size]
+
+    def _publish(self, ticker, data):
+        """Mette la serie base in cache in memoria (la vista verrà derivata al click)."""
+        if self.cache and timeframes and data is not None and not data.empty:
+            self.cache.put(timeframes.series_cache_key(ticker, self.base_params['interval']), data,
+                           ttl=data_cache.ttl_for_interval(self.base_params['interval']))
+
+    def run(self):
+        self._prefetch(self.session_pool.yfinance_session())
+
+    def _prefetch(self, session):
+        interval = self.base_params['interval']
+        period = self.base_params['period']
+        warmed = []
+        missing = []
+        stale = {} # ticker -> serie già in archivio da completare
+
+        for ticker in self.tickers:
+            cached, info = self.store.load(ticker, interval) if self.store else (None, None)
+            if cached is None or not self.store.covers(info, period):
+                missing.append(ticker)
+            elif not self.store.is_fresh(info, interval):
+                stale[ticker] = cached
+            else:
+                self._publish(ticker, cached)
+                warmed.append(ticker)
+
+        try:
+            # 1. Download completo per i ticker mai visti
+            for chunk in self._chunks(missing):
+                if self.isInterruptionRequested():
+                    break
+                for ticker, data in self._download(session, chunk, period=period).items():
+                    data = clean_history(data, interval, ticker)
+                    if data.empty:
+                        continue
+                    if self.store:
+                        self.store.save(ticker, interval, data, period, replace=True)
+                    self._publish(ticker, data)
+                    warmed.append(ticker)
+
+            # 2. Solo le barre mancanti per i ticker già in archivio
+            stale_tickers = list(stale)
+            for chunk in self._chunks(stale_tickers):
+                if self.isInterruptionRequested():
+                    break
+                start = min(stale[t].index[-1] for t in chunk)
+                frames = self._download(session, chunk, start=int(start.timestamp()))
+                for ticker in chunk:
+                    cached = stale[ticker]
+                    delta = frames.get(ticker)
+                    if delta is None or delta.empty:
+                        self.store.touch(ticker, interval)
+                        self._publish(ticker, cached)
+                        warmed.append(ticker)
+                        continue
+                    delta = clean_history(delta, interval, ticker)
+                    merged = bar_store.merge_bars(cached, delta)
+                    merged = bar_store.slice_period(merged, period)
+                    self.store.save(ticker, interval, delta, period, keep_from=merged.index[0])
+                    self._publish(ticker, merged)
+                    warmed.append(ticker)
+        except Exception as e:
+            print(f"[PrefetchWorker] Errore durante il prefetch: {e}")
+
+        print(f"[PrefetchWorker] Watchlist scaldata: {len(warmed)}/{len(self.tickers)} ticker "
+              f"({len(missing)} completi, {len(stale)} incrementali).")
+        self.prefetch_done.emit(warmed)
+
 class NewsAnalysisWorker(QThread):
     """Worker thread per analizzare le notizie con il modello AI."""
     analysis_complete = pyqtSignal(dict)  # Emette il news_item con trading_signal aggiunto
     
-    # --- MODIFICATO __init__ (AGGIUNTO session=None) ---
-    def __init__(self, news_item, trading_model=None, session=None):
+    def __init__(self, news_item, trading_model=None, session_pool=None):
         super().__init__()
         self.news_item = news_item
         self.trading_model = trading_model
-        self.session = session # <-- Aggiunto
+        self.session_pool = session_pool
     
     def run(self):
         if not self.trading_model or not self.trading_model.model:
@@ -285,20 +675,10 @@ class NewsAnalysisWorker(QThread):
             return
         
         try:
-            # Ottieni il testo della notizia
-            news_text = self.news_item.get('text', '')
-            news_link = self.news_item.get('link', '')
+            # Testo della notizia (stessa scelta di news_daemon.py, vedi TradingModel.news_text)
+            news_text = self.trading_model.news_text(self.news_item, self.session_pool)
             ticker = self.news_item.get('ticker', '')
             
-            # Se non c'è testo, prova a recuperarlo dall'URL
-            if not news_text and news_link:
-                # --- MODIFICATA chiamata check_url ---
-                news_text = self.trading_model.check_url(news_link, session=self.session)
-            
-            # Se ancora non c'è testo, usa il titolo
-            if not news_text:
-                news_text = self.news_item.get('title', '')
-            
             # Analizza il trading signal
             if news_text:
                 trading_signal = self.trading_model.analyze_trading_signal(news_text, ticker)
@@ -313,59 +693,117 @@ class NewsAnalysisWorker(QThread):
 
 class NewsWorker(QThread):
     new_news_signal = pyqtSignal(dict)
+    tickers_updated = pyqtSignal(str, list) # Link di una notizia già emessa, tutti i suoi ticker
     
     # --- MODIFICATO __init__ ---
-    def __init__(self, tickers, session):
+    def __init__(self, tickers, session_pool, store=None, seen_links=None):
         super().__init__()
         self.tickers = tickers
-        self.session = session # <-- Aggiunto
-        self.running = True
-        self.seen_links = set()
-        self.is_first_run = True
+        # Scheduler, download, deduplicazione e unioni sono in news.NewsFeed (condivisa con news_daemon.py):
+        # qui restano solo i segnali verso la UI. I link già visti sono condivisi tra i riavvii del worker.
+        # Al primo controllo di un ticker si mostrano solo le sue notizie più recenti (news.INITIAL_PER_TICKER)
+        self.feed = news.NewsFeed(tickers, session_pool=session_pool, store=store, seen=seen_links) if news else None
+        # Comandi dal thread della UI ('set' / 'add' / 'remove', lista di ticker): niente riavvii del thread
+        self.commands = queue.Queue()
+        self._stop_event = threading.Event()
+
+    @property
+    def running(self):
+        return not self._stop_event.is_set()
+
+    def set_tickers(self, tickers):
+        """Sostituisce l'insieme dei ticker (thread-safe). I ticker già presenti mantengono il loro stato."""
+        self.commands.put(('set', list(tickers)))
+
+    def add_tickers(self, tickers):
+        """Aggiunge ticker (thread-safe): vengono controllati subito."""
+        self.commands.put(('add', list(tickers)))
+
+    def remove_tickers(self, tickers):
+        """Rimuove ticker (thread-safe)."""
+        self.commands.put(('remove', list(tickers)))
+
+    def _apply_command(self, command, tickers):
+        if command == 'set':
+            self.feed.set_tickers(tickers)
+        elif command == 'add':
+            self.feed.add_tickers(tickers)
+        elif command == 'remove':
+            self.feed.remove_tickers(tickers)
+        self.tickers = self.feed.tickers
+
+    def _wait_for_commands(self, seconds):
+        """Attende fino a `seconds` secondi, svegliandosi subito per un comando o per stop()."""
+        try:
+            command = self.commands.get(timeout=max(seconds, 0.0))
+        except queue.Empty:
+            return
+        previous = set(self.tickers)
+        # Le modifiche in rapida sequenza (es. molti simboli della watchlist) si applicano insieme
+        while command is not None:
+            if command[0] == 'stop':
+                return
+            self._apply_command(*command)
+            try:
+                command = self.commands.get(timeout=COMMAND_COALESCE_S)
+            except queue.Empty:
+                command = None
+        added = [t for t in self.tickers if t not in previous]
+        removed = [t for t in previous if t not in self.tickers]
+        if added or removed:
+            print(f"[NewsWorker] Ticker aggiornati: +{added or '-'} -{removed or '-'} ({len(self.tickers)} in totale).")
         
     def run(self):
         if not news: 
             print("[NewsWorker] Modulo 'news.py' non trovato. Thread interrotto.")
             return
             
-        print(f"[NewsWorker] Avviato. Controllo per {len(self.tickers)} ticker ogni 5 minuti.")
+        print(f"[NewsWorker] Avviato. Controllo per {len(self.tickers)} ticker con intervalli adattivi.")
         
         while self.running:
             try:
                 # --- MODIFICATO ---
-                data_pool = news.fetch_all_news(self.tickers, session=self.session)
-                
-                new_items_found = []
-                for item in data_pool:
-                    link = item.get('link')
-                    if link and link not in self.seen_links:
-                        new_items_found.append(item)
-                        self.seen_links.add(link)
-                
-                if self.is_first_run:
-                    items_to_emit = new_items_found[:3]
-                    print(f"[NewsWorker] Primo avvio. Trovate {len(items_to_emit)} notizie iniziali.")
-                    self.is_first_run = False
-                else:
-                    items_to_emit = new_items_found
-                    if items_to_emit:
-                        print(f"[NewsWorker] Trovate {len(items_to_emit)} NUOVE notizie.")
-
-                for item in reversed(items_to_emit):
-                    if not self.running: break
-                    self.new_news_signal.emit(item)
-                    time.sleep(0.1) 
-                
-                for _ in range(300): # Attesa 5 minuti (300 sec)
-                    if not self.running: break
-                    time.sleep(1)
+                # Solo i ticker il cui intervallo è scaduto (vedi news_scheduler.py)
+                due = self.feed.scheduler.due()
+                if due:
+                    self._poll(due)
+
+                wait = self.feed.scheduler.next_due_in()
+                self._wait_for_commands(wait if wait is not None else 60)
                     
             except Exception as e:
                 print(f"[NewsWorker] Errore: {e}")
-                time.sleep(60)
+                self._wait_for_commands(60)
+
+    def _poll(self, tickers):
+        """Scarica le notizie dei ticker indicati ed emette quelle nuove."""
+        # Streaming: le notizie arrivano man mano che ogni ticker risponde
+        timings = {}
+        new_count = 0
+        initial_count = 0
+        cycle_start = time.perf_counter()
+        for kind, payload in self.feed.poll(tickers, timings=timings, should_stop=lambda: not self.running):
+            if kind == 'tickers':
+                self.tickers_updated.emit(payload['link'], list(payload['tickers']))
+            elif kind == 'news':
+                if payload['initial']:
+                    initial_count += 1 # Ticker al primo controllo: solo le più recenti, a fine giro
+                else:
+                    new_count += 1
+                    if new_count == 1:
+                        print(f"[NewsWorker] Prima notizia nuova dopo {time.perf_counter() - cycle_start:.2f}s.")
+                self.new_news_signal.emit(payload)
+                self._stop_event.wait(0.1)
+        print(f"[NewsWorker] Ciclo notizie: {news.summarize_timings(timings)}")
+        if initial_count:
+            print(f"[NewsWorker] Primo controllo di nuovi ticker. Trovate {initial_count} notizie iniziali.")
+        if new_count:
+            print(f"[NewsWorker] Trovate {new_count} NUOVE notizie.")
+        print(f"[NewsWorker] Prossimi controlli: {self.feed.scheduler.describe()}")
 
     def stop(self):
-        self.running = False
+        self._stop_event.set()
+        self.commands.put(('stop', None)) # Sveglia subito l'attesa
 
 
 # --- Matplotlib Canvas (Robusto) ---
@@ -385,18 +823,22 @@ class MplCanvas(FigureCanvas):
         plt.setp(self.ax_price.get_xticklabels(), visible=False)
         plt.setp(self.ax_volume.get_xticklabels(), visible=False)
         super(MplCanvas, self).__init__(self.fig)
-        self.data = None
+        self.data = None # Bars del grafico corrente
+        self.rsi = None # Valori RSI allineati alle barre (o None)
         self.chart_type = 'candle'
         self.timeframe = '1y'
         self.cross_hline = None
         self.cross_vline = None
         self.annot = None
+        self.view_key = None # (ticker, timeframe) del grafico disegnato
+        self.default_xlim = None # Limiti X scelti da mplfinance (vista completa)
         self.fig.canvas.mpl_connect('motion_notify_event', self.on_motion)
         self.fig.canvas.mpl_connect('axes_leave_event', self.on_leave)
         self.ax_price.callbacks.connect('xlim_changed', self.on_xlim_changed)
         
-    def set_data(self, data, chart_type, timeframe):
+    def set_data(self, data, chart_type, timeframe, rsi_values=None):
         self.data = data
+        self.rsi = rsi_values
         self.chart_type = chart_type
         self.timeframe = timeframe 
 
@@ -419,26 +861,25 @@ class MplCanvas(FigureCanvas):
             self.on_leave(event)
             return
         if 0 <= idx < len(self.data):
-            row = self.data.iloc[idx]
-            if isinstance(row.name, pd.Timestamp):
-                if self.timeframe in ['1d', '5d']:
-                     date_str = row.name.strftime('%Y-%m-%d %H:%M')
-                else:
-                     date_str = row.name.strftime('%Y-%m-%d')
+            bars = self.data
+            close = bars.close[idx]
+            stamp = bars.timestamp(idx)
+            if self.timeframe in ['1d', '5d']:
+                 date_str = stamp.strftime('%Y-%m-%d %H:%M')
             else:
-                date_str = str(row.name)
+                 date_str = stamp.strftime('%Y-%m-%d')
             price_str = ""
             if self.chart_type == 'candle':
-                price_str = (f"O: {row.Open:<7.2f}   H: {row.High:<7.2f}\n"
-                             f"L: {row.Low:<7.2f}   C: {row.Close:<7.2f}")
+                price_str = (f"O: {bars.open[idx]:<7.2f}   H: {bars.high[idx]:<7.2f}\n"
+                             f"L: {bars.low[idx]:<7.2f}   C: {close:<7.2f}")
             else:
-                price_str = f"Close: {row.Close:<7.2f}"
-            if 'RSI' in self.data.columns and pd.notna(row['RSI']):
-                price_str += f"\nRSI(14): {row['RSI']:.2f}"
+                price_str = f"Close: {close:<7.2f}"
+            if self.rsi is not None and not np.isnan(self.rsi[idx]):
+                price_str += f"\nRSI(14): {self.rsi[idx]:.2f}"
             self.annot.set_text(f"{date_str}\n{price_str}")
-            self.annot.xy = (idx, row.Close)
+            self.annot.xy = (idx, close)
             self.annot.set_visible(True)
-            self.cross_hline.set_ydata([row.Close])
+            self.cross_hline.set_ydata([close])
             self.cross_vline.set_xdata([idx])
             self.cross_hline.set_visible(True)
             self.cross_vline.set_visible(True)
@@ -452,18 +893,19 @@ class MplCanvas(FigureCanvas):
         idx_min = int(m.floor(xmin)); idx_max = int(m.ceil(xmax))
         idx_min = max(0, idx_min); idx_max = min(len(self.data), idx_max)
         if idx_min >= idx_max: return
-        visible_data = self.data.iloc[idx_min:idx_max]
-        if visible_data.empty: return
-        ymin = visible_data['Low'].min(); ymax = visible_data['High'].max()
-        vmax = visible_data['Volume'].max()
+        visible = self.data[idx_min:idx_max] # Vista sugli array, nessuna copia
+        if visible.empty: return
+        ymin = np.nanmin(visible.low); ymax = np.nanmax(visible.high)
+        vmax = np.nanmax(visible.volume)
         padding = (ymax - ymin) * 0.05
         if padding == 0: padding = ymin * 0.05 
-        if pd.isna(ymin) or pd.isna(ymax): return
+        if np.isnan(ymin) or np.isnan(ymax): return
         ax.set_ylim(ymin - padding, ymax + padding)
         self.ax_volume.set_ylim(0, vmax * 1.05)
-        if self.ax_indicator.get_visible() and 'RSI' in visible_data.columns:
-            rsi_min = visible_data['RSI'].min(); rsi_max = visible_data['RSI'].max()
-            if pd.isna(rsi_min) or pd.isna(rsi_max): return
+        if self.ax_indicator.get_visible() and self.rsi is not None:
+            visible_rsi = self.rsi[idx_min:idx_max]
+            if np.isnan(visible_rsi).all(): return
+            rsi_min = np.nanmin(visible_rsi); rsi_max = np.nanmax(visible_rsi)
             rsi_padding = (rsi_max - rsi_min) * 0.1
             if rsi_padding == 0: rsi_padding = 5
             self.ax_indicator.set_ylim(max(0, rsi_min - rsi_padding), min(100, rsi_max + rsi_padding))
@@ -475,7 +917,7 @@ class MainWindow(QMainWindow):
         
         # --- MODIFICA SSL ---
         self.ssl_verify = True
-        self.http_session = None # Useremo solo questa per tutto (sarà la CurlSession)
+        self.session_pool = None # Pool di sessioni curl_cffi (ricerca, articoli) + sessione unica di yfinance
         # self.curl_session = None <-- RIMOSSO
         # --- FINE MODIFICA ---
 
@@ -495,9 +937,56 @@ class MainWindow(QMainWindow):
         self.current_chart_type = "candle"
         self.indicators_state = {}
         self.news_worker = None
-        self.analysis_workers = []
+        self.news_seen_links = RotatingDedupe(name="NewsDedupe")
+
+        # Tutti i worker delle richieste passano dal pool (grafico > ricerca > prefetch > analisi)
+        self.worker_pool = WorkerPool(parent=self)
+
+        # Richieste dati/ricerca: ID di generazione e worker in volo (single-flight)
+        self.data_generation = 0
+        self.data_inflight = {} # (ticker, timeframe) -> DataWorker
+        self.search_generation = 0
+        self.search_workers = set()
+        self.search_cache = search_cache.SearchCache() if search_cache else None
+        self.symbol_index = None
+        if symbol_index:
+            try:
+                self.symbol_index = symbol_index.SymbolIndex()
+            except Exception as e:
+                print(f"AVVISO: Indice dei simboli non disponibile ({e}). La ricerca userà solo la rete.")
+
+        # Modalità live per i timeframe intraday: solo le barre nuove, ridisegno se cambiate
+        self.live_worker = None
+        self.live_timer = QTimer(self)
+        self.live_timer.timeout.connect(self.live_refresh)
+
+        # Stream delle quotazioni (push) per watchlist e candela corrente
+        self.quote_stream = None # Impostazione: None, 'yahoo' o 'host:porta'
+        self.news_rate = None # Impostazione: richieste al secondo per le notizie (None = default di news.py)
+        self.quote_bridge = None
+        self.last_stream_draw = 0.0
+        self.stream_draw_scheduled = False
         self.trading_model = None 
 
+        # Archivio locale delle barre: evita di riscaricare tutto lo storico a ogni click
+        self.bar_store = None
+        if bar_store:
+            try:
+                self.bar_store = bar_store.BarStore()
+            except Exception as e:
+                print(f"AVVISO: Archivio barre non disponibile ({e}). Lo storico verrà riscaricato ogni volta.")
+
+        # Archivio delle notizie: dedupe persistente, feed ripopolato all'avvio, filtro
+        self.news_store = None
+        if news_store:
+            try:
+                self.news_store = news_store.NewsStore()
+            except Exception as e:
+                print(f"AVVISO: Archivio notizie non disponibile ({e}). Le notizie viste andranno perse alla chiusura.")
+
+        # Cache in memoria per (ticker, timeframe): cambio timeframe/simbolo istantaneo
+        self.data_cache = data_cache.DataCache() if data_cache else None
+
         self.current_view_mode = 1 
         self.news_tickers = ['GC=F', 'CL=F', '^GSPC', 'NVDA', 'MSFT', 'GOOGL']
         self.flyout_popup_duration_ms = 5000 
@@ -505,6 +994,8 @@ class MainWindow(QMainWindow):
         self.timeframe_buttons = {}
         self.chart_type_buttons = {}
         
+        # Parametri Yahoo diretti per timeframe. Normalmente le viste sono derivate
+        # da una sola serie base (vedi timeframes.py); questi restano come fallback.
         self.timeframe_map = {
             "1d": {"period": "1d", "interval": "2m"},
             "5d": {"period": "5d", "interval": "15m"},
@@ -534,6 +1025,10 @@ class MainWindow(QMainWindow):
         self.flyout_news_feed = FlyoutNewsFeed(self.flyout_popup_duration_ms, self)
         self.flyout_news_feed.view_toggle_requested.connect(self.on_view_toggled)
         self.flyout_news_feed.hide()
+        if self.news_store:
+            for panel in (self.news_feed_sidebar, self.flyout_news_feed):
+                panel.enable_filter()
+                panel.filter_changed.connect(lambda text, panel=panel: self.on_news_filter_changed(panel, text))
 
         self.setup_connections()
 
@@ -541,7 +1036,17 @@ class MainWindow(QMainWindow):
         
         self.update_ui_states()
         
-        self.start_news_worker()
+        self.load_stored_news()
+        self.update_news_tickers()
+        self.start_quote_stream()
+
+        # Prefetch della watchlist all'avvio e poi periodicamente
+        self.prefetch_worker = None
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.timeout.connect(self.start_prefetch)
+        self.prefetch_timer.start(PREFETCH_INTERVAL_MS)
+        self.start_prefetch()
+
         self.check_model_files()
 
     def check_model_files(self):
@@ -623,7 +1128,7 @@ class MainWindow(QMainWindow):
                 
             print("Avvio ModelLoaderWorker...")
             # Passiamo la sessione HTTP al worker
-            self.model_loader = ModelLoaderWorker(self.http_session) 
+            self.model_loader = ModelLoaderWorker(self.session_pool.create_session()) 
             self.model_loader.model_ready.connect(self.on_model_ready)
             self.model_loader.model_error.connect(self.on_model_error)
             self.model_loader.start()
@@ -632,6 +1137,8 @@ class MainWindow(QMainWindow):
     def on_model_ready(self, model_instance):
         """Slot chiamato quando il modello AI è pronto."""
         self.trading_model = model_instance
+        # I worker di analisi consegnano i prompt a un solo thread che li genera a lotti
+        self.trading_model.start_inference_service()
         print("✅ Modello AI caricato con successo e pronto per l'analisi.")
 
     @pyqtSlot(str)
@@ -733,7 +1240,7 @@ class MainWindow(QMainWindow):
     def setup_connections(self):
         self.search_timer = QTimer(self); self.search_timer.setSingleShot(True)
         self.search_timer.timeout.connect(self.start_search)
-        self.search_bar.textChanged.connect(lambda: self.search_timer.start(300))
+        self.search_bar.textChanged.connect(self.on_search_text_changed)
         self.search_results_list.itemClicked.connect(self.add_to_watchlist)
         self.add_button.clicked.connect(self.add_top_search_result)
         self.watchlist.currentItemChanged.connect(self.on_watchlist_selection_changed)
@@ -772,18 +1279,75 @@ class MainWindow(QMainWindow):
             if self.current_view_mode == 3:
                 self.flyout_news_feed.update_geometry()
 
+    def on_search_text_changed(self, text):
+        """Risultati dell'indice locale subito (anche offline); la ricerca di rete parte dopo il debounce."""
+        query = text.strip()
+        if query and self.symbol_index:
+            local_results = self.symbol_index.search(query)
+            if local_results:
+                self.show_search_results(local_results)
+        self.search_timer.start(300)
+
     def start_search(self):
             query = self.search_bar.text().strip()
+            self.search_generation += 1
+
+            # Annulla le ricerche superate (quelle per la stessa query restano valide)
+            for worker in list(self.search_workers):
+                if worker.query != query:
+                    self.worker_pool.cancel(worker)
+
             if not query:
                 self.search_results_list.hide()
                 return
+
+            # Risposta già in cache (o ricavabile da un prefisso non troncato): niente rete
+            if self.search_cache:
+                cached, complete = self.search_cache.lookup(query)
+                if cached is not None:
+                    if not cached and self.symbol_index:
+                        cached = self.symbol_index.search(query) # Come on_search_results
+                    self.show_search_results(cached)
+                    if complete:
+                        return
             
+            # Single-flight: la stessa query già in volo viene riutilizzata
+            for worker in self.search_workers:
+                if worker.query == query and self.worker_pool.is_active(worker) and not worker.isInterruptionRequested():
+                    worker.generation = self.search_generation
+                    return
+
             # --- MODIFICATO ---
-            self.search_worker = SearchWorker(query, self.http_session)
+            worker = SearchWorker(query, self.session_pool, generation=self.search_generation)
             
-            self.search_worker.results_ready.connect(self.show_search_results)
-            self.search_worker.error.connect(self.show_error)
-            self.search_worker.start()
+            worker.results_ready.connect(
+                lambda results, truncated, w=worker: self.on_search_results(w, results, truncated))
+            worker.error.connect(lambda message, w=worker: self.on_search_error(w, message))
+            self.search_workers.add(worker)
+            self.worker_pool.submit(worker, LANE_SEARCH, on_done=self._on_search_worker_finished)
+
+    def on_search_results(self, worker, results, truncated=False):
+        """Mostra i risultati solo se appartengono all'ultima ricerca."""
+        if self.search_cache:
+            self.search_cache.put(worker.query, results, truncated) # Anche se superata: utile al backspace
+        if self.symbol_index:
+            self.symbol_index.add(results) # L'indice locale cresce con ogni risposta
+        if worker.generation != self.search_generation:
+            return
+        if not results and self.symbol_index:
+            results = self.symbol_index.search(worker.query)
+        self.show_search_results(results)
+
+    def on_search_error(self, worker, message):
+        if worker.generation != self.search_generation:
+            return
+        if self.symbol_index and self.symbol_index.search(worker.query):
+            print(f"[Search] {message} (restano i risultati dell'indice locale)")
+            return
+        self.show_error(message)
+
+    def _on_search_worker_finished(self, worker):
+        self.search_workers.discard(worker)
 
     def show_search_results(self, results):
         self.search_results_list.clear()
@@ -816,13 +1380,13 @@ class MainWindow(QMainWindow):
         list_item.setData(Qt.ItemDataRole.UserRole, {'symbol': symbol, 'name': name})
         self.watchlist.addItem(list_item)
         self.save_settings()
+        self._sync_quote_symbols()
         self.watchlist.setCurrentItem(list_item)
         self.search_bar.clear()
         self.search_results_list.hide()
         
-        # Se siamo in vista 3, riavvia il news worker con i nuovi ticker
-        if self.current_view_mode == 3:
-            self.start_news_worker()
+        # In vista 3 il news worker segue la watchlist (aggiornato a caldo)
+        self.update_news_tickers()
 
     # --- Gestione UI (Modificato per Vista 3) ---
     
@@ -878,8 +1442,9 @@ class MainWindow(QMainWindow):
             # Flyout starts hidden, will show on hover or new news
             self.flyout_news_feed.update_geometry(force_hide=True)
             self.flyout_news_feed.hide()
-            # Riavvia il news worker con i ticker della watchlist
-            self.start_news_worker()
+        
+        # I ticker delle notizie dipendono dalla vista (watchlist in vista 3)
+        self.update_news_tickers()
         
         self.view_button.setIcon(self.style().standardIcon(icon_map.get(self.current_view_mode)))
 
@@ -901,11 +1466,11 @@ class MainWindow(QMainWindow):
                 self.news_tickers = new_settings.get('news_tickers', self.news_tickers)
                 self.ssl_verify = new_settings.get('ssl_verify', True) # <-- Leggi la nuova impostazione
                 
-                self.create_http_session() # <-- Ricrea la sessione con la nuova impostazione
+                self.create_http_session() # <-- Applica la nuova impostazione al pool di sessioni
                 
                 self.save_settings() # <-- Salva tutto
                 
-                self.start_news_worker()
+                self.update_news_tickers()
 
     def update_ui_states(self):
         """Aggiorna tutti i pulsanti (timeframe, tipo, indicatori, vista) all'avvio."""
@@ -918,6 +1483,20 @@ class MainWindow(QMainWindow):
             self.rsi_button.setChecked(rsi_active)
         self.apply_view_mode() # Applica la modalità di vista caricata
 
+    def get_news_worker_tickers(self):
+        """In vista 3 i ticker della watchlist (se ce ne sono), altrimenti news_tickers."""
+        if self.current_view_mode == 3:
+            watchlist_tickers = self.get_watchlist_tickers()
+            return watchlist_tickers if watchlist_tickers else self.news_tickers
+        return self.news_tickers
+
+    def update_news_tickers(self):
+        """Passa i ticker correnti al news worker senza riavviarlo (dedupe e intervalli restano)."""
+        if self.news_worker and self.news_worker.isRunning():
+            self.news_worker.set_tickers(self.get_news_worker_tickers())
+        else:
+            self.start_news_worker()
+
     def start_news_worker(self):
         """Avvia (o riavvia) il thread che recupera le notizie."""
         if self.news_worker and self.news_worker.isRunning():
@@ -925,19 +1504,120 @@ class MainWindow(QMainWindow):
             self.news_worker.wait()
         
         if news:
-            # In vista 3, usa i ticker della watchlist se disponibili, altrimenti usa news_tickers
-            if self.current_view_mode == 3:
-                watchlist_tickers = self.get_watchlist_tickers()
-                tickers_to_use = watchlist_tickers if watchlist_tickers else self.news_tickers
-            else:
-                tickers_to_use = self.news_tickers
-            
-            self.news_worker = NewsWorker(tickers_to_use, session=self.http_session)            
+            tickers_to_use = self.get_news_worker_tickers()
+            self.news_worker = NewsWorker(tickers_to_use, session_pool=self.session_pool, store=self.news_store,
+                                          seen_links=self.news_seen_links)
             self.news_worker.new_news_signal.connect(self.add_news_card)
+            self.news_worker.tickers_updated.connect(self.on_news_tickers_updated)
             self.news_worker.start()
         else:
             print("Impossibile avviare NewsWorker: modulo 'news.py' non trovato.")
 
+    def _news_panel_tickers(self, panel):
+        """Ticker mostrati da un pannello notizie: watchlist nel flyout (vista 3), news_tickers nella sidebar."""
+        if panel is self.flyout_news_feed:
+            return self.get_watchlist_tickers() or self.news_tickers
+        return self.news_tickers
+
+    def load_stored_news(self):
+        """Ripopola sidebar e flyout con le ultime notizie in archivio (con i loro trading signal)."""
+        if not self.news_store:
+            return
+        try:
+            for panel in (self.news_feed_sidebar, self.flyout_news_feed):
+                panel.set_cards(self.news_store.recent(tickers=self._news_panel_tickers(panel)))
+        except Exception as e:
+            print(f"[NewsStore] Impossibile leggere l'archivio: {e}")
+
+    def on_news_filter_changed(self, panel, text):
+        """Filtra un pannello sull'archivio: parole chiave, $TICKER, last:7d. Vuoto = ultime notizie."""
+        if not self.news_store:
+            return
+        query, tickers, since = news_store.parse_filter(text)
+        try:
+            items = self.news_store.search(query, tickers=tickers or self._news_panel_tickers(panel),
+                                           since=since)
+        except Exception as e:
+            print(f"[NewsStore] Errore nella ricerca '{text}': {e}")
+            return
+        panel.set_cards(items)
+
+    def start_prefetch(self):
+        """Scalda archivio e cache per tutti i ticker della watchlist in background."""
+        if self.prefetch_worker and self.worker_pool.is_active(self.prefetch_worker):
+            return
+        tickers = self.get_watchlist_tickers()
+        if not tickers:
+            return
+        self.prefetch_worker = PrefetchWorker(tickers, self.session_pool,
+                                              store=self.bar_store, cache=self.data_cache)
+        self.worker_pool.submit(self.prefetch_worker, LANE_PREFETCH)
+
+    def start_quote_stream(self):
+        """Avvia (o riavvia) lo stream delle quotazioni se configurato in 'quote_stream'."""
+        if self.quote_bridge:
+            self.quote_bridge.stop()
+            self.quote_bridge = None
+        if not quote_feed or not self.quote_stream:
+            return
+        try:
+            feed = quote_feed.create_feed(self.quote_stream)
+        except Exception as e:
+            print(f"AVVISO: Stream delle quotazioni non disponibile ({e}).")
+            return
+        interval = timeframes.BASE_SERIES['intraday']['interval'] if timeframes else '2m'
+        self.quote_bridge = QuoteStreamBridge(feed, quote_feed.interval_seconds(interval), parent=self)
+        self.quote_bridge.quotes_updated.connect(self.on_quotes_updated)
+        self.quote_bridge.start(self.get_watchlist_tickers())
+        print(f"[QuoteStream] Stream '{self.quote_stream}' avviato.")
+
+    def _sync_quote_symbols(self):
+        if self.quote_bridge:
+            self.quote_bridge.set_symbols(self.get_watchlist_tickers())
+
+    def on_quotes_updated(self, updates):
+        """Aggiornamenti aggregati dello stream: prezzi in watchlist e candela corrente."""
+        for i in range(self.watchlist.count()):
+            item = self.watchlist.item(i)
+            data = item.data(Qt.ItemDataRole.UserRole)
+            bar = updates.get(data['symbol'])
+            if bar:
+                item.setText(f"{data['symbol']}   {bar[4]:.2f}\n  {data['name']}")
+
+        bar = updates.get(self.current_ticker)
+        if bar is None or self.current_timeframe not in LIVE_TIMEFRAMES or not self._live_available():
+            return
+        base_key = timeframes.base_cache_key(self.current_ticker, self.current_timeframe)
+        base = self.data_cache.get(base_key)
+        if base is None or base.empty:
+            return
+        self.data_cache.put(base_key, quote_feed.merge_stream_bar(base, bar),
+                            ttl=data_cache.ttl_for_interval(base_key[2]))
+
+        # Il grafico si ridisegna al massimo una volta ogni QUOTE_CHART_MIN_S
+        if not self.stream_draw_scheduled:
+            self.stream_draw_scheduled = True
+            wait = max(0.0, QUOTE_CHART_MIN_S - (time.monotonic() - self.last_stream_draw))
+            QTimer.singleShot(int(wait * 1000), self._draw_stream_chart)
+
+    def _draw_stream_chart(self):
+        self.stream_draw_scheduled = False
+        if not self.current_ticker or self.current_timeframe not in LIVE_TIMEFRAMES:
+            return
+        base_key = timeframes.base_cache_key(self.current_ticker, self.current_timeframe)
+        base = self.data_cache.get(base_key)
+        view = timeframes.derive_view(base, self.current_timeframe) if base is not None else None
+        if view is None or view.empty:
+            return
+        for timeframe in LIVE_TIMEFRAMES:
+            if timeframe != self.current_timeframe:
+                self.data_cache.invalidate((self.current_ticker, timeframe))
+        bars = Bars.from_frame(view)
+        self.data_cache.put((self.current_ticker, self.current_timeframe), bars,
+                            ttl=data_cache.ttl_for_interval(base_key[2]))
+        self.last_stream_draw = time.monotonic()
+        self.plot_data(bars, self.current_ticker, keep_view=True)
+
     def get_watchlist_tickers(self):
         """Restituisce una lista di ticker dalla watchlist."""
         tickers = []
@@ -961,11 +1641,11 @@ class MainWindow(QMainWindow):
         """Slot per ricevere una nuova notizia. La invia alla sidebar corretta."""
         # Filtra le notizie per ticker della watchlist
         watchlist_tickers = self.get_watchlist_tickers()
-        news_ticker = news_item.get('ticker', '')
+        news_tickers = news_item.get('tickers') or [news_item.get('ticker', '')]
         
-        # Se la vista è 3, mostra solo notizie della watchlist
+        # Se la vista è 3, mostra solo notizie della watchlist (basta uno dei suoi ticker)
         if self.current_view_mode == 3:
-            if not watchlist_tickers or news_ticker not in watchlist_tickers:
+            if not watchlist_tickers or not any(ticker in watchlist_tickers for ticker in news_tickers):
                 return  # Ignora notizie non correlate alla watchlist
         
         # Prova a caricare il modello se non è già caricato
@@ -974,17 +1654,23 @@ class MainWindow(QMainWindow):
         # Avvia l'analisi della notizia in background
         if model_available and self.trading_model and self.trading_model.model:
             # --- MODIFICATO ---
-            analysis_worker = NewsAnalysisWorker(news_item.copy(), self.trading_model, session=self.http_session)
+            analysis_worker = NewsAnalysisWorker(news_item.copy(), self.trading_model, session_pool=self.session_pool)
             
             analysis_worker.analysis_complete.connect(self._on_news_analyzed)
-            analysis_worker.start()
-            self.analysis_workers.append(analysis_worker)
+            self.worker_pool.submit(analysis_worker, LANE_ANALYSIS)
         else:
             # Se il modello non è disponibile, aggiungi direttamente
             self._on_news_analyzed(news_item)
     
+    def on_news_tickers_updated(self, link, tickers):
+        """Un articolo già mostrato è stato trovato anche con altri ticker: aggiorna le card."""
+        self.news_feed_sidebar.update_tickers(link, tickers)
+        self.flyout_news_feed.update_tickers(link, tickers)
+
     def _on_news_analyzed(self, news_item):
         """Callback quando l'analisi della notizia è completata."""
+        if self.news_store and news_item.get('trading_signal'):
+            self.news_store.update_signal(news_item.get('link'), news_item['trading_signal'])
         # Aggiunge la notizia alla sidebar (vista 2) o al flyout (vista 3)
         if self.current_view_mode == 2:
             self.news_feed_sidebar.add_card(news_item)
@@ -1004,18 +1690,137 @@ class MainWindow(QMainWindow):
     def refresh_data(self):
             if not self.current_ticker:
                 return
+            # Ogni richiesta ha un ID: i risultati delle richieste precedenti non vengono disegnati
+            self.data_generation += 1
             # ... (codice per loading_label) ...
             timeframe_params = self.timeframe_map.get(self.current_timeframe, 
                                                     self.timeframe_map["1y"])
             
+            # Prima la cache in memoria: nessun thread né richiesta di rete
+            cache_key = (self.current_ticker, self.current_timeframe)
+            if self.data_cache:
+                cached = self.data_cache.get(cache_key)
+                if cached is None and timeframes:
+                    # La serie base è in memoria: la vista si deriva senza thread
+                    base_key = timeframes.base_cache_key(self.current_ticker, self.current_timeframe)
+                    base = self.data_cache.get(base_key) if base_key else None
+                    if base is not None:
+                        view = timeframes.derive_view(base, self.current_timeframe)
+                        if view is not None and not view.empty:
+                            cached = Bars.from_frame(view)
+                            self.data_cache.put(cache_key, cached,
+                                                ttl=data_cache.ttl_for_interval(base_key[2]))
+                if cached is not None:
+                    self._cancel_data_workers()
+                    self.plot_data(cached, self.current_ticker)
+                    return
+
+            # Le richieste per altri (ticker, timeframe) sono superate
+            self._cancel_data_workers(keep_key=cache_key)
+
+            # Single-flight: se la stessa richiesta è già in volo, se ne adotta il risultato
+            inflight = self.data_inflight.get(cache_key)
+            if inflight and self.worker_pool.is_active(inflight) and not inflight.isInterruptionRequested():
+                inflight.generation = self.data_generation
+                return
+
             # --- MODIFICATO ---
             # Passiamo la sessione curl_cffi unificata
-            self.data_worker = DataWorker(self.current_ticker, timeframe_params, self.http_session)
+            worker = DataWorker(self.current_ticker, timeframe_params, self.session_pool,
+                                store=self.bar_store, timeframe=self.current_timeframe,
+                                cache=self.data_cache, generation=self.data_generation)
             # --- FINE MODIFICA ---
             
-            self.data_worker.data_ready.connect(self.plot_data)
-            self.data_worker.error.connect(self.show_error)
-            self.data_worker.start()
+            worker.data_ready.connect(lambda data, ticker, w=worker: self.on_data_ready(w, data, ticker))
+            worker.error.connect(lambda message, w=worker: self.on_data_error(w, message))
+            self.data_inflight[cache_key] = worker
+            self.worker_pool.submit(worker, LANE_INTERACTIVE, on_done=self._on_data_worker_finished)
+
+    def _cancel_data_workers(self, keep_key=None):
+        """Chiede l'interruzione cooperativa dei DataWorker non più necessari."""
+        for key, worker in list(self.data_inflight.items()):
+            if key != keep_key:
+                self.worker_pool.cancel(worker)
+
+    def _on_data_worker_finished(self, worker):
+        key = (worker.ticker, worker.timeframe)
+        if self.data_inflight.get(key) is worker:
+            del self.data_inflight[key]
+
+    def on_data_ready(self, worker, bars, ticker):
+        """Salva in cache le barre appena scaricate e le disegna se la richiesta è ancora attuale."""
+        if self.data_cache:
+            interval = worker.timeframe_params.get("interval", "1d")
+            self.data_cache.put((worker.ticker, worker.timeframe), bars,
+                                ttl=data_cache.ttl_for_interval(interval))
+        if worker.generation != self.data_generation:
+            return # Risultato superato: resta in cache ma non sovrascrive il grafico
+        self.plot_data(bars, ticker)
+
+    def on_data_error(self, worker, message):
+        if worker.generation != self.data_generation:
+            return
+        self.show_error(message)
+
+    def _live_available(self):
+        return bool(timeframes and bar_store and self.data_cache)
+
+    def _update_live_mode(self):
+        """Avvia il timer live solo mentre è aperto un grafico intraday."""
+        if self._live_available() and self.current_ticker and self.current_timeframe in LIVE_TIMEFRAMES:
+            if not self.live_timer.isActive():
+                self.live_timer.start(LIVE_REFRESH_MS)
+        elif self.live_timer.isActive():
+            self.live_timer.stop()
+
+    def live_refresh(self):
+        """Tick del timer live: scarica solo le barre successive all'ultima mostrata."""
+        if not self.current_ticker or self.current_timeframe not in LIVE_TIMEFRAMES:
+            self.live_timer.stop()
+            return
+        if self.live_worker and self.worker_pool.is_active(self.live_worker):
+            return
+        if self.data_inflight:
+            return # È già in corso una richiesta completa
+        if market_session(self.current_ticker) == 'closed':
+            return # Mercato chiuso: niente barre nuove, il timer resta attivo e riprende all'apertura
+
+        base_key = timeframes.base_cache_key(self.current_ticker, self.current_timeframe)
+        base = self.data_cache.get(base_key)
+        if base is None or base.empty:
+            # Serie base uscita dalla cache: si riparte dal percorso normale (archivio + delta)
+            self.refresh_data()
+            return
+
+        worker = LiveUpdateWorker(self.current_ticker, self.current_timeframe, base, self.session_pool,
+                                  store=self.bar_store, generation=self.data_generation)
+        worker.update_ready.connect(
+            lambda data, ticker, changed, w=worker: self.on_live_update(w, data, ticker, changed))
+        worker.error.connect(lambda message: print(f"[LiveUpdate] {message}"))
+        self.live_worker = worker
+        self.worker_pool.submit(worker, LANE_INTERACTIVE)
+
+    def on_live_update(self, worker, base, ticker, changed):
+        """Aggiorna la serie base in cache e ridisegna solo se sono cambiate delle barre."""
+        base_key = timeframes.base_cache_key(worker.ticker, worker.timeframe)
+        ttl = data_cache.ttl_for_interval(base_key[2])
+        self.data_cache.put(base_key, base, ttl=ttl)
+        if not changed:
+            return
+
+        # Le altre viste derivate dalla stessa base sono ora superate
+        for timeframe in LIVE_TIMEFRAMES:
+            if timeframe != worker.timeframe:
+                self.data_cache.invalidate((worker.ticker, timeframe))
+        view = timeframes.derive_view(base, worker.timeframe)
+        if view is None or view.empty:
+            return
+        bars = Bars.from_frame(view)
+        self.data_cache.put((worker.ticker, worker.timeframe), bars, ttl=ttl)
+        if worker.generation != self.data_generation:
+            return # Nel frattempo è stato aperto un altro grafico
+        self.plot_data(bars, ticker, keep_view=True)
+
     def save_settings(self):
             watchlist_data = []
             for i in range(self.watchlist.count()):
@@ -1030,7 +1835,9 @@ class MainWindow(QMainWindow):
                 'indicators': self.indicators_state,
                 'view_mode': self.current_view_mode,
                 'news_tickers': self.news_tickers,
-                'ssl_verify': self.ssl_verify  # <-- Include l'impostazione SSL
+                'ssl_verify': self.ssl_verify,  # <-- Include l'impostazione SSL
+                'quote_stream': self.quote_stream,
+                'news_rate': self.news_rate
             }
             
             try:
@@ -1045,22 +1852,62 @@ class MainWindow(QMainWindow):
             row = self.watchlist.row(item)
             self.watchlist.takeItem(row)
         self.save_settings()
+        self._sync_quote_symbols()
         if self.watchlist.count() == 0:
             self.current_ticker = None
             self.stacked_widget.setCurrentWidget(self.stacked_widget.widget(0))
         
-        # Se siamo in vista 3, riavvia il news worker con i nuovi ticker
-        if self.current_view_mode == 3:
-            self.start_news_worker()
+        # In vista 3 il news worker segue la watchlist (aggiornato a caldo)
+        self.update_news_tickers()
 
     def show_error(self, message):
         self.loading_movie.stop()
         self.loading_label.setText(str(message))
         self.stacked_widget.setCurrentWidget(self.loading_widget)
 
-    def plot_data(self, data, ticker):
+    def _saved_view(self, ticker):
+        """
+        Zoom/pan dell'utente sul grafico corrente, ancorato ai timestamp delle
+        barre (le posizioni cambiano quando arrivano barre nuove). None se il
+        grafico mostra la vista completa o è di un altro ticker/timeframe.
+        """
+        canvas = self.chart_canvas
+        data = canvas.data
+        if (data is None or data.empty or canvas.default_xlim is None
+                or canvas.view_key != (ticker, self.current_timeframe)):
+            return None
+        xmin, xmax = canvas.ax_price.get_xlim()
+        if np.allclose((xmin, xmax), canvas.default_xlim):
+            return None
+        last = len(data) - 1
+        if xmax >= last:
+            # L'utente guarda l'ultima barra: la vista la segue, con la stessa ampiezza
+            return ('follow', xmax - xmin, xmax - last)
+        left = min(max(int(m.floor(xmin)), 0), last)
+        right = min(max(int(m.floor(xmax)), 0), last)
+        return ('fixed', data.ts[left], xmin - left, data.ts[right], xmax - right)
+
+    def _restore_view(self, view, bars):
+        """Riapplica una vista salvata da _saved_view alle barre appena disegnate."""
+        if view[0] == 'follow':
+            _, width, right_pad = view
+            xmax = len(bars) - 1 + right_pad
+            xmin = xmax - width
+        else:
+            _, left_ts, left_frac, right_ts, right_frac = view
+            xmin = np.searchsorted(bars.ts, left_ts) + left_frac
+            xmax = np.searchsorted(bars.ts, right_ts) + right_frac
+        if xmax > xmin:
+            self.chart_canvas.ax_price.set_xlim(xmin, xmax)
+
+    def plot_data(self, bars, ticker, keep_view=False):
+        """
+        Disegna le barre. Con keep_view (aggiornamenti live e stream) lo
+        zoom/pan dell'utente sullo stesso grafico viene mantenuto.
+        """
+        view = self._saved_view(ticker) if keep_view else None
         self.loading_movie.stop()
-        data = data.copy()
+        rsi_values = None
         self.chart_canvas.ax_price.clear()
         self.chart_canvas.ax_volume.clear()
         self.chart_canvas.ax_indicator.clear()
@@ -1068,12 +1915,14 @@ class MainWindow(QMainWindow):
         plt.setp(self.chart_canvas.ax_price.get_xticklabels(), visible=False)
         if rsi is not None and self.indicators_state.get('rsi', False):
             try:
-                rsi_plot_list = rsi.get_rsi_plot(data, ax_indicator=self.chart_canvas.ax_indicator)
+                rsi_values = rsi.calculate_rsi_values(bars.close)
+                rsi_plot_list = rsi.get_rsi_plot(rsi_values, ax_indicator=self.chart_canvas.ax_indicator)
                 add_plots.extend(rsi_plot_list)
                 self.chart_canvas.ax_indicator.set_visible(True)
                 plt.setp(self.chart_canvas.ax_volume.get_xticklabels(), visible=False)
             except Exception as e:
                 print(f"Errore calcolo RSI: {e}")
+                rsi_values = None
                 self.chart_canvas.ax_indicator.set_visible(False)
                 plt.setp(self.chart_canvas.ax_volume.get_xticklabels(), visible=True)
         else:
@@ -1086,7 +1935,7 @@ class MainWindow(QMainWindow):
             bbox=dict(boxstyle='round', facecolor='#1e1e1e', edgecolor='#444'),
             color='#dcdcdc', fontsize=10, visible=False
         )
-        self.chart_canvas.set_data(data, self.current_chart_type, self.current_timeframe) 
+        self.chart_canvas.set_data(bars, self.current_chart_type, self.current_timeframe, rsi_values)
         full_name = ""
         current_item = self.watchlist.currentItem()
         if current_item and current_item.data(Qt.ItemDataRole.UserRole)['symbol'] == ticker:
@@ -1096,7 +1945,8 @@ class MainWindow(QMainWindow):
             date_format = '%b %d %H:%M'
         else:
             date_format = '%Y-%m-%d'
-        mpf.plot(data,
+        # mplfinance vuole un DataFrame: lo si costruisce solo qui, dagli array delle barre
+        mpf.plot(bars.to_frame(),
                  type=self.current_chart_type,
                  style=custom_style,
                  ax=self.chart_canvas.ax_price,
@@ -1111,39 +1961,37 @@ class MainWindow(QMainWindow):
         self.chart_canvas.ax_volume.set_ylabel('Volume')
         title_str = f'{full_name} ({ticker}) - {self.current_timeframe} ({self.current_chart_type.capitalize()})'
         self.chart_canvas.ax_price.set_title(title_str)
+        self.chart_canvas.view_key = (ticker, self.current_timeframe)
+        self.chart_canvas.default_xlim = self.chart_canvas.ax_price.get_xlim()
+        if view is not None:
+            self._restore_view(view, bars)
         self.chart_canvas.draw()
         self.stacked_widget.setCurrentWidget(self.chart_canvas)
         self.chart_canvas.on_xlim_changed(self.chart_canvas.ax_price)
+        self._update_live_mode()
 
     def create_http_session(self):
-            """Crea o aggiorna la sessione HTTP condivisa in base alle impostazioni SSL."""
-            if self.http_session:
-                self.http_session.close()
-                
-            # Rimuovi la logica di self.curl_session, non è più necessaria
-            
+            """Crea il pool di sessioni HTTP o vi applica a caldo le nuove impostazioni SSL."""
             if not CurlSession:
                 print("ERRORE CRITICO: curl_cffi non è installato. Le richieste di rete falliranno.")
-                self.http_session = requests.Session() # Fallback
-                self.http_session.verify = self.ssl_verify
-                return
 
-            # --- MODALITÀ UNIFICATA con curl_cffi ---
-            # Usiamo la sessione che impersona Chrome per TUTTE le richieste
-            print("Creazione sessione curl_cffi (impersonate='chrome110')...")
-            self.http_session = CurlSession(impersonate="chrome110")
+            if self.session_pool:
+                # Le sessioni in uso finiscono la loro richiesta e vengono chiuse al rilascio
+                self.session_pool.configure(verify=self.ssl_verify)
+            else:
+                # --- MODALITÀ UNIFICATA con curl_cffi ---
+                # Sessioni che impersonano Chrome per TUTTE le richieste, una per worker
+                print("Creazione pool di sessioni curl_cffi (impersonate='chrome110')...")
+                self.session_pool = SessionPool(verify=self.ssl_verify)
             
             if self.ssl_verify:
                 # --- MODALITÀ SICURA ---
-                self.http_session.verify = True 
                 print("Verifica SSL abilitata (Modalità Sicura).")
                 if 'HF_HUB_DISABLE_CERT_CHECK' in os.environ:
                     del os.environ['HF_HUB_DISABLE_CERT_CHECK']
                     
             else:
                 # --- MODALITÀ INSICURA ---
-                self.http_session.verify = False # Per curl_cffi
-                
                 # Per transformers (model.py)
                 os.environ['HF_HUB_DISABLE_CERT_CHECK'] = '1'
 
@@ -1171,9 +2019,18 @@ class MainWindow(QMainWindow):
             
             # --- MODIFICATO ---
             self.ssl_verify = settings.get('ssl_verify', True) # <-- Carica l'impostazione
+            self.quote_stream = settings.get('quote_stream') # Stream quotazioni (opzionale)
+            self.news_rate = settings.get('news_rate')
             
             # Carica watchlist
-            # ... (codice watchlist invariato) ...
+            for data in settings.get('watchlist', []):
+                if not isinstance(data, dict) or not data.get('symbol'):
+                    continue
+                symbol = data['symbol']
+                name = data.get('name', 'No Name')
+                list_item = QListWidgetItem(f"{symbol}\n  {name}")
+                list_item.setData(Qt.ItemDataRole.UserRole, {'symbol': symbol, 'name': name})
+                self.watchlist.addItem(list_item)
             
         except FileNotFoundError:
             pass 
@@ -1183,14 +2040,41 @@ class MainWindow(QMainWindow):
         # --- AGGIUNTO ALLA FINE ---
         # Crea la sessione DOPO aver caricato le impostazioni
         self.create_http_session()
+        if news:
+            # Budget delle notizie allineato ai thread di news.py
+            news.configure_rate(self.news_rate or news.DEFAULT_NEWS_RATE)
             
     # --- Gestione chiusura finestra ---
     def closeEvent(self, event):
         """Assicura che i thread in background vengano chiusi."""
         print("Chiusura dell'applicazione... Arresto dei worker.")
+        if self.data_cache:
+            print(f"[DataCache] Statistiche: {self.data_cache.stats()}")
+        self.prefetch_timer.stop()
+        self.live_timer.stop()
+        if self.symbol_index:
+            self.symbol_index.save()
+        if self.search_cache:
+            print(f"[SearchCache] Statistiche: {self.search_cache.stats()}")
+        if self.quote_bridge:
+            print(f"[QuoteStream] Statistiche: {self.quote_bridge.aggregator.stats()}")
+            self.quote_bridge.stop()
         if self.news_worker:
             self.news_worker.stop()
             self.news_worker.wait()
+        print(f"[NewsDedupe] Statistiche: {self.news_seen_links.stats()}")
+        if self.news_store:
+            print(f"[NewsStore] Statistiche: {self.news_store.stats()}")
+        if self.trading_model:
+            # Prima del pool: i worker in attesa di un lotto vengono sbloccati subito
+            self.trading_model.stop_inference_service()
+        self.worker_pool.shutdown()
+        print(f"[WorkerPool] Statistiche: {self.worker_pool.stats()}")
+        if rate_limit:
+            print(f"[RateLimit] Statistiche: {rate_limit.default_limiter.stats()}")
+        if self.session_pool:
+            print(f"[SessionPool] Statistiche: {self.session_pool.stats()}")
+            self.session_pool.close()
         event.accept()
 class ModelLoaderWorker(QThread):
     """Carica il pesante modello AI in un thread separato."""
@@ -12,6 +12,7 @@ mpl_data_path = matplotlib.get_data_path()
 added_files = [
     ('icon.ico', '.'),     # icon.ico is correct
     ('spinner.gif', '.'),   
+    ('symbols.json', '.'),  # Elenco iniziale dell'indice dei simboli (symbol_index.py)
     (mpl_data_path, 'mpl-data') 
 ]
 
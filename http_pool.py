@@ -0,0 +1,153 @@
+import threading
+from contextlib import contextmanager
+
+try:
+    # Sessione che impersona Chrome (richiesta da yfinance)
+    from curl_cffi.requests import Session as CurlSession
+except ImportError:
+    CurlSession = None
+import requests
+
+# --- POOL DI SESSIONI HTTP ---
+# Le chiamate dirette (session.get di ricerca e check_url) prendono in
+# prestito una sessione tutta sua e la restituiscono a fine richiesta: le
+# connessioni keep-alive (HTTP/2 con l'impersonate di Chrome) e l'handshake
+# TLS vengono riutilizzati dal worker successivo.
+#
+# yfinance invece tiene un solo oggetto dati per processo (YfData) e ogni
+# yf.Ticker(session=...) / yf.download(session=...) ne sostituisce la
+# sessione: sessioni diverse per worker non resterebbero isolate e una
+# sessione chiusa dal pool potrebbe essere ancora in uso. Per yfinance c'è
+# quindi una sola sessione di lunga durata (yfinance_session), fuori dal
+# pool, chiusa solo da close().
+
+DEFAULT_IMPERSONATE = "chrome110"
+DEFAULT_MAX_IDLE = 8
+
+
+class SessionPool:
+    """
+    Pool thread-safe di sessioni curl_cffi (o requests come fallback).
+    configure() cambia le impostazioni SSL a caldo: le sessioni libere vengono
+    chiuse subito, quelle in uso solo quando il worker le restituisce.
+    """
+    def __init__(self, verify=True, impersonate=DEFAULT_IMPERSONATE, max_idle=DEFAULT_MAX_IDLE):
+        self.verify = verify
+        self.impersonate = impersonate
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle = [] # (generation, session), LIFO: la più "calda" per prima
+        self._generation = 0
+        self._in_use = 0
+        self._yf_session = None # Sessione unica per yfinance (vedi yfinance_session)
+        self.created = 0
+        self.reused = 0
+        self.leases = 0
+        self.closed = 0
+
+    def _new_session(self):
+        if CurlSession:
+            session = CurlSession(impersonate=self.impersonate)
+        else:
+            session = requests.Session()
+        session.verify = self.verify
+        return session
+
+    def configure(self, verify):
+        """Applica una nuova impostazione SSL senza interrompere le richieste in corso."""
+        with self._lock:
+            self.verify = verify
+            self._generation += 1
+            stale = [session for _, session in self._idle]
+            self._idle.clear()
+            if self._yf_session is not None:
+                # Può essere in uso da yfinance in un altro thread: si cambia solo l'impostazione
+                self._yf_session.verify = verify
+        for session in stale:
+            self._close(session)
+
+    def acquire(self):
+        """Prende in prestito una sessione (da restituire con release)."""
+        with self._lock:
+            self.leases += 1
+            self._in_use += 1
+            while self._idle:
+                generation, session = self._idle.pop()
+                if generation == self._generation:
+                    self.reused += 1
+                    return generation, session
+                self._close(session)
+            generation = self._generation
+            self.created += 1
+        try:
+            return generation, self._new_session()
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+            raise
+
+    def release(self, generation, session):
+        """Restituisce la sessione al pool (o la chiude se le impostazioni sono cambiate)."""
+        with self._lock:
+            self._in_use -= 1
+            if generation == self._generation and len(self._idle) < self.max_idle:
+                self._idle.append((generation, session))
+                return
+        self._close(session)
+
+    @contextmanager
+    def session(self):
+        """Context manager: `with pool.session() as session: ...`"""
+        generation, session = self.acquire()
+        try:
+            yield session
+        finally:
+            self.release(generation, session)
+
+    def yfinance_session(self):
+        """
+        La sessione da passare a yf.Ticker / yf.download. Sempre la stessa,
+        perché yfinance la condivide comunque tra tutti i thread; non viene
+        mai chiusa da release() o configure().
+        """
+        with self._lock:
+            if self._yf_session is None:
+                self._yf_session = self._new_session()
+                self.created += 1
+            return self._yf_session
+
+    def create_session(self):
+        """Sessione dedicata fuori dal pool (per oggetti che la tengono a lungo)."""
+        return self._new_session()
+
+    def _close(self, session):
+        try:
+            session.close()
+        except Exception:
+            pass
+        self.closed += 1
+
+    def close(self):
+        """Chiude tutte le sessioni libere e quella di yfinance (alla chiusura dell'applicazione)."""
+        with self._lock:
+            idle = [session for _, session in self._idle]
+            self._idle.clear()
+            if self._yf_session is not None:
+                idle.append(self._yf_session)
+                self._yf_session = None
+        for session in idle:
+            self._close(session)
+
+    def stats(self):
+        """Restituisce i contatori di riutilizzo delle sessioni/connessioni."""
+        with self._lock:
+            return {
+                'created': self.created,
+                'reused': self.reused,
+                'leases': self.leases,
+                'closed': self.closed,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'reuse_rate': (self.reused / self.leases) if self.leases else 0.0,
+                'verify': self.verify,
+            }
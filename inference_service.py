@@ -0,0 +1,180 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# --- SERVIZIO DI INFERENZA A LOTTI ---
+# Un solo thread possiede il modello: i worker di analisi gli consegnano i
+# prompt e aspettano il risultato (Future). Le richieste in attesa vengono
+# unite in un lotto e generate con una sola chiamata (model.generate con
+# padding a sinistra, vedi TradingModel._get_llm_responses).
+# Su CPU il costo di una generazione è dominato dalla lettura dei pesi a ogni
+# token, quasi uguale per 1 o per 4 sequenze: durante un burst di notizie i
+# titoli analizzati al minuto si moltiplicano, invece di far competere più
+# thread sugli stessi pesi.
+
+DEFAULT_MAX_BATCH = 4 # Come il numero massimo di worker nella corsia di analisi (worker_pool.py)
+DEFAULT_MAX_WAIT = 0.2 # Secondi di attesa dopo la prima richiesta per riempire il lotto
+
+
+class InferenceService(threading.Thread):
+    """
+    Esegue generate_batch(prompts) -> risposte (stesso ordine) su lotti di
+    al più max_batch prompt. Thread-safe: submit() da qualsiasi thread.
+    """
+    def __init__(self, generate_batch, max_batch=DEFAULT_MAX_BATCH, max_wait=DEFAULT_MAX_WAIT,
+                 name="InferenceService"):
+        super().__init__(name=name, daemon=True)
+        self.generate_batch = generate_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._requests = queue.Queue()
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+        self.largest_batch = 0
+        self.busy_s = 0.0
+
+    @property
+    def running(self):
+        return self.is_alive() and not self._stop_event.is_set()
+
+    def submit(self, prompt):
+        """Accoda un prompt. Restituisce un Future con la risposta."""
+        if self._stop_event.is_set():
+            raise RuntimeError("Servizio di inferenza fermato.")
+        future = Future()
+        self._requests.put((prompt, future))
+        return future
+
+    def generate(self, prompt, timeout=None):
+        """Accoda il prompt e aspetta la risposta (dal lotto in cui finisce)."""
+        return self.submit(prompt).result(timeout)
+
+    def generate_many(self, prompts, timeout=None):
+        """Più prompt in una volta: finiscono negli stessi lotti. Risposte nello stesso ordine."""
+        futures = [self.submit(prompt) for prompt in prompts]
+        return [future.result(timeout) for future in futures]
+
+    def stop(self, timeout=1.0):
+        """Ferma il servizio: le richieste ancora in coda falliscono subito (RuntimeError)."""
+        self._stop_event.set()
+        self._fail_pending()
+        self._requests.put(None) # Sveglia il thread se è in attesa
+        if self.is_alive():
+            self.join(timeout)
+
+    def _fail_pending(self):
+        while True:
+            try:
+                request = self._requests.get_nowait()
+            except queue.Empty:
+                return
+            if request is not None and request[1].set_running_or_notify_cancel():
+                request[1].set_exception(RuntimeError("Servizio di inferenza fermato."))
+
+    def _collect(self, first):
+        """Il lotto che parte con `first`: le richieste già in coda più quelle entro max_wait."""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                request = self._requests.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if request is None:
+                break
+            batch.append(request)
+        return batch
+
+    def run(self):
+        while not self._stop_event.is_set():
+            request = self._requests.get()
+            if request is None or self._stop_event.is_set():
+                break
+            batch = [(prompt, future) for prompt, future in self._collect(request)
+                     if future.set_running_or_notify_cancel()] # Niente lavoro per chi ha rinunciato
+            if batch:
+                self._run_batch(batch)
+        self._fail_pending()
+
+    def _run_batch(self, batch):
+        start = time.perf_counter()
+        try:
+            responses = self.generate_batch([prompt for prompt, _ in batch])
+            if len(responses) != len(batch):
+                raise ValueError(f"{len(responses)} risposte per {len(batch)} prompt")
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            self.busy_s += elapsed
+        for (_, future), response in zip(batch, responses):
+            future.set_result(response)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'items': self.items,
+                'avg_batch': round(self.items / self.batches, 2) if self.batches else None,
+                'largest_batch': self.largest_batch,
+                'errors': self.errors,
+                'busy_s': round(self.busy_s, 2),
+                'items_per_min': round(self.items / self.busy_s * 60, 1) if self.busy_s else None,
+                'pending': self._requests.qsize(),
+            }
+
+
+# --- ESECUZIONE (per testare questo file) ---
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Modello simulato: costo fisso per lotto (lettura dei pesi) più un piccolo costo per sequenza.
+    # I valori reali dipendono dalla CPU: qui conta il confronto tra lotti di 1 e lotti pieni.
+    BATCH_COST = 0.20
+    ITEM_COST = 0.03
+    model_lock = threading.Lock()
+
+    def fake_generate_batch(prompts):
+        with model_lock: # Un solo generate alla volta, come i pesi condivisi di un modello vero
+            time.sleep(BATCH_COST + ITEM_COST * len(prompts))
+        return [f"risposta a {prompt}" for prompt in prompts]
+
+    def burst(n_headlines, n_workers, analyze):
+        """n_headlines titoli in arrivo insieme, analizzati da n_workers thread (la corsia di analisi)."""
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            results = list(executor.map(analyze, [f"titolo {i}" for i in range(n_headlines)]))
+        assert results == [f"risposta a titolo {i}" for i in range(n_headlines)]
+        return time.perf_counter() - start
+
+    n_headlines = 24
+    elapsed = burst(n_headlines, 1, lambda prompt: fake_generate_batch([prompt])[0])
+    print(f"{'Un prompt alla volta':<30} {n_headlines / elapsed * 60:6.1f} titoli/min")
+    elapsed = burst(n_headlines, 4, lambda prompt: fake_generate_batch([prompt])[0])
+    print(f"{'4 thread sullo stesso modello':<30} {n_headlines / elapsed * 60:6.1f} titoli/min")
+    for max_batch in (4, 8):
+        service = InferenceService(fake_generate_batch, max_batch=max_batch)
+        service.start()
+        elapsed = burst(n_headlines, max_batch, service.generate)
+        print(f"{f'Lotti da {max_batch}':<30} {n_headlines / elapsed * 60:6.1f} titoli/min  {service.stats()}")
+        service.stop()
+
+    # Arresto: le richieste in coda falliscono invece di restare appese
+    service = InferenceService(fake_generate_batch, max_batch=2)
+    service.start()
+    futures = [service.submit(f"titolo {i}") for i in range(10)]
+    time.sleep(0.05)
+    service.stop()
+    failed = sum(1 for future in futures if future.exception(timeout=2) is not None)
+    print(f"Dopo stop(): {failed}/10 richieste fallite subito, {10 - failed} completate.")
@@ -2,8 +2,9 @@ import sys
 import torch
 # from transformers import AutoTokenizer, AutoModelForCausalLM  <-- RIMOSSO
 # import requests <-- RIMOSSO
-from bs4 import BeautifulSoup
-import re
+import article_extract # Estrazione veloce del testo (BeautifulSoup solo come ripiego)
+import threading
+from inference_service import InferenceService, DEFAULT_MAX_BATCH # Generazione a lotti per i worker di analisi
 import os
 
 # --- AGGIUNGI QUESTO BLOCCO ---
@@ -15,6 +16,15 @@ except ImportError:
     CurlSession = None
     import requests # Fallback
 
+try:
+    import rate_limit # Rate limiter condiviso con graph.py
+except ImportError:
+    rate_limit = None
+try:
+    import article_cache # Cache su disco del testo degli articoli
+except ImportError:
+    article_cache = None
+
 # Variabile globale per il lazy loading
 transformers = None
 # --- AVVERTIMENTO DI SICUREZZA ---
@@ -39,6 +49,12 @@ class TradingModel:
             
             global transformers # Usiamo la variabile globale
 
+            # Testo degli articoli già letti: check_url non torna in rete per lo stesso articolo
+            self.article_cache = article_cache.ArticleCache() if article_cache else None
+            # Un solo generate alla volta; con il servizio avviato i prompt dei worker vanno a lotti
+            self._generate_lock = threading.Lock()
+            self.inference = None
+
             if session:
                 self.session = session
             else:
@@ -65,6 +81,11 @@ class TradingModel:
                 
                 # Ora caricherà i file dalla cartella ./model
                 self.tokenizer = transformers.AutoTokenizer.from_pretrained(model_id)
+                # Lotti di prompt di lunghezza diversa: padding a sinistra, così la generazione
+                # continua subito dopo l'ultimo token vero di ogni prompt
+                self.tokenizer.padding_side = "left"
+                if self.tokenizer.pad_token is None:
+                    self.tokenizer.pad_token = self.tokenizer.eos_token
                 self.model = transformers.AutoModelForCausalLM.from_pretrained(
                     model_id,
                     device_map="cpu", 
@@ -80,39 +101,73 @@ class TradingModel:
                 self.model = None
                 self.tokenizer = None
 
+    def start_inference_service(self, max_batch=None, max_wait=None):
+        """Avvia il thread che raccoglie i prompt dei worker in lotti (vedi inference_service.py)."""
+        if not self.model or (self.inference is not None and self.inference.running):
+            return self.inference
+        options = {key: value for key, value in (('max_batch', max_batch), ('max_wait', max_wait))
+                   if value is not None}
+        self.inference = InferenceService(self._get_llm_responses, name="TradingModelInference", **options)
+        self.inference.start()
+        print(f"[Model.py] Servizio di inferenza a lotti avviato (fino a {self.inference.max_batch} prompt per generate).")
+        return self.inference
+
+    def stop_inference_service(self):
+        """Ferma il servizio: le richieste in coda falliscono, i prossimi prompt tornano diretti."""
+        if self.inference is not None:
+            print(f"[Model.py] Servizio di inferenza: {self.inference.stats()}")
+            self.inference.stop()
+            self.inference = None
+
     def _get_llm_response(self, formatted_prompt):
         """Funzione helper interna per generare una risposta."""
         if not self.model or not self.tokenizer:
             return "Errore: Modello non caricato."
+        inference = self.inference
+        if inference is not None and inference.running:
+            # Il servizio unisce questo prompt a quelli degli altri worker in un solo generate
+            return inference.generate(formatted_prompt)
+        return self._get_llm_responses([formatted_prompt])[0]
 
-        # Prepara l'input per il modello
-        inputs = self.tokenizer(formatted_prompt, return_tensors="pt").to(self.model.device)
+    def _get_llm_responses(self, formatted_prompts):
+        """Genera le risposte di più prompt con un solo generate (padding a sinistra + attention mask)."""
+        if not self.model or not self.tokenizer:
+            return ["Errore: Modello non caricato."] * len(formatted_prompts)
+
+        # Prepara l'input per il modello: input_ids e attention_mask (0 sul padding)
+        inputs = self.tokenizer(list(formatted_prompts), return_tensors="pt", padding=True).to(self.model.device)
 
         # Genera la risposta
-        print("[Model.py] ...Il modello sta pensando (questo richiederà tempo su CPU)...")
-        with torch.no_grad(): # Disabilita il calcolo del gradiente per risparmiare risorse
+        print(f"[Model.py] ...Il modello sta pensando su {len(formatted_prompts)} prompt (questo richiederà tempo su CPU)...")
+        with self._generate_lock, torch.no_grad(): # Disabilita il calcolo del gradiente per risparmiare risorse
             outputs = self.model.generate(
                 **inputs, 
                 max_new_tokens=150, 
-                pad_token_id=self.tokenizer.eos_token_id
+                pad_token_id=self.tokenizer.pad_token_id
             )
         print("[Model.py] ...Risposta generata.")
         
-        # Decodifica l'output
-        response_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-        
-        # Pulisci l'output (rimuovi il prompt originale)
-        clean_response = response_text.replace(formatted_prompt, "").strip()
-        
-        if "ASSISTANT:" in clean_response:
-            clean_response = clean_response.split("ASSISTANT:")[-1].strip()
-            
-        return clean_response
+        # Decodifica solo i token generati (il prompt, padding compreso, occupa le prime colonne)
+        prompt_length = inputs['input_ids'].shape[1]
+        responses = []
+        for output in outputs:
+            clean_response = self.tokenizer.decode(output[prompt_length:], skip_special_tokens=True).strip()
+            if "ASSISTANT:" in clean_response:
+                clean_response = clean_response.split("ASSISTANT:")[-1].strip()
+            responses.append(clean_response)
+        return responses
 
-    def check_url(self, url, session=None):
+    def check_url(self, url, session=None, content_hash=None):
         """
         Visita un URL, estrae il testo principale e lo pulisce per l'LLM.
+        Il testo già estratto (stesso link o stessa impronta content_hash
+        della notizia) viene letto dalla cache su disco, senza rete.
         """
+        if self.article_cache:
+            cached = self.article_cache.get(url, content_hash=content_hash)
+            if cached is not None:
+                print(f"[Model.py] URL dalla cache articoli: {url} ({len(cached)} caratteri).")
+                return cached
         # --- Scegli la sessione da usare ---
         active_session = session if session else self.session
         print(f"[Model.py] Controllo URL: {url}")
@@ -120,26 +175,20 @@ class TradingModel:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         try:
-            response = active_session.get(url, headers=headers, timeout=10)            
+            if rate_limit:
+                response = rate_limit.limited_call('article', active_session.get, url,
+                                                   host=rate_limit.default_limiter.host_for('article', url),
+                                                   headers=headers, timeout=10)
+            else:
+                response = active_session.get(url, headers=headers, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            for script_or_style in soup(["script", "style", "nav", "footer", "header"]):
-                script_or_style.decompose()
-
-            text = soup.get_text()
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = '\n'.join(chunk for chunk in chunks if chunk)
-            
-            text = re.sub(r'\n{3,}', '\n\n', text)
-            
-            max_length = 2000
-            if len(text) > max_length:
-                text = text[:max_length] + "... (testo troncato)"
+            # Solo il corpo dell'articolo, fino a 2000 caratteri (vedi article_extract.py)
+            text = article_extract.extract_text(response.text, max_chars=2000)
                 
             print(f"[Model.py] URL letto e pulito. Lunghezza testo: {len(text)} caratteri.")
+            if self.article_cache:
+                self.article_cache.put(url, text, content_hash=content_hash)
             return text
 
         except requests.RequestException as e:
@@ -149,6 +198,24 @@ class TradingModel:
             print(f"[Model.py] Errore during il parsing dell'HTML: {e}")
             return None
 
+    def news_text(self, news_item, session_pool=None):
+        """
+        Testo da analizzare per una notizia: il suo 'text' (il titolo, vedi news.py),
+        l'articolo scaricato solo se manca, infine il titolo. Usato sia dalla GUI
+        (NewsAnalysisWorker) sia da news_daemon.py: lo stesso articolo riceve lo
+        stesso segnale nel NewsStore chiunque lo analizzi.
+        """
+        text = news_item.get('text', '')
+        link = news_item.get('link', '')
+        if not text and link:
+            content_hash = news_item.get('content_hash')
+            if session_pool:
+                with session_pool.session() as session:
+                    text = self.check_url(link, session=session, content_hash=content_hash)
+            else:
+                text = self.check_url(link, content_hash=content_hash)
+        return text or news_item.get('title', '')
+
     def analyze_sentiment(self, text_content):
         """
         Analizza il sentiment di un testo.
@@ -200,14 +267,43 @@ ASSISTANT:
         stop_loss, take_profit
         """
         if not text_content:
-            return {
-                'direction': 'NEUTRAL',
-                'confidence': 0,
-                'stop_loss': None,
-                'take_profit': None
-            }
-        
-        prompt = f"""You are a financial analyst. Analyze the following news article and provide a trading signal.
+            return self._empty_signal()
+        response = self._get_llm_response(self._trading_signal_prompt(text_content, ticker))
+        return self._parse_trading_signal(response, text_content)
+
+    def analyze_trading_signals(self, items):
+        """
+        Come analyze_trading_signal per più notizie insieme: items è una lista di
+        (testo, ticker), i prompt vengono generati a lotti. Segnali nello stesso ordine.
+        """
+        signals = [None] * len(items)
+        pending = [(i, text, ticker) for i, (text, ticker) in enumerate(items) if text]
+        prompts = [self._trading_signal_prompt(text, ticker) for _, text, ticker in pending]
+        inference = self.inference
+        if not prompts:
+            responses = []
+        elif inference is not None and inference.running:
+            responses = inference.generate_many(prompts)
+        else:
+            responses = []
+            for start in range(0, len(prompts), DEFAULT_MAX_BATCH):
+                responses += self._get_llm_responses(prompts[start:start + DEFAULT_MAX_BATCH])
+        for (i, text, _), response in zip(pending, responses):
+            signals[i] = self._parse_trading_signal(response, text)
+        return [signal or self._empty_signal() for signal in signals]
+
+    @staticmethod
+    def _empty_signal():
+        return {
+            'direction': 'NEUTRAL',
+            'confidence': 0,
+            'stop_loss': None,
+            'take_profit': None
+        }
+
+    @staticmethod
+    def _trading_signal_prompt(text_content, ticker=None):
+        return f"""You are a financial analyst. Analyze the following news article and provide a trading signal.
 Respond in JSON format with these exact fields:
 - "direction": "BULLISH" or "BEARISH" or "NEUTRAL"
 - "confidence": a number between 0 and 100
@@ -221,8 +317,9 @@ Ticker: {ticker or "N/A"}
 
 ASSISTANT:
 """
-        response = self._get_llm_response(prompt)
-        
+
+    def _parse_trading_signal(self, response, text_content):
+        """Segnale dalla risposta JSON del modello (o, se non è valida, dal sentiment)."""
         # Prova a estrarre JSON dalla risposta
         import json
         import re
@@ -1,84 +1,301 @@
 import yfinance as yf
 import time
 from datetime import datetime
-import sys # Aggiunto per il test
+import heapq
+import hashlib
+import itertools
+import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dedupe import RotatingDedupe # Deduplicazione a memoria costante (NewsFeed)
+from news_scheduler import NewsScheduler # Intervallo di polling per ticker (NewsFeed)
+try:
+    import rate_limit # Rate limiter condiviso con graph.py
+except ImportError:
+    rate_limit = None
 
 # --- 1. YAHOO FINANCE NEWS (CON FILTRI E PARSING CORRETTI) ---
 
-def get_yfinance_news(tickers, session=None):
+DEFAULT_MAX_WORKERS = 8 # Ticker scaricati in parallelo (il rate limiter resta il vero tetto)
+DEFAULT_NEWS_RATE = 4.0 # Richieste al secondo all'endpoint news (vedi configure_rate)
+DEFAULT_MAX_HOLD = 0.5 # Secondi massimi (circa) in cui iter_news trattiene una notizia per riordinarla
+DEFAULT_MAX_BUFFER = 50 # Notizie massime nel buffer di riordino di iter_news
+RECENT_ARTICLES = 5000 # Articoli emessi di cui NewsFeed ricorda link e ticker (unioni tardive)
+INITIAL_PER_TICKER = 3 # Notizie emesse per ticker al suo primo controllo (None = tutte, 0 = nessuna)
+
+# Parametri dei link che non cambiano l'articolo (tracciamento, provenienza)
+TRACKING_PARAMS = ('utm_', '.tsrc', 'ncid', 'guccounter', 'guce_', 'soc_', 'yptr', 'cmpid', 'fbclid', 'gclid')
+_TITLE_WORD_RE = re.compile(r"\w+")
+
+
+def canonical_url(url):
+    """Link senza parametri di tracciamento né frammento: lo stesso articolo ha sempre lo stesso link."""
+    parts = urlsplit(url.strip())
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if not key.lower().startswith(TRACKING_PARAMS)]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/') or '/',
+                       urlencode(sorted(query)), ''))
+
+
+def content_hash(title, publisher, timestamp):
+    """Impronta del contenuto (titolo normalizzato, editore, data): lo stesso articolo sotto link diversi."""
+    words = " ".join(_TITLE_WORD_RE.findall((title or '').lower()))
+    raw = f"{words}|{(publisher or '').lower()}|{timestamp.isoformat() if timestamp else ''}"
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def article_keys(item):
+    """Chiavi che identificano un articolo: link canonico e impronta del contenuto."""
+    return [key for key in (item.get('link'), item.get('content_hash')) if key]
+
+
+def check_new_article(seen, item):
+    """True se nessuna chiave dell'articolo è in `seen` (es. RotatingDedupe). Le registra tutte."""
+    results = [seen.check_and_add(key) for key in article_keys(item)]
+    return bool(results) and all(results)
+
+
+def merge_tickers(target, item):
+    """Aggiunge a target i ticker di item (stesso articolo). Restituisce i ticker aggiunti."""
+    added = [ticker for ticker in item.get('tickers') or [item.get('ticker')]
+             if ticker and ticker not in target['tickers']]
+    target['tickers'].extend(added)
+    return added
+
+
+def merge_articles(items):
+    """Unisce le notizie dello stesso articolo arrivate da ticker diversi (una sola, con tutti i ticker)."""
+    merged, by_key = [], {}
+    for item in items:
+        target = next((by_key[key] for key in article_keys(item) if key in by_key), None)
+        if target is None:
+            merged.append(item)
+            target = item
+        else:
+            merge_tickers(target, item)
+        for key in article_keys(item):
+            by_key[key] = target
+    return merged
+
+def _parse_news_item(news_item, ticker):
+    """Normalizza una notizia di yfinance. Restituisce None se manca un'informazione chiave."""
+    # --- FIX: Leggi dal dizionario 'content' annidato ---
+    content = news_item.get('content')
+    if not content:
+        return None
+
+    pub_date_str = content.get('pubDate')
+    title = content.get('title')
+    
+    # Prova a ottenere il link da 'clickThroughUrl', altrimenti da 'canonicalUrl'
+    link_data = content.get('clickThroughUrl') or content.get('canonicalUrl')
+    link = link_data.get('url') if link_data else None
+
+    # Salta questa notizia se manca un'informazione chiave
+    if not title or not pub_date_str or not link:
+        return None
+    # --- FINE FIX ---
+    
+    # Converti la data da stringa ISO (es. '2025-11-04T00:31:05Z')
+    try:
+        # Rimuovi la 'Z' (UTC) per compatibilità
+        timestamp = datetime.fromisoformat(pub_date_str.replace('Z', ''))
+    except ValueError:
+        # Salta se il formato data è strano
+        return None
+    
+    publisher = (content.get('provider') or {}).get('displayName')
+    return {
+        'source': 'Yahoo Finance',
+        'ticker': ticker, # Ticker con cui è stata trovata (il primo, se unita ad altre)
+        'tickers': [ticker], # Tutti i ticker dell'articolo (vedi merge_articles)
+        'title': title,
+        'link': canonical_url(link),
+        'publisher': publisher,
+        'timestamp': timestamp,
+        'text': title, # Per l'LLM, il testo è il titolo
+        'content_hash': content_hash(title, publisher, timestamp),
+    }
+
+
+def configure_rate(rate=DEFAULT_NEWS_RATE, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Budget del rate limiter per le notizie: `rate` richieste al secondo, con
+    burst pari a max_workers perché tutti i thread del fan-out partano subito.
+    Con rate troppo basso il parallelismo non serve: 300 ticker a 2 req/s
+    sono 2,5 minuti qualunque sia max_workers.
+    """
+    if rate_limit:
+        rate_limit.default_limiter.set_limit('news', rate, max(1, max_workers))
+
+
+def _fetch_ticker_news(ticker, session=None, session_pool=None):
+    """
+    Scarica e normalizza le notizie di un ticker.
+    Restituisce (notizie, secondi impiegati, eccezione o None).
+    """
+    start = time.perf_counter()
+    try:
+        if session_pool is not None and session is None:
+            # yfinance condivide una sola sessione tra tutti i thread (YfData): quella del pool
+            session = session_pool.yfinance_session()
+        tk = yf.Ticker(ticker, session=session)
+        if rate_limit:
+            news_list = rate_limit.limited_call('news', lambda: tk.news)
+        else:
+            news_list = tk.news
+        items = [item for item in (_parse_news_item(n, ticker) for n in news_list or []) if item]
+        return items, time.perf_counter() - start, None
+    except Exception as e:
+        return [], time.perf_counter() - start, e
+
+
+def summarize_timings(timings):
+    """Riassunto dei tempi per ticker ({ticker: (secondi, notizie, errore)})."""
+    if not timings:
+        return {}
+    durations = sorted(seconds for seconds, _, _ in timings.values())
+    slowest = max(timings, key=lambda t: timings[t][0])
+    return {
+        'tickers': len(timings),
+        'items': sum(count for _, count, _ in timings.values()),
+        'errors': sum(1 for _, _, error in timings.values() if error),
+        'p50_s': round(durations[len(durations) // 2], 3),
+        'p95_s': round(durations[min(len(durations) - 1, int(len(durations) * 0.95))], 3),
+        'slowest': (slowest, round(timings[slowest][0], 3)),
+    }
+
+
+def _iter_ticker_results(tickers, session=None, session_pool=None, max_workers=DEFAULT_MAX_WORKERS,
+                         poll=None):
+    """
+    Genera (ticker, (notizie, secondi, errore)) man mano che i ticker rispondono.
+    Con poll, durante le attese genera None ogni `poll` secondi.
+    """
+    if session_pool is not None and max_workers > 1 and len(tickers) > 1:
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(tickers)), thread_name_prefix="news")
+        try:
+            pending = {executor.submit(_fetch_ticker_news, ticker, None, session_pool): ticker
+                       for ticker in tickers}
+            while pending:
+                done, _ = wait(pending, timeout=poll, return_when=FIRST_COMPLETED)
+                if not done:
+                    yield None
+                    continue
+                for future in done:
+                    yield pending.pop(future), future.result()
+        finally:
+            # Se il consumatore smette prima (es. NewsWorker fermato) non si aspettano gli altri ticker
+            executor.shutdown(wait=False, cancel_futures=True)
+    else:
+        for ticker in tickers:
+            yield ticker, _fetch_ticker_news(ticker, session=session, session_pool=session_pool)
+
+
+def _record_result(ticker, result, timings, throttled):
+    items, seconds, error = result
+    timings[ticker] = (seconds, len(items), error)
+    # Silenzia gli errori nel loop per non intasare il log, ma non i rate limit
+    if error is not None and rate_limit and rate_limit.is_throttle_error(error):
+        throttled.append(ticker)
+
+
+def _report_throttled(throttled):
+    if throttled:
+        print(f"[News.py] Rate limit Yahoo: notizie non recuperate per {len(throttled)} ticker ({', '.join(throttled)}).")
+
+
+def get_yfinance_news(tickers, session=None, session_pool=None, max_workers=DEFAULT_MAX_WORKERS,
+                      timings=None):
     """
     Estrae le notizie più recenti da Yahoo Finance per un elenco di ticker.
     Filtra le notizie senza titolo o con timestamp non validi.
+
+    Con un session_pool i ticker vengono scaricati in parallelo (al massimo
+    max_workers alla volta, tutti sulla sessione yfinance del pool); con una
+    singola sessione si procede in sequenza.
+    Se timings è un dict, viene riempito con {ticker: (secondi, notizie, errore)}.
+    Lo stesso articolo trovato con più ticker viene restituito una volta sola,
+    con tutti i ticker in 'tickers'.
     """
     all_news = []
+    throttled = []
+    timings = {} if timings is None else timings
     # Nota: Riduciamo la verbosità per il loop in real-time
     # print(f"[News.py] Avvio recupero notizie da Yahoo Finance per {len(tickers)} ticker...")
-    
-    for ticker in tickers:
-        try:
-            tk = yf.Ticker(ticker, session=session)
-            news_list = tk.news
-            
-            if not news_list:
-                continue
 
-            for news_item in news_list:
-                
-                # --- FIX: Leggi dal dizionario 'content' annidato ---
-                content = news_item.get('content')
-                if not content:
-                    continue
+    for ticker, result in _iter_ticker_results(tickers, session, session_pool, max_workers):
+        _record_result(ticker, result, timings, throttled)
+        all_news.extend(result[0])
 
-                pub_date_str = content.get('pubDate')
-                title = content.get('title')
-                
-                # Prova a ottenere il link da 'clickThroughUrl', altrimenti da 'canonicalUrl'
-                link_data = content.get('clickThroughUrl') or content.get('canonicalUrl')
-                link = link_data.get('url') if link_data else None
+    _report_throttled(throttled)
+    # print(f"[News.py] Recupero da Yahoo Finance completato. Trovate {len(all_news)} notizie valide.")
+    return merge_articles(all_news)
 
-                # Salta questa notizia se manca un'informazione chiave
-                if not title or not pub_date_str or not link:
-                    continue
-                # --- FINE FIX ---
-                
-                # Converti la data da stringa ISO (es. '2025-11-04T00:31:05Z')
-                try:
-                    # Rimuovi la 'Z' (UTC) per compatibilità
-                    timestamp = datetime.fromisoformat(pub_date_str.replace('Z', ''))
-                except ValueError:
-                    # Salta se il formato data è strano
+
+def iter_news(tickers, session=None, session_pool=None, max_workers=DEFAULT_MAX_WORKERS, timings=None,
+              max_hold=DEFAULT_MAX_HOLD, max_buffer=DEFAULT_MAX_BUFFER):
+    """
+    Variante in streaming di fetch_all_news: genera le notizie man mano che
+    ogni ticker risponde, senza aspettare il più lento.
+
+    Un buffer limitato (heap per timestamp) mantiene un ordine approssimato:
+    le notizie escono dalla più vecchia alla più recente, al più tardi dopo
+    circa max_hold secondi o appena il buffer supera max_buffer elementi.
+    A fine giro il buffer viene svuotato in ordine.
+
+    Un articolo trovato con più ticker mentre è ancora nel buffer esce una
+    volta sola con tutti i ticker; se arriva dopo esce di nuovo (il
+    consumatore lo riconosce con article_keys).
+    """
+    throttled = []
+    timings = {} if timings is None else timings
+    heap = [] # (timestamp, progressivo, arrivo, notizia)
+    buffered = {} # Chiave dell'articolo -> notizia nel buffer
+    sequence = itertools.count()
+    poll = max_hold / 2 if max_hold else None
+
+    for entry in _iter_ticker_results(tickers, session, session_pool, max_workers, poll=poll):
+        now = time.monotonic()
+        if entry is not None:
+            ticker, result = entry
+            _record_result(ticker, result, timings, throttled)
+            for item in result[0]:
+                target = next((buffered[key] for key in article_keys(item) if key in buffered), None)
+                if target is not None:
+                    merge_tickers(target, item)
                     continue
-                
-                formatted_item = {
-                    'source': 'Yahoo Finance',
-                    'ticker': ticker,
-                    'title': title,
-                    'link': link,
-                    'publisher': content.get('provider', {}).get('displayName'),
-                    'timestamp': timestamp,
-                    'text': title # Per l'LLM, il testo è il titolo
-                }
-                all_news.append(formatted_item)
-            
-        except Exception as e:
-            # Silenzia gli errori nel loop per non intasare il log
-            # print(f"[News.py] Errore durante il recupero notizie per {ticker}: {e}")
-            pass
-            
-    # print(f"[News.py] Recupero da Yahoo Finance completato. Trovate {len(all_news)} notizie valide.")
-    return all_news
+                for key in article_keys(item):
+                    buffered[key] = item
+                heapq.heappush(heap, (item['timestamp'], next(sequence), now, item))
+        while heap and (len(heap) > max_buffer or now - heap[0][2] >= max_hold):
+            yield _release(heap, buffered)
+
+    while heap:
+        yield _release(heap, buffered)
+    _report_throttled(throttled)
+
+
+def _release(heap, buffered):
+    item = heapq.heappop(heap)[3]
+    for key in article_keys(item):
+        buffered.pop(key, None)
+    return item
 
 
 # --- 2. FUNZIONE AGGREGATORE (SEMPLIFICATA) ---
 
-def fetch_all_news(yfinance_tickers, session=None):
+def fetch_all_news(yfinance_tickers, session=None, session_pool=None, max_workers=DEFAULT_MAX_WORKERS,
+                   timings=None):
     """
     Raccoglie notizie da Yahoo Finance e le unisce in un unico "data pool".
     """
     all_news = []
     
     # Fonte 1: Yahoo Finance
-    yahoo_news = get_yfinance_news(yfinance_tickers, session=session)
+    yahoo_news = get_yfinance_news(yfinance_tickers, session=session, session_pool=session_pool,
+                                   max_workers=max_workers, timings=timings)
     all_news.extend(yahoo_news)
     
     # Ordina il pool di dati per timestamp, con il più recente in cima
@@ -87,20 +304,142 @@ def fetch_all_news(yfinance_tickers, session=None):
     
     return all_news
 
-# --- 3. ESECUZIONE IN REAL TIME (per testare questo file) ---
+# --- 3. PIPELINE DEL NEWS FEED (NewsWorker di graph.py e news_daemon.py) ---
+
+class NewsFeed:
+    """
+    Scheduler per ticker -> iter_news -> deduplicazione (memoria e archivio)
+    -> unione dei ticker degli articoli già emessi. Senza PyQt: chi la usa
+    si occupa solo di emettere gli eventi di poll(). Va usata da un solo
+    thread, come NewsScheduler.
+    """
+    def __init__(self, tickers=(), session_pool=None, store=None, seen=None, max_workers=DEFAULT_MAX_WORKERS,
+                 initial_per_ticker=INITIAL_PER_TICKER, recent_articles=RECENT_ARTICLES):
+        self.session_pool = session_pool
+        self.store = store # Archivio notizie (NewsStore): deduplicazione anche tra un avvio e l'altro
+        self.seen = seen if seen is not None else RotatingDedupe(name="NewsDedupe")
+        self.max_workers = max_workers
+        self.initial_per_ticker = initial_per_ticker
+        self.recent_limit = recent_articles
+        self.scheduler = NewsScheduler(tickers) # Ogni ticker ha il suo intervallo
+        self.unpolled = set(self.scheduler.tickers) # Mai controllati: le loro notizie sono arretrati
+        # Chiave articolo -> notizia già emessa (link e ticker), per unire chi la ritrova più tardi
+        self.recent_articles = OrderedDict()
+
+    @property
+    def tickers(self):
+        return self.scheduler.tickers
+
+    def set_tickers(self, tickers):
+        """Sostituisce l'insieme dei ticker. Quelli già presenti mantengono il loro stato."""
+        previous = set(self.scheduler.tickers)
+        self.scheduler.set_tickers(tickers)
+        self._sync_unpolled(previous)
+
+    def add_tickers(self, tickers):
+        previous = set(self.scheduler.tickers)
+        for ticker in tickers:
+            self.scheduler.add(ticker)
+        self._sync_unpolled(previous)
+
+    def remove_tickers(self, tickers):
+        previous = set(self.scheduler.tickers)
+        for ticker in tickers:
+            self.scheduler.remove(ticker)
+        self._sync_unpolled(previous)
+
+    def _sync_unpolled(self, previous):
+        # I ticker nuovi non sono ancora stati controllati, quelli rimossi non servono più
+        current = self.scheduler.tickers
+        self.unpolled = {t for t in self.unpolled if t in current} | {t for t in current if t not in previous}
+
+    def poll(self, tickers=None, timings=None, should_stop=None):
+        """
+        Controlla i ticker indicati (default: quelli il cui intervallo è
+        scaduto) e genera gli eventi, man mano che i ticker rispondono:
+          ('news', notizia)     - notizia nuova; notizia['initial'] è True se
+                                  viene dal primo controllo del suo ticker
+          ('tickers', articolo) - articolo già emesso ritrovato con ticker
+                                  nuovi ({'link', 'tickers'} con tutti i ticker)
+          ('duplicate', notizia) - già vista (in memoria o in archivio)
+        Con initial_per_ticker (intero) le notizie del primo controllo escono
+        a fine giro, solo le più recenti di ogni ticker.
+        Se timings è un dict, viene riempito come in iter_news; should_stop()
+        interrompe il giro (lo scheduler registra comunque i ticker che hanno risposto).
+        """
+        tickers = self.scheduler.due() if tickers is None else list(tickers)
+        timings = {} if timings is None else timings
+        published = {ticker: [] for ticker in tickers} # Date di tutti gli articoli, per lo scheduler
+        held = {} # Ticker al primo controllo -> notizie trattenute fino a fine giro
+        for item in iter_news(tickers, session_pool=self.session_pool, max_workers=self.max_workers,
+                              timings=timings):
+            if should_stop and should_stop():
+                break
+            for ticker in item['tickers']:
+                published.setdefault(ticker, []).append(item['timestamp'])
+            known = self._known_article(item)
+            if known is not None:
+                # Stesso articolo già emesso con un altro ticker: analizzato una volta sola
+                if merge_tickers(known, item):
+                    if self.store:
+                        self.store.add_if_new(dict(item, tickers=known['tickers'])) # Registra i ticker nuovi
+                    yield 'tickers', known
+                else:
+                    yield 'duplicate', item
+                continue
+            if not item.get('link') or not check_new_article(self.seen, item):
+                yield 'duplicate', item
+                continue
+            if self.store and not self.store.add_if_new(item):
+                # Già vista in una sessione precedente: se ne ricordano i ticker salvati
+                self._remember_article(item, self.store.tickers_for(item['link']))
+                yield 'duplicate', item
+                continue
+            self._remember_article(item)
+            item['initial'] = item['ticker'] in self.unpolled
+            if item['initial'] and self.initial_per_ticker is not None:
+                held.setdefault(item['ticker'], []).append(item)
+                continue
+            yield 'news', item
+
+        stopped = bool(should_stop and should_stop())
+        self.unpolled.difference_update(timings)
+        for ticker, (_, _, error) in timings.items():
+            self.scheduler.record(ticker, published.get(ticker, []), error=error)
+        if stopped or not self.initial_per_ticker:
+            return
+        # Le più recenti di OGNI ticker (aggiungerne 10 insieme non deve mostrare solo 3 notizie)
+        initial = [item for items in held.values()
+                   for item in sorted(items, key=lambda x: x['timestamp'])[-self.initial_per_ticker:]]
+        for item in sorted(initial, key=lambda x: x['timestamp']):
+            if should_stop and should_stop():
+                return
+            yield 'news', item
+
+    def _known_article(self, item):
+        return next((self.recent_articles[key] for key in article_keys(item) if key in self.recent_articles), None)
+
+    def _remember_article(self, item, tickers=None):
+        record = {'link': item['link'], 'tickers': list(tickers or item['tickers'])}
+        for key in article_keys(item):
+            self.recent_articles[key] = record
+        while len(self.recent_articles) > 2 * self.recent_limit: # Due chiavi per articolo
+            self.recent_articles.popitem(last=False)
+
+
+# --- 4. ESECUZIONE IN REAL TIME (per testare questo file) ---
 if __name__ == "__main__":
     
     # --- MODIFICA PER TEST CON CURL_CFFI ---
-    try:
-        from curl_cffi.requests import Session as CurlSession
-    except ImportError:
-        print("ERRORE: 'curl_cffi' non trovato. Esegui: pip install curl_cffi")
-        sys.exit(1)
-
-    # Crea la sessione che impersona Chrome (e disabilita SSL per la rete aziendale)
-    print("Creazione sessione curl_cffi (impersonate='chrome110', verify=False)")
-    test_session = CurlSession(impersonate="chrome110")
-    test_session.verify = False # Imposta su False per la rete aziendale
+    from http_pool import SessionPool, CurlSession
+
+    # Pool di sessioni che impersonano Chrome (e SSL disabilitato per la rete aziendale):
+    # una sessione per thread di download. Senza curl_cffi il pool usa requests.
+    if CurlSession is None:
+        print("AVVISO: 'curl_cffi' non trovato (pip install curl_cffi): sessioni requests.")
+    else:
+        print("Creazione pool di sessioni curl_cffi (impersonate='chrome110', verify=False)")
+    test_pool = SessionPool(verify=False)
     # --- FINE MODIFICA ---
     
     # 1. Definisci i tuoi target
@@ -115,8 +454,8 @@ if __name__ == "__main__":
         'AAPL'   # Apple
     ]
     
-    # Set per tenere traccia delle notizie già viste (usiamo i link come ID univoco)
-    seen_links = set()
+    # Notizie già viste (usiamo i link come ID univoco), a memoria costante come in graph.py
+    seen_links = RotatingDedupe(name="NewsDedupe")
     is_first_run = True
 
     print("--- Avvio News Feed Monitor (Ctrl+C per uscire) ---")
@@ -128,7 +467,9 @@ if __name__ == "__main__":
             
             # 2. Recupera il data pool
             # --- MODIFICATO ---
-            data_pool = fetch_all_news(YFINANCE_TICKERS_TO_WATCH, session=test_session)
+            timings = {}
+            data_pool = fetch_all_news(YFINANCE_TICKERS_TO_WATCH, session_pool=test_pool, timings=timings)
+            print(f"Tempi per ticker: {summarize_timings(timings)}")
             
             new_items = []
             if not data_pool:
@@ -138,10 +479,8 @@ if __name__ == "__main__":
                 
             # 3. Filtra le notizie che non abbiamo ancora visto
             for item in data_pool:
-                link = item.get('link')
-                if link and link not in seen_links:
+                if check_new_article(seen_links, item):
                     new_items.append(item)
-                    seen_links.add(link)
             
             # 4. Decidi cosa mostrare
             if is_first_run:
@@ -158,7 +497,7 @@ if __name__ == "__main__":
                 print(f"\n>> [{item['source']}] - {item['timestamp']}")
                 print(f"   Titolo: {item['title']}")
                 if item.get('ticker'):
-                    print(f"   Ticker: {item['ticker']}")
+                    print(f"   Ticker: {', '.join(item['tickers'])}")
                 
                 print(f"   Testo: {item['text'][:100]}...") 
                 print(f"   Link: {item['link']}")
@@ -173,5 +512,5 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         print("\n--- News Feed Monitor interrotto. ---")
     finally:
-        if test_session:
-            test_session.close() # Aggiunto
+        print(f"Deduplicazione: {seen_links.stats()}")
+        test_pool.close() # Aggiunto
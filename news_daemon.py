@@ -0,0 +1,541 @@
+import argparse
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+try:
+    import news
+    from http_pool import SessionPool
+    from inference_service import DEFAULT_MAX_BATCH
+except ImportError as e:
+    print(f"ERRORE: Impossibile trovare un modulo del news feed ({e}).", file=sys.stderr)
+    sys.exit(1)
+
+try:
+    import news_store # Archivio notizie (opzionale, --store)
+except ImportError:
+    news_store = None
+
+# --- NEWS FEED SENZA INTERFACCIA ---
+# Lo stesso flusso del NewsWorker di graph.py (download in parallelo, scheduler
+# per ticker, deduplicazione, analisi AI opzionale) senza PyQt, per un server:
+# ogni notizia nuova è una riga JSON su stdout o su un file a rotazione.
+#
+#   python news_daemon.py --tickers NVDA MSFT GC=F
+#   python news_daemon.py --tickers-file tickers.txt --output news.jsonl --store --analyze
+#
+# Righe emesse (campo "type"):
+#   news    - notizia nuova: i campi di news.py più fetched_at, emitted_at,
+#             latency_s (pubblicazione -> emissione), initial (primo controllo
+#             del ticker) ed eventualmente trading_signal
+#   tickers - articolo già emesso ritrovato con altri ticker: link e tutti i ticker
+#   metrics - ogni --metrics-interval secondi: throughput e latenze
+# Date in ISO 8601 UTC. I messaggi di log vanno sempre su stderr.
+
+DEFAULT_SETTINGS_FILE = 'settings.json'
+DEFAULT_METRICS_INTERVAL = 60 # Secondi
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024 # Per file JSON Lines, prima della rotazione
+DEFAULT_BACKUP_COUNT = 5
+DEFAULT_ANALYSIS_QUEUE = 200 # Notizie in attesa dell'AI; oltre si emettono senza analisi
+IDLE_WAIT = 60 # Secondi di attesa senza ticker
+TICKERS_FILE_CHECK_S = 10 # Ogni quanto si controlla se il file dei ticker è cambiato
+
+
+def _utc_iso(timestamp):
+    """datetime (naive = UTC, come in news.py) o secondi epoch -> stringa ISO 8601 con 'Z'."""
+    if isinstance(timestamp, (int, float)):
+        timestamp = datetime.fromtimestamp(timestamp, timezone.utc)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp.isoformat() + 'Z'
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return _utc_iso(value)
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+
+def _epoch(timestamp):
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def _percentiles(values):
+    """(p50, p95) arrotondati, o (None, None) se non ci sono valori."""
+    if not values:
+        return None, None
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return round(ordered[len(ordered) // 2], 3), round(p95, 3)
+
+
+def parse_tickers(text):
+    """Ticker da un testo (uno per riga o separati da virgole/spazi, '#' per i commenti)."""
+    tickers = []
+    for line in text.splitlines():
+        for ticker in line.split('#', 1)[0].replace(',', ' ').split():
+            ticker = ticker.strip().upper()
+            if ticker and ticker not in tickers:
+                tickers.append(ticker)
+    return tickers
+
+
+def load_tickers_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_tickers(f.read())
+
+
+def load_settings(path=DEFAULT_SETTINGS_FILE):
+    """settings.json dell'applicazione (news_tickers, ssl_verify), se c'è."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class JsonLinesWriter:
+    """
+    Scrive un record JSON per riga, da più thread. Su file ruota per
+    dimensione (RotatingFileHandler); su stdout ogni riga viene scaricata
+    subito, per chi legge da una pipe.
+    """
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT, stream=None):
+        if path and path != '-':
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        else:
+            self.handler = logging.StreamHandler(stream or sys.stdout)
+        self.handler.setFormatter(logging.Formatter('%(message)s'))
+        self.logger = logging.getLogger(f"news_daemon.output.{id(self)}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.logger.addHandler(self.handler)
+        self.lines = 0
+        self._lock = threading.Lock() # write() arriva dal ciclo principale e dal thread dell'analisi
+
+    def write(self, record):
+        line = json.dumps(record, default=_json_default, ensure_ascii=False)
+        with self._lock:
+            self.logger.info(line)
+            self.lines += 1
+
+    def close(self):
+        self.logger.removeHandler(self.handler)
+        self.handler.close()
+
+
+class Metrics:
+    """Contatori e latenze del daemon, tra un report e l'altro (thread-safe)."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.window_start = self.started
+        self.totals = {'polls': 0, 'requests': 0, 'errors': 0, 'fetched': 0, 'duplicates': 0,
+                       'merged': 0, 'emitted': 0, 'analyzed': 0, 'analysis_skipped': 0}
+        self.window = dict.fromkeys(self.totals, 0)
+        self.fetch_s = []
+        self.latency_s = []
+        self.analysis_s = []
+        self.first_item_s = deque(maxlen=1000) # Inizio controllo -> prima notizia nuova
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.totals[name] += amount
+            self.window[name] += amount
+
+    def add(self, name, value):
+        with self._lock:
+            getattr(self, name).append(value)
+
+    def report(self, extra=None):
+        """Record 'metrics' della finestra corrente, poi azzera la finestra."""
+        now = time.monotonic()
+        with self._lock:
+            window_s = max(now - self.window_start, 1e-6)
+            fetch_p50, fetch_p95 = _percentiles(self.fetch_s)
+            latency_p50, latency_p95 = _percentiles(self.latency_s)
+            analysis_p50, analysis_p95 = _percentiles(self.analysis_s)
+            first_p50, _ = _percentiles(list(self.first_item_s))
+            record = {
+                'type': 'metrics',
+                'time': _utc_iso(time.time()),
+                'uptime_s': round(now - self.started, 1),
+                'window_s': round(window_s, 1),
+                'items_per_s': round(self.window['emitted'] / window_s, 3),
+                'requests_per_s': round(self.window['requests'] / window_s, 3),
+                'window': dict(self.window),
+                'totals': dict(self.totals),
+                'fetch_p50_s': fetch_p50, 'fetch_p95_s': fetch_p95,
+                'latency_p50_s': latency_p50, 'latency_p95_s': latency_p95,
+                'analysis_p50_s': analysis_p50, 'analysis_p95_s': analysis_p95,
+                'first_item_p50_s': first_p50,
+            }
+            self.window = dict.fromkeys(self.totals, 0)
+            self.fetch_s, self.latency_s, self.analysis_s = [], [], []
+            self.window_start = now
+        record.update(extra or {})
+        return record
+
+
+class Analyzer(threading.Thread):
+    """
+    Analisi AI in un thread dedicato (il modello gira su CPU): le notizie in
+    coda vengono analizzate a lotti, con un solo generate per lotto.
+    La coda è limitata: se l'AI resta indietro, le notizie escono senza
+    trading_signal invece di accumulare ritardo.
+    """
+    def __init__(self, emit, metrics, session_pool, store=None, queue_size=DEFAULT_ANALYSIS_QUEUE,
+                 stop_event=None):
+        super().__init__(name="NewsAnalyzer", daemon=True)
+        self.emit = emit
+        self.metrics = metrics
+        self.session_pool = session_pool
+        self.store = store
+        self.items = queue.Queue(maxsize=queue_size)
+        self.stop_event = stop_event or threading.Event()
+        self.trading_model = None
+        self.failed = False
+        self.batch_size = DEFAULT_MAX_BATCH # Notizie per generate
+
+    def submit(self, item):
+        """Mette in coda la notizia; se la coda è piena (o l'AI non c'è) la emette subito."""
+        if self.failed:
+            self.emit(item)
+            return
+        try:
+            self.items.put_nowait(item)
+        except queue.Full:
+            self.metrics.count('analysis_skipped')
+            self.emit(item)
+
+    def close(self):
+        """Nessuna notizia nuova: il thread svuota la coda ed esce."""
+        self.items.put(None)
+
+    def _load_model(self):
+        # --- LAZY IMPORT --- torch/transformers solo se l'analisi è richiesta
+        print("[NewsDaemon] Caricamento modello AI...")
+        try:
+            import model as model_module
+        except Exception as e:
+            print(f"[NewsDaemon] AVVISO: modello AI non disponibile ({e}). Notizie senza analisi.")
+            return None
+        # Sessione dedicata: il modello la conserva, non può tornare nel pool
+        trading_model = model_module.TradingModel(session=self.session_pool.create_session())
+        if not trading_model.model:
+            print("[NewsDaemon] AVVISO: caricamento modello fallito. Notizie senza analisi.")
+            return None
+        print("[NewsDaemon] Modello AI pronto.")
+        return trading_model
+
+    def _analyze(self, items):
+        """Analizza un lotto di notizie con un solo generate (TradingModel.analyze_trading_signals)."""
+        start = time.perf_counter()
+        try:
+            # Stesso testo di NewsAnalysisWorker (TradingModel.news_text): lo stesso segnale nel NewsStore
+            texts = [(self.trading_model.news_text(item, self.session_pool), item.get('ticker')) for item in items]
+            signals = self.trading_model.analyze_trading_signals(texts)
+        except Exception as e:
+            print(f"[NewsDaemon] Errore durante l'analisi di {len(items)} notizie: {e}")
+            return
+        elapsed = time.perf_counter() - start
+        for item, signal_data in zip(items, signals):
+            item['trading_signal'] = signal_data
+            if self.store:
+                self.store.update_signal(item['link'], signal_data)
+            self.metrics.add('analysis_s', elapsed)
+        self.metrics.count('analyzed', len(items))
+
+    def _next_batch(self):
+        """Le notizie in coda (almeno una, al più batch_size). None in coda chiude il thread."""
+        batch = [self.items.get()]
+        while batch[-1] is not None and len(batch) < self.batch_size:
+            try:
+                batch.append(self.items.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        self.trading_model = self._load_model()
+        if self.trading_model is None:
+            self.failed = True
+        while True:
+            batch = self._next_batch()
+            closing = batch[-1] is None
+            items = [item for item in batch if item is not None]
+            if items and self.trading_model is not None and not self.stop_event.is_set():
+                self._analyze(items)
+            elif items and self.trading_model is not None:
+                self.metrics.count('analysis_skipped', len(items)) # In chiusura: si emette senza analisi
+            for item in items:
+                self.emit(item)
+            if closing:
+                return
+
+
+class NewsDaemon:
+    """Ciclo del news feed senza interfaccia: scheduler -> iter_news -> dedupe -> (AI) -> JSON Lines."""
+    def __init__(self, tickers, writer, session_pool, store=None, analyze=False,
+                 max_workers=news.DEFAULT_MAX_WORKERS, metrics_interval=DEFAULT_METRICS_INTERVAL,
+                 skip_initial=False, tickers_file=None, analysis_queue=DEFAULT_ANALYSIS_QUEUE):
+        self.writer = writer
+        self.session_pool = session_pool
+        self.store = store
+        self.max_workers = max_workers
+        self.metrics_interval = metrics_interval
+        self.tickers_file = tickers_file
+        self._tickers_mtime = os.path.getmtime(tickers_file) if tickers_file else None
+        self._tickers_checked = time.monotonic()
+        self.stop_event = threading.Event()
+        self.metrics = Metrics()
+        self._last_report = time.monotonic()
+        # Scheduler, download, deduplicazione e unioni: la stessa pipeline del NewsWorker di graph.py.
+        # Le notizie del primo controllo di un ticker escono tutte, marcate 'initial' (nessuna con --skip-initial)
+        self.feed = news.NewsFeed(tickers, session_pool=session_pool, store=store, max_workers=max_workers,
+                                  initial_per_ticker=0 if skip_initial else None)
+        self.scheduler = self.feed.scheduler
+        self.analyzer = None
+        if analyze:
+            self.analyzer = Analyzer(self.emit, self.metrics, session_pool, store=store,
+                                     queue_size=analysis_queue, stop_event=self.stop_event)
+
+    @property
+    def running(self):
+        return not self.stop_event.is_set()
+
+    def stop(self, *_):
+        """Chiusura ordinata (anche come handler di SIGINT/SIGTERM)."""
+        if self.running:
+            print("[NewsDaemon] Arresto richiesto...")
+        self.stop_event.set()
+
+    def emit(self, item):
+        now = time.time()
+        record = {'type': 'news'}
+        record.update(item)
+        record['emitted_at'] = _utc_iso(now)
+        record['latency_s'] = round(now - _epoch(item['timestamp']), 3)
+        if not item.get('initial'):
+            # Le notizie del primo controllo sono arretrati: falserebbero la latenza
+            self.metrics.add('latency_s', record['latency_s'])
+        self.writer.write(record)
+        self.metrics.count('emitted')
+
+    def run(self, once=False):
+        print(f"[NewsDaemon] Avviato: {len(self.scheduler)} ticker, {self.max_workers} download in parallelo"
+              f"{', analisi AI' if self.analyzer else ''}{', archivio ' + self.store.db_path if self.store else ''}.")
+        if self.analyzer:
+            self.analyzer.start()
+        try:
+            if once:
+                self._poll(self.scheduler.tickers)
+            while self.running and not once:
+                self._reload_tickers()
+                due = self.scheduler.due()
+                if due:
+                    self._poll(due)
+                self._maybe_report()
+                wait = self.scheduler.next_due_in()
+                wait = IDLE_WAIT if wait is None else wait
+                if self.metrics_interval:
+                    wait = min(wait, max(0.0, self._last_report + self.metrics_interval - time.monotonic()))
+                if self.tickers_file:
+                    wait = min(wait, TICKERS_FILE_CHECK_S)
+                self.stop_event.wait(wait)
+        finally:
+            if self.analyzer:
+                self.analyzer.close()
+                # Con --once si aspetta l'AI; dopo un segnale la coda esce senza analisi
+                self.analyzer.join(None if self.running else 30)
+            self.writer.write(self.metrics.report(self._extra_metrics()))
+            print(f"[NewsDaemon] Fermato. Righe scritte: {self.writer.lines}, "
+                  f"deduplicazione: {self.feed.seen.stats()}")
+
+    def _poll(self, tickers):
+        """Scarica le notizie dei ticker indicati ed emette quelle nuove (news.NewsFeed, come NewsWorker)."""
+        timings = {}
+        accounted = set() # Ticker già contati nelle metriche
+        poll_start = time.perf_counter()
+        first = True
+        for kind, payload in self.feed.poll(tickers, timings=timings, should_stop=lambda: not self.running):
+            if kind == 'duplicate':
+                self.metrics.count('duplicates')
+            elif kind == 'tickers':
+                self.metrics.count('duplicates')
+                self.metrics.count('merged')
+                self.writer.write({'type': 'tickers', 'link': payload['link'], 'tickers': list(payload['tickers']),
+                                   'emitted_at': _utc_iso(time.time())})
+            else:
+                payload['fetched_at'] = _utc_iso(time.time())
+                if first:
+                    self.metrics.add('first_item_s', time.perf_counter() - poll_start)
+                    first = False
+                if self.analyzer:
+                    self.analyzer.submit(payload)
+                else:
+                    self.emit(payload)
+            if len(timings) > len(accounted):
+                self._account(timings, accounted)
+            self._maybe_report()
+
+        self._account(timings, accounted)
+        self.metrics.count('polls')
+
+    def _account(self, timings, accounted):
+        """Conta nelle metriche i ticker che hanno risposto (anche a controllo in corso)."""
+        for ticker, (seconds, count, error) in list(timings.items()):
+            if ticker in accounted:
+                continue
+            accounted.add(ticker)
+            self.metrics.count('requests')
+            self.metrics.count('fetched', count)
+            self.metrics.add('fetch_s', seconds)
+            if error is not None:
+                self.metrics.count('errors')
+
+    def _reload_tickers(self):
+        """Rilegge il file dei ticker se è cambiato (aggiunte/rimozioni senza riavviare)."""
+        if not self.tickers_file or time.monotonic() - self._tickers_checked < TICKERS_FILE_CHECK_S:
+            return
+        self._tickers_checked = time.monotonic()
+        try:
+            mtime = os.path.getmtime(self.tickers_file)
+            if mtime == self._tickers_mtime:
+                return
+            tickers = load_tickers_file(self.tickers_file)
+        except OSError as e:
+            print(f"[NewsDaemon] Impossibile rileggere '{self.tickers_file}': {e}")
+            return
+        self._tickers_mtime = mtime
+        previous = len(self.feed.tickers)
+        self.feed.set_tickers(tickers)
+        print(f"[NewsDaemon] Ticker aggiornati da file: {previous} -> {len(self.feed.tickers)}.")
+
+    def _maybe_report(self):
+        if not self.metrics_interval or time.monotonic() - self._last_report < self.metrics_interval:
+            return
+        self._last_report = time.monotonic()
+        record = self.metrics.report(self._extra_metrics())
+        self.writer.write(record)
+        print(f"[NewsDaemon] {record['items_per_s']} notizie/s, {record['requests_per_s']} richieste/s, "
+              f"download p50/p95 {record['fetch_p50_s']}/{record['fetch_p95_s']}s, "
+              f"latenza p50/p95 {record['latency_p50_s']}/{record['latency_p95_s']}s")
+
+    def _extra_metrics(self):
+        next_in = self.scheduler.next_due_in()
+        dedupe = self.feed.seen.stats()
+        return {
+            'tickers': len(self.scheduler),
+            'next_poll_in_s': None if next_in is None else round(next_in, 1),
+            'analysis_queue': self.analyzer.items.qsize() if self.analyzer else None,
+            'dedupe_keys': dedupe['keys_current'],
+            'dedupe_fp_rate': dedupe['fp_rate_now'],
+            'sessions': self.session_pool.stats(),
+        }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="News feed di The Sentient senza interfaccia: notizie nuove in JSON Lines.")
+    parser.add_argument('--tickers', nargs='+', metavar='TICKER',
+                        help="Ticker da monitorare (default: news_tickers di settings.json)")
+    parser.add_argument('--tickers-file', metavar='FILE',
+                        help="File con i ticker (uno per riga, '#' per i commenti); riletto se cambia")
+    parser.add_argument('--output', '-o', default='-', metavar='FILE',
+                        help="File JSON Lines (a rotazione), '-' per stdout (default)")
+    parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES,
+                        help="Dimensione massima di un file prima della rotazione")
+    parser.add_argument('--backup-count', type=int, default=DEFAULT_BACKUP_COUNT,
+                        help="File ruotati da conservare")
+    parser.add_argument('--max-workers', type=int, default=news.DEFAULT_MAX_WORKERS,
+                        help="Ticker scaricati in parallelo (il rate limiter resta il tetto)")
+    parser.add_argument('--news-rate', type=float, default=None, metavar='REQ_S',
+                        help=f"Richieste al secondo all'endpoint news (default: news_rate di settings.json "
+                             f"o {news.DEFAULT_NEWS_RATE:g})")
+    parser.add_argument('--store', nargs='?', metavar='DB',
+                        const=news_store.DEFAULT_DB_PATH if news_store else None,
+                        help="Archivio SQLite per la deduplicazione tra un'esecuzione e l'altra")
+    parser.add_argument('--analyze', action='store_true', help="Analisi AI delle notizie (richiede model.py)")
+    parser.add_argument('--analysis-queue', type=int, default=DEFAULT_ANALYSIS_QUEUE,
+                        help="Notizie massime in attesa dell'AI")
+    parser.add_argument('--skip-initial', action='store_true',
+                        help="Non emettere le notizie trovate al primo controllo di ogni ticker")
+    parser.add_argument('--metrics-interval', type=float, default=DEFAULT_METRICS_INTERVAL,
+                        help="Secondi tra due righe 'metrics' (0 per disattivarle)")
+    parser.add_argument('--once', action='store_true', help="Un solo controllo di tutti i ticker, poi esce")
+    parser.add_argument('--insecure', action='store_true', help="Disattiva la verifica SSL (rete aziendale)")
+    parser.add_argument('--settings', default=DEFAULT_SETTINGS_FILE, help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # stdout è riservato alle righe JSON: i print dei moduli (news, model, ...) vanno su stderr
+    output_stream = sys.stdout
+    sys.stdout = sys.stderr
+
+    settings = load_settings(args.settings)
+    tickers = list(args.tickers or [])
+    if args.tickers_file:
+        try:
+            tickers += [t for t in load_tickers_file(args.tickers_file) if t not in tickers]
+        except OSError as e:
+            print(f"ERRORE: Impossibile leggere '{args.tickers_file}': {e}")
+            return 2
+    if not tickers and not args.tickers_file:
+        tickers = settings.get('news_tickers') or []
+    if not tickers and not args.tickers_file:
+        print("ERRORE: Nessun ticker (usa --tickers o --tickers-file).")
+        return 2
+
+    store = None
+    if args.store:
+        if news_store is None:
+            print("AVVISO: 'news_store.py' non trovato. Archivio disattivato.")
+        else:
+            store = news_store.NewsStore(args.store)
+
+    news_rate = args.news_rate if args.news_rate is not None else settings.get('news_rate', news.DEFAULT_NEWS_RATE)
+    news.configure_rate(news_rate, args.max_workers) # Budget allineato al numero di thread
+    verify = False if args.insecure else settings.get('ssl_verify', True)
+    session_pool = SessionPool(verify=verify, max_idle=max(args.max_workers, 1))
+    writer = JsonLinesWriter(args.output, args.max_bytes, args.backup_count, stream=output_stream)
+    daemon = NewsDaemon(tickers, writer, session_pool, store=store, analyze=args.analyze,
+                        max_workers=args.max_workers, metrics_interval=args.metrics_interval,
+                        skip_initial=args.skip_initial, tickers_file=args.tickers_file,
+                        analysis_queue=args.analysis_queue)
+
+    signal.signal(signal.SIGINT, daemon.stop)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, daemon.stop)
+    try:
+        daemon.run(once=args.once)
+    finally:
+        writer.close()
+        session_pool.close()
+        if store:
+            print(f"[NewsDaemon] Archivio notizie: {store.stats()}")
+    return 0
+
+
+# --- ESECUZIONE ---
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,367 @@
+import math
+import time
+from datetime import datetime, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    ZoneInfo = None
+
+# --- PIANIFICAZIONE ADATTIVA DEL POLLING NOTIZIE ---
+# Ogni ticker ha il suo intervallo, calcolato dal ritmo di arrivo delle
+# notizie (media mobile esponenziale degli articoli all'ora) e dagli orari
+# del suo mercato: i ticker "rumorosi" vengono controllati più spesso del
+# vecchio ciclo fisso di 5 minuti, quelli silenziosi mai meno spesso a
+# mercato aperto; a mercato chiuso (notte, weekend) si rallenta.
+# Le festività non sono considerate.
+
+MIN_INTERVAL = 60 # Secondi: durante un burst di notizie
+DEFAULT_INTERVAL = 300 # Come il vecchio ciclo fisso, finché il ritmo non è noto
+MAX_INTERVAL = 5 * 60 # Ticker silenziosi a mercato aperto: mai più lenti del vecchio ciclo fisso
+MAX_CLOSED_INTERVAL = 20 * 60 # Ticker a mercato chiuso (le notizie notturne contano all'apertura)
+ERROR_MAX_INTERVAL = 1800 # Tetto del backoff dopo un errore
+
+TARGET_NEW_PER_POLL = 0.15 # Articoli attesi per controllo: ~1/7 del tempo medio tra due articoli
+RATE_TAU = 2 * 3600 # Secondi: memoria della media mobile del ritmo di arrivo
+BOOTSTRAP_MIN_SPAN = 3600 # Al primo poll il ritmo si stima dalle date degli articoli restituiti
+BURST_NEW = 3 # Articoli nuovi in un solo poll che fanno scattare l'intervallo minimo
+SESSION_STEP = 15 * 60 # Passo con cui si cerca la prossima apertura a mercato chiuso
+
+# Moltiplicatore dell'intervallo per sessione di mercato
+SESSION_FACTOR = {'open': 1.0, 'extended': 1.5, 'closed': 3.0}
+
+# Borse per suffisso Yahoo: (timezone, offset fisso di riserva in ore, apertura, chiusura)
+EXCHANGES = {
+    '': ('America/New_York', -5, (9, 30), (16, 0)),
+    '.L': ('Europe/London', 0, (8, 0), (16, 30)),
+    '.MI': ('Europe/Rome', 1, (9, 0), (17, 30)),
+    '.DE': ('Europe/Berlin', 1, (9, 0), (17, 30)),
+    '.PA': ('Europe/Paris', 1, (9, 0), (17, 30)),
+    '.AS': ('Europe/Amsterdam', 1, (9, 0), (17, 30)),
+    '.SW': ('Europe/Zurich', 1, (9, 0), (17, 30)),
+    '.T': ('Asia/Tokyo', 9, (9, 0), (15, 0)),
+    '.HK': ('Asia/Hong_Kong', 8, (9, 30), (16, 0)),
+    '.TO': ('America/Toronto', -5, (9, 30), (16, 0)),
+}
+EXTENDED_HOURS = ((4, 0), (20, 0)) # Pre/after-market USA (ora di New York)
+CRYPTO_QUOTES = ('-USD', '-USDT', '-EUR', '-BTC', '-ETH')
+
+_zones = {}
+
+
+def _local_time(zone_name, fallback_hours, now):
+    """Ora locale della borsa. Senza database dei fusi (es. Windows senza tzdata) usa l'offset fisso."""
+    if zone_name not in _zones:
+        try:
+            if ZoneInfo is None:
+                raise ImportError("zoneinfo")
+            _zones[zone_name] = ZoneInfo(zone_name)
+        except Exception:
+            _zones[zone_name] = None
+            print(f"[NewsScheduler] Fuso {zone_name} non disponibile, uso UTC{fallback_hours:+d} (senza ora legale).")
+    zone = _zones[zone_name] or timezone(timedelta(hours=fallback_hours))
+    return datetime.fromtimestamp(now, zone)
+
+
+def asset_class(ticker):
+    """'crypto', 'future', 'fx', 'index' o 'equity' dal simbolo Yahoo."""
+    ticker = ticker.upper()
+    if ticker.endswith('=F'):
+        return 'future'
+    if ticker.endswith('=X'):
+        return 'fx'
+    if ticker.endswith(CRYPTO_QUOTES):
+        return 'crypto'
+    if ticker.startswith('^'):
+        return 'index'
+    return 'equity'
+
+
+def _minutes(hour_minute):
+    return hour_minute[0] * 60 + hour_minute[1]
+
+
+def market_session(ticker, now=None):
+    """
+    Sessione di mercato del ticker: 'open', 'extended' (pre/after-market USA) o 'closed'.
+    - crypto: sempre aperte;
+    - futures (=F): Globex, da domenica 18:00 a venerdì 17:00 (New York), pausa 17-18;
+    - valute (=X): da domenica 17:00 a venerdì 17:00 (New York);
+    - azioni, ETF e indici: orario della borsa dal suffisso (default NYSE).
+    """
+    now = time.time() if now is None else now
+    kind = asset_class(ticker)
+    if kind == 'crypto':
+        return 'open'
+
+    if kind in ('future', 'fx'):
+        local = _local_time('America/New_York', -5, now)
+        minute = local.hour * 60 + local.minute
+        weekday = local.weekday() # Lunedì = 0
+        open_at = 18 * 60 if kind == 'future' else 17 * 60
+        if weekday == 5 or (weekday == 4 and minute >= 17 * 60) or (weekday == 6 and minute < open_at):
+            return 'closed'
+        if kind == 'future' and 17 * 60 <= minute < 18 * 60:
+            return 'closed' # Pausa giornaliera
+        return 'open'
+
+    suffix = ''
+    if '.' in ticker and kind == 'equity':
+        suffix = ticker[ticker.rindex('.'):].upper()
+    zone_name, fallback_hours, opens, closes = EXCHANGES.get(suffix, EXCHANGES[''])
+    local = _local_time(zone_name, fallback_hours, now)
+    if local.weekday() >= 5:
+        return 'closed'
+    minute = local.hour * 60 + local.minute
+    if _minutes(opens) <= minute < _minutes(closes):
+        return 'open'
+    if zone_name == 'America/New_York' and _minutes(EXTENDED_HOURS[0]) <= minute < _minutes(EXTENDED_HOURS[1]):
+        return 'extended'
+    return 'closed'
+
+
+def _epoch(timestamp):
+    """datetime naive in UTC (formato di news.py) o secondi epoch -> secondi epoch."""
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+class NewsScheduler:
+    """
+    Decide quali ticker controllare e quando. Va usato da un solo thread
+    (quello del NewsWorker): due() -> scarica -> record() per ogni ticker.
+    """
+    def __init__(self, tickers=(), min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL,
+                 max_closed_interval=MAX_CLOSED_INTERVAL):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_closed_interval = max_closed_interval
+        self._state = {} # ticker -> stato del polling
+        self.polls = 0
+        for ticker in tickers:
+            self.add(ticker)
+
+    def __contains__(self, ticker):
+        return ticker in self._state
+
+    def __len__(self):
+        return len(self._state)
+
+    @property
+    def tickers(self):
+        return list(self._state)
+
+    def add(self, ticker, now=None):
+        """Aggiunge un ticker (controllato subito). Un ticker già presente mantiene il suo stato."""
+        if ticker in self._state:
+            return False
+        self._state[ticker] = {
+            # Articoli al secondo (media mobile) a mercato aperto e fuori orario, None finché non è stimato
+            'rates': {'open': None, 'off': None},
+            'interval': DEFAULT_INTERVAL,
+            'next_at': time.time() if now is None else now,
+            'last_poll': None,
+            'last_published': None, # Data dell'articolo più recente visto
+            'polls': 0,
+            'articles': 0,
+            'errors': 0,
+        }
+        return True
+
+    def remove(self, ticker):
+        return self._state.pop(ticker, None) is not None
+
+    def set_tickers(self, tickers):
+        """Allinea l'insieme dei ticker: i nuovi partono subito, quelli già presenti mantengono lo stato."""
+        tickers = list(dict.fromkeys(tickers))
+        for ticker in list(self._state):
+            if ticker not in tickers:
+                self.remove(ticker)
+        for ticker in tickers:
+            self.add(ticker)
+
+    def due(self, now=None):
+        """Ticker da controllare adesso."""
+        now = time.time() if now is None else now
+        return [ticker for ticker, state in self._state.items() if state['next_at'] <= now]
+
+    def next_due_in(self, now=None):
+        """Secondi al prossimo controllo (None se non ci sono ticker)."""
+        if not self._state:
+            return None
+        now = time.time() if now is None else now
+        return max(0.0, min(state['next_at'] for state in self._state.values()) - now)
+
+    def record(self, ticker, published, error=None, now=None):
+        """
+        Registra l'esito di un controllo.
+
+        Args:
+            ticker (str): Ticker controllato.
+            published (list): Date di pubblicazione di TUTTI gli articoli restituiti
+                              (datetime naive UTC o secondi epoch): i nuovi si
+                              riconoscono da soli, indipendentemente dalla deduplicazione.
+            error: Eccezione del download, se c'è stata.
+        Returns:
+            float: Intervallo (secondi) fino al prossimo controllo.
+        """
+        state = self._state.get(ticker)
+        if state is None:
+            return None
+        now = time.time() if now is None else now
+        self.polls += 1
+        state['polls'] += 1
+
+        if error is not None:
+            # Backoff (es. rate limit): si raddoppia l'intervallo, il ritmo stimato non cambia
+            state['errors'] += 1
+            interval = min(max(state['interval'], self.min_interval) * 2, ERROR_MAX_INTERVAL)
+            return self._schedule(state, interval, now)
+
+        session = market_session(ticker, now)
+        rates = state['rates']
+        bucket = 'open' if session == 'open' else 'off'
+        times = sorted(_epoch(t) for t in published or [])
+        if state['last_published'] is None:
+            # Primo controllo: ritmo stimato dalle date degli articoli restituiti
+            new = 0
+            if times:
+                span = max(now - times[0], BOOTSTRAP_MIN_SPAN)
+                rates['open'] = rates['off'] = len(times) / span
+        else:
+            new = sum(1 for t in times if t > state['last_published'])
+            elapsed = max(now - state['last_poll'], 1.0)
+            weight = 1 - math.exp(-elapsed / RATE_TAU)
+            rate = rates[bucket] or 0.0
+            rates[bucket] = rate + weight * (new / elapsed - rate)
+        if times:
+            state['last_published'] = max(times[-1], state['last_published'] or 0.0)
+        elif state['last_published'] is None:
+            state['last_published'] = 0.0 # Nessun articolo: i prossimi saranno tutti nuovi
+        state['last_poll'] = now
+        state['articles'] += new
+
+        if new >= BURST_NEW:
+            interval = self.min_interval # Burst: si stringe subito
+        elif rates[bucket]:
+            interval = TARGET_NEW_PER_POLL / rates[bucket] * SESSION_FACTOR[session]
+        else:
+            interval = self.max_interval * SESSION_FACTOR[session]
+        ceiling = self.max_closed_interval if session == 'closed' else self.max_interval
+        interval = min(max(interval, self.min_interval), ceiling)
+        if session != 'open':
+            # Mai oltre la prossima apertura: le notizie della seduta non devono aspettare
+            t = now + SESSION_STEP
+            while t < now + interval:
+                if market_session(ticker, t) == 'open':
+                    interval = t - now
+                    break
+                t += SESSION_STEP
+        return self._schedule(state, interval, now)
+
+    def _schedule(self, state, interval, now):
+        state['interval'] = interval
+        state['next_at'] = now + interval
+        return interval
+
+    def stats(self, now=None):
+        """Intervallo, ritmo (articoli/ora) e sessione per ticker, più i controlli totali."""
+        now = time.time() if now is None else now
+        return {
+            'polls': self.polls,
+            'tickers': {
+                ticker: {
+                    'interval_s': round(state['interval']),
+                    'rate_h': round((state['rates']['open'] or 0.0) * 3600, 2),
+                    'rate_off_h': round((state['rates']['off'] or 0.0) * 3600, 2),
+                    'session': market_session(ticker, now),
+                    'next_in_s': round(max(0.0, state['next_at'] - now)),
+                    'errors': state['errors'],
+                }
+                for ticker, state in self._state.items()
+            },
+        }
+
+    def describe(self, now=None):
+        """Riassunto di una riga per il log."""
+        stats = self.stats(now)['tickers']
+        parts = [f"{ticker} {s['interval_s'] // 60}m" for ticker, s in
+                 sorted(stats.items(), key=lambda item: item[1]['interval_s'])]
+        return ", ".join(parts)
+
+
+# --- ESECUZIONE (per testare questo file) ---
+if __name__ == "__main__":
+    import random
+
+    # Simulazione di una settimana: arrivi di Poisson con ritmi diversi per ticker e
+    # per sessione, confronto tra il ciclo fisso di 300s e lo scheduler adattivo.
+    rng = random.Random(0)
+    start = datetime(2025, 11, 3, tzinfo=timezone.utc).timestamp() # Lunedì
+    end = start + 7 * 86400
+    rates_h = { # Articoli/ora a mercato aperto e chiuso
+        'NVDA': (6.0, 0.8), 'TSLA': (4.0, 0.6), 'AAPL': (3.0, 0.4), 'MSFT': (2.0, 0.3),
+        '^GSPC': (1.5, 0.2), 'GC=F': (1.0, 0.3), 'CL=F': (1.0, 0.3), 'BTC-USD': (1.5, 1.5),
+        'ENEL.MI': (0.2, 0.02), 'XYZ': (0.05, 0.01),
+    }
+    arrivals = {}
+    for ticker, (rate_open, rate_closed) in rates_h.items():
+        t, times = start, []
+        while t < end:
+            rate = rate_open if market_session(ticker, t) == 'open' else rate_closed
+            t += rng.expovariate(rate / 3600)
+            times.append(t)
+        # Un burst (es. trimestrale) per NVDA il mercoledì pomeriggio
+        if ticker == 'NVDA':
+            burst_at = start + 2 * 86400 + 21 * 3600
+            times += [burst_at + rng.uniform(0, 1800) for _ in range(25)]
+        arrivals[ticker] = sorted(times)
+
+    def simulate(next_interval):
+        """Restituisce (richieste, latenze per ticker a mercato aperto, latenze a mercato chiuso)."""
+        requests = 0
+        latencies = {ticker: [] for ticker in rates_h}
+        closed_latencies = []
+        for ticker, times in arrivals.items():
+            t, i = start, 0
+            published_window = []
+            while t < end:
+                requests += 1
+                while i < len(times) and times[i] <= t:
+                    if market_session(ticker, times[i]) == 'open':
+                        latencies[ticker].append(t - times[i])
+                    else:
+                        closed_latencies.append(t - times[i])
+                    published_window.append(times[i])
+                    i += 1
+                published_window = published_window[-10:] # Yahoo restituisce gli ultimi articoli
+                t += next_interval(ticker, list(published_window), t)
+        return requests, latencies, closed_latencies
+
+    fixed_requests, fixed_latencies, fixed_closed = simulate(lambda ticker, published, now: 300)
+    scheduler = NewsScheduler(rates_h)
+    adaptive_requests, adaptive_latencies, adaptive_closed = simulate(
+        lambda ticker, published, now: scheduler.record(ticker, published, now=now))
+
+    def mean(values):
+        return sum(values) / len(values) if values else 0.0
+
+    def median(values):
+        values = sorted(values)
+        return values[len(values) // 2] if values else 0.0
+
+    print(f"Richieste in una settimana: fisso {fixed_requests}, adattivo {adaptive_requests} "
+          f"({fixed_requests / adaptive_requests:.1f}x in meno)")
+    print("Latenza media degli articoli pubblicati a mercato aperto:")
+    print(f"{'ticker':<10} {'fisso':>10} {'adattivo':>10}")
+    for ticker in rates_h:
+        print(f"{ticker:<10} {mean(fixed_latencies[ticker]) / 60:9.1f}m {mean(adaptive_latencies[ticker]) / 60:9.1f}m")
+    all_fixed = [x for values in fixed_latencies.values() for x in values]
+    all_adaptive = [x for values in adaptive_latencies.values() for x in values]
+    print(f"{'tutti':<10} {mean(all_fixed) / 60:9.1f}m {mean(all_adaptive) / 60:9.1f}m")
+    print(f"{'mediana':<10} {median(all_fixed) / 60:9.1f}m {median(all_adaptive) / 60:9.1f}m")
+    print(f"{'chiuso':<10} {mean(fixed_closed) / 60:9.1f}m {mean(adaptive_closed) / 60:9.1f}m  (notte/weekend)")
+    print(f"Stato finale: {scheduler.describe(end)}")
@@ -0,0 +1,409 @@
+import os
+import re
+import json
+import sqlite3
+import time
+from datetime import datetime, timezone
+from sqlite_store import SQLiteStore
+
+try:
+    # Stessa normalizzazione del news feed, per migrare gli archivi precedenti
+    from news import canonical_url, content_hash
+except ImportError:
+    canonical_url = content_hash = None
+
+# --- ARCHIVIO LOCALE DELLE NOTIZIE (SQLite) ---
+# Ogni notizia normalizzata (vedi news.py) viene salvata una sola volta,
+# identificata dal link canonico o dall'impronta del contenuto (vedi
+# news.article_keys), con tutti i suoi ticker e il suo trading_signal. Serve per la
+# deduplicazione anche dopo un riavvio, per ripopolare il feed all'avvio e
+# per le ricerche dalla UI (parole chiave, ticker, intervallo di tempo).
+# Le parole chiave usano un indice FTS5 su titolo/testo/editore; se la
+# build di SQLite non ha FTS5 si ripiega su LIKE.
+
+DEFAULT_DB_PATH = os.path.join('cache', 'news.sqlite3')
+DEFAULT_LIMIT = 50 # Come il numero massimo di card nel feed
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    id        INTEGER PRIMARY KEY,
+    link      TEXT NOT NULL UNIQUE,
+    ts        INTEGER NOT NULL,
+    ticker    TEXT,
+    title     TEXT,
+    text      TEXT,
+    publisher TEXT,
+    source    TEXT,
+    signal    TEXT,
+    added_at  REAL NOT NULL,
+    content_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS news_ts ON news (ts);
+
+CREATE TABLE IF NOT EXISTS news_tickers (
+    ticker  TEXT NOT NULL,
+    ts      INTEGER NOT NULL,
+    news_id INTEGER NOT NULL,
+    PRIMARY KEY (ticker, ts, news_id)
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS news_tickers_id ON news_tickers (news_id, ticker);
+"""
+
+# Indice esterno sul contenuto di 'news', tenuto allineato dai trigger.
+# L'aggiornamento del solo trading_signal non tocca l'indice.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(
+    title, text, publisher, content='news', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS news_fts_insert AFTER INSERT ON news BEGIN
+    INSERT INTO news_fts (rowid, title, text, publisher)
+    VALUES (new.id, new.title, new.text, new.publisher);
+END;
+CREATE TRIGGER IF NOT EXISTS news_fts_delete AFTER DELETE ON news BEGIN
+    INSERT INTO news_fts (news_fts, rowid, title, text, publisher)
+    VALUES ('delete', old.id, old.title, old.text, old.publisher);
+END;
+CREATE TRIGGER IF NOT EXISTS news_fts_update AFTER UPDATE OF title, text, publisher ON news BEGIN
+    INSERT INTO news_fts (news_fts, rowid, title, text, publisher)
+    VALUES ('delete', old.id, old.title, old.text, old.publisher);
+    INSERT INTO news_fts (rowid, title, text, publisher)
+    VALUES (new.id, new.title, new.text, new.publisher);
+END;
+"""
+
+# Indice creato dopo l'eventuale migrazione degli archivi senza content_hash
+_HASH_INDEX = "CREATE INDEX IF NOT EXISTS news_hash ON news (content_hash)"
+
+_COLUMNS = "n.id, n.link, n.ts, n.ticker, n.title, n.text, n.publisher, n.source, n.signal"
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_SINCE_RE = re.compile(r"^(\d+)([hdw])$")
+_SINCE_UNITS = {'h': 3600, 'd': 86400, 'w': 7 * 86400}
+
+
+def to_epoch(timestamp):
+    """datetime (naive = UTC, come in news.py) -> secondi UTC interi."""
+    if timestamp is None:
+        return int(time.time())
+    if isinstance(timestamp, (int, float)):
+        return int(timestamp)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return int(timestamp.timestamp())
+
+
+def from_epoch(seconds):
+    """Secondi UTC -> datetime naive in UTC (lo stesso formato di news.py)."""
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None)
+
+
+def parse_filter(text):
+    """
+    Interpreta il testo del filtro del feed. Restituisce (parole, ticker, since):
+    - '$NVDA' o 'ticker:NVDA' filtrano per ticker;
+    - 'last:24h', 'last:7d', 'last:2w' limitano l'intervallo di tempo;
+    - il resto sono parole chiave (tutte devono comparire, anche come prefisso).
+    """
+    words, tickers, since = [], [], None
+    for token in (text or '').split():
+        lower = token.lower()
+        if token.startswith('$') and len(token) > 1:
+            tickers.append(token[1:].upper())
+        elif lower.startswith('ticker:') and len(token) > 7:
+            tickers.append(token[7:].upper())
+        elif lower.startswith('last:') and _SINCE_RE.match(lower[5:]):
+            amount, unit = _SINCE_RE.match(lower[5:]).groups()
+            since = time.time() - int(amount) * _SINCE_UNITS[unit]
+        else:
+            words.append(token)
+    return ' '.join(words), tickers, since
+
+
+class NewsStore(SQLiteStore):
+    """Archivio persistente delle notizie su SQLite (WAL), con indice full-text."""
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        super().__init__(db_path, _SCHEMA)
+
+        with self._connect() as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(news)")}
+            if 'content_hash' not in columns:
+                conn.execute("ALTER TABLE news ADD COLUMN content_hash TEXT")
+            conn.execute(_HASH_INDEX)
+            try:
+                conn.executescript(_FTS_SCHEMA)
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                print("[NewsStore] FTS5 non disponibile in questa build di SQLite. Ricerca con LIKE.")
+                self.has_fts = False
+            migrated = self._migrate(conn)
+            if migrated:
+                print(f"[NewsStore] Migrazione: {migrated} notizie con link canonico e impronta del contenuto.")
+
+    @staticmethod
+    def _migrate(conn):
+        """
+        Notizie salvate prima di link canonici e impronte (content_hash NULL):
+        si calcola l'impronta e si riscrive il link in forma canonica, altrimenti
+        non verrebbero più riconosciute e sarebbero salvate, emesse e analizzate
+        di nuovo. Se due vecchi link diventano lo stesso, i ticker si uniscono
+        nella notizia già canonica. Restituisce le notizie migrate.
+        """
+        if canonical_url is None:
+            return 0
+        rows = conn.execute("SELECT id, link, ts, title, publisher, signal FROM news "
+                            "WHERE content_hash IS NULL").fetchall()
+        for news_id, link, ts, title, publisher, signal in rows:
+            digest = content_hash(title, publisher, from_epoch(ts))
+            canonical = canonical_url(link)
+            target = None
+            if canonical != link:
+                target = conn.execute("SELECT id, ts FROM news WHERE link = ?", (canonical,)).fetchone()
+            if target is None:
+                conn.execute("UPDATE news SET link = ?, content_hash = ? WHERE id = ?", (canonical, digest, news_id))
+                continue
+            # Stesso articolo già salvato con il link canonico: si spostano ticker e segnale
+            target_id, target_ts = target
+            conn.execute("INSERT OR IGNORE INTO news_tickers (ticker, ts, news_id) "
+                         "SELECT ticker, ?, ? FROM news_tickers WHERE news_id = ?", (target_ts, target_id, news_id))
+            conn.execute("UPDATE news SET signal = COALESCE(signal, ?) WHERE id = ?", (signal, target_id))
+            conn.execute("DELETE FROM news_tickers WHERE news_id = ?", (news_id,))
+            conn.execute("DELETE FROM news WHERE id = ?", (news_id,))
+        return len(rows)
+
+    @staticmethod
+    def _find(conn, link, content_hash):
+        """(id, ts) della notizia con lo stesso link o lo stesso contenuto, o None."""
+        row = conn.execute("SELECT id, ts FROM news WHERE link = ?", (link,)).fetchone()
+        if row is None and content_hash:
+            row = conn.execute("SELECT id, ts FROM news WHERE content_hash = ? LIMIT 1",
+                               (content_hash,)).fetchone()
+        return row
+
+    def _insert(self, conn, item):
+        """Inserisce la notizia (o solo i suoi ticker, se l'articolo esiste già). True se è nuova."""
+        tickers = item.get('tickers') or ([item['ticker']] if item.get('ticker') else [])
+        existing = self._find(conn, item['link'], item.get('content_hash'))
+        if existing is None:
+            ts = to_epoch(item.get('timestamp'))
+            signal = item.get('trading_signal')
+            cursor = conn.execute(
+                "INSERT INTO news (link, ts, ticker, title, text, publisher, source, signal, added_at, content_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (item['link'], ts, item.get('ticker'), item.get('title'), item.get('text'),
+                 item.get('publisher'), item.get('source'),
+                 json.dumps(signal) if signal else None, time.time(), item.get('content_hash'))
+            )
+            news_id = cursor.lastrowid
+        else:
+            news_id, ts = existing
+        conn.executemany("INSERT OR IGNORE INTO news_tickers (ticker, ts, news_id) VALUES (?, ?, ?)",
+                         [(ticker, ts, news_id) for ticker in tickers])
+        return existing is None
+
+    def add_if_new(self, item):
+        """
+        Salva la notizia se l'articolo non è già in archivio. True se era nuova;
+        altrimenti aggiunge all'articolo salvato gli eventuali ticker nuovi.
+        """
+        if not item.get('link'):
+            return False
+        with self._lock, self._connect() as conn:
+            return self._insert(conn, item)
+
+    def add_many(self, items):
+        """Come add_if_new per un lotto, in una sola transazione. Restituisce le notizie nuove."""
+        new_items = []
+        with self._lock, self._connect() as conn:
+            for item in items:
+                if item.get('link') and self._insert(conn, item):
+                    new_items.append(item)
+        return new_items
+
+    def contains(self, link):
+        """True se il link è già in archivio."""
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM news WHERE link = ?", (link,)).fetchone() is not None
+
+    def tickers_for(self, link):
+        """Tutti i ticker registrati per l'articolo."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT t.ticker FROM news n JOIN news_tickers t ON t.news_id = n.id "
+                                "WHERE n.link = ?", (link,)).fetchall()
+        return [row[0] for row in rows]
+
+    def update_signal(self, link, trading_signal):
+        """Salva (o sostituisce) il trading_signal di una notizia."""
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE news SET signal = ? WHERE link = ?",
+                         (json.dumps(trading_signal) if trading_signal else None, link))
+
+    def get_signal(self, link):
+        """Restituisce il trading_signal salvato per il link (o None)."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT signal FROM news WHERE link = ?", (link,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def recent(self, limit=DEFAULT_LIMIT, tickers=None):
+        """Le notizie più recenti (dalla più recente), eventualmente solo per alcuni ticker."""
+        return self.search(tickers=tickers, limit=limit)
+
+    def search(self, query=None, tickers=None, since=None, until=None, limit=DEFAULT_LIMIT):
+        """
+        Cerca nell'archivio, dalla notizia più recente.
+
+        Args:
+            query (str): Parole chiave su titolo/testo/editore (tutte, anche come prefisso).
+            tickers (list): Solo le notizie di questi ticker.
+            since, until: Intervallo di tempo (datetime naive UTC o secondi epoch).
+            limit (int): Numero massimo di risultati.
+        """
+        words = _WORD_RE.findall(query or '')
+        tickers = [t for t in (tickers or []) if t]
+        where, params = [], []
+        if since is not None:
+            where.append("n.ts >= ?")
+            params.append(to_epoch(since))
+        if until is not None:
+            where.append("n.ts <= ?")
+            params.append(to_epoch(until))
+
+        if words and self.has_fts:
+            # Ogni parola tra virgolette (niente sintassi FTS dall'utente), come prefisso
+            sql = f"SELECT {_COLUMNS} FROM news_fts JOIN news n ON n.id = news_fts.rowid"
+            where.insert(0, "news_fts MATCH ?")
+            params.insert(0, ' '.join(f'"{word}"*' for word in words))
+        else:
+            sql = f"SELECT {_COLUMNS} FROM news n"
+            for word in words:
+                where.append("(n.title LIKE ? OR n.text LIKE ? OR n.publisher LIKE ?)")
+                params.extend([f"%{word}%"] * 3)
+
+        if tickers:
+            if not words:
+                # Solo ticker: scansione dell'indice (ticker, ts) dal più recente
+                sql = f"SELECT {_COLUMNS} FROM news_tickers t JOIN news n ON n.id = t.news_id"
+                where = [clause.replace("n.ts", "t.ts") for clause in where]
+                order = "t.ts"
+            else:
+                order = "n.ts"
+            marks = ', '.join('?' * len(tickers))
+            if words:
+                where.append(f"n.id IN (SELECT news_id FROM news_tickers WHERE ticker IN ({marks}))")
+            else:
+                where.append(f"t.ticker IN ({marks})")
+            params.extend(tickers)
+        else:
+            order = "n.ts"
+
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        # Una notizia di più ticker filtrati compare una volta per ticker: si chiede qualche riga in più
+        fetch_limit = limit * len(tickers) if tickers and not words else limit
+        sql += f" ORDER BY {order} DESC LIMIT ?"
+        params.append(fetch_limit)
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+            items, ids = [], set()
+            for row in rows:
+                if row[0] in ids:
+                    continue
+                ids.add(row[0])
+                items.append(row)
+                if len(items) >= limit:
+                    break
+            tickers = {}
+            if items:
+                marks = ', '.join('?' * len(items))
+                for news_id, ticker in conn.execute(
+                        f"SELECT news_id, ticker FROM news_tickers WHERE news_id IN ({marks})",
+                        [row[0] for row in items]):
+                    tickers.setdefault(news_id, []).append(ticker)
+            return [self._to_item(row, tickers.get(row[0])) for row in items]
+
+    @staticmethod
+    def _to_item(row, tickers):
+        news_id, link, ts, ticker, title, text, publisher, source, signal = row
+        # Il ticker con cui è stata trovata resta il primo
+        tickers = sorted(tickers or ([ticker] if ticker else []), key=lambda t: t != ticker)
+        item = {
+            'source': source,
+            'ticker': ticker,
+            'tickers': tickers,
+            'title': title,
+            'link': link,
+            'publisher': publisher,
+            'timestamp': from_epoch(ts),
+            'text': text,
+        }
+        if signal:
+            item['trading_signal'] = json.loads(signal)
+        return item
+
+    def stats(self):
+        """Numero di notizie salvate, di quelle con trading_signal e di ticker distinti."""
+        with self._connect() as conn:
+            n_news, n_signals = conn.execute(
+                "SELECT COUNT(*), COUNT(signal) FROM news").fetchone()
+            n_tickers = conn.execute("SELECT COUNT(DISTINCT ticker) FROM news_tickers").fetchone()[0]
+        return {'news': n_news, 'signals': n_signals, 'tickers': n_tickers, 'fts': self.has_fts}
+
+
+# --- ESECUZIONE (per testare questo file) ---
+if __name__ == "__main__":
+    import random
+    import tempfile
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'news_test.sqlite3')
+    store = NewsStore(db_path)
+
+    # Archivio sintetico per verificare i tempi su molte righe (NEWS_STORE_ROWS=1000000 per la prova lunga)
+    n_rows = int(os.environ.get('NEWS_STORE_ROWS', 200_000))
+    rng = random.Random(0)
+    tickers = ['GC=F', 'CL=F', '^GSPC', 'NVDA', 'MSFT', 'GOOGL', 'TSLA', 'AAPL'] + \
+              [f"T{i}" for i in range(500)]
+    words = ["gold", "oil", "rally", "earnings", "guidance", "chip", "demand", "fed", "rates",
+             "inflation", "merger", "lawsuit", "record", "slump", "upgrade", "downgrade"]
+    now = int(time.time())
+    start = time.perf_counter()
+    batch = []
+    for i in range(n_rows):
+        title = " ".join(rng.sample(words, 4)) + f" {i}"
+        batch.append({'source': 'Yahoo Finance', 'ticker': rng.choice(tickers), 'title': title,
+                      'link': f"https://finance.example.com/news/{i}", 'publisher': rng.choice(["Reuters", "Bloomberg"]),
+                      'timestamp': now - rng.randint(0, 365 * 86400), 'text': title})
+        if len(batch) == 10_000:
+            store.add_many(batch)
+            batch = []
+    store.add_many(batch)
+    print(f"{n_rows} notizie salvate in {time.perf_counter() - start:.1f}s")
+
+    item = {'source': 'Yahoo Finance', 'ticker': 'NVDA', 'title': 'Nvidia record earnings',
+            'link': 'https://finance.example.com/news/nvda-record', 'publisher': 'Reuters',
+            'timestamp': datetime.now(timezone.utc).replace(tzinfo=None), 'text': 'Nvidia record earnings'}
+    assert store.add_if_new(item) and not store.add_if_new(item)
+    assert not store.add_if_new(dict(item, ticker='MSFT', tickers=['MSFT'])) # Stesso link, secondo ticker
+    assert store.add_if_new(dict(item, link=item['link'] + '-other', content_hash='def'))
+    assert not store.add_if_new(dict(item, link=item['link'] + '-syndicated', tickers=['^GSPC'],
+                                     content_hash='def')) # Stesso contenuto, link diverso
+    store.update_signal(item['link'], {'direction': 'BULLISH', 'confidence': 80})
+    stored = store.recent(1, tickers=['MSFT'])[0]
+    assert stored['trading_signal']['direction'] == 'BULLISH' and stored['tickers'] == ['NVDA', 'MSFT']
+
+    checks = [
+        ("dedupe (link)", lambda: store.contains("https://finance.example.com/news/123456")),
+        ("ultime 50", lambda: store.recent()),
+        ("ultime 50 NVDA", lambda: store.recent(tickers=['NVDA'])),
+        ("ultime 50 di 3 ticker", lambda: store.recent(tickers=['NVDA', 'MSFT', 'T7'])),
+        ("'gold rally'", lambda: store.search("gold rally")),
+        ("'earn' NVDA 7 giorni", lambda: store.search("earn", tickers=['NVDA'], since=time.time() - 7 * 86400)),
+        ("filtro UI", lambda: store.search(*parse_filter("fed rates $T42 last:30d")[:2],
+                                           since=parse_filter("last:30d")[2])),
+    ]
+    for name, check in checks:
+        start = time.perf_counter()
+        result = check()
+        elapsed = (time.perf_counter() - start) * 1000
+        count = len(result) if isinstance(result, list) else result
+        print(f"{name:<24} {elapsed:8.2f} ms  {count}")
+    print(f"Statistiche: {store.stats()}")
@@ -0,0 +1,500 @@
+import json
+import socket
+import threading
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+# --- FLUSSO DI QUOTAZIONI IN STREAMING ---
+# Un'unica connessione "websocket-style" per tutti i simboli della watchlist.
+# Il feed gira su un thread suo e passa i tick a un TickAggregator
+# (thread-safe) che li raccoglie nella barra corrente; l'interfaccia
+# preleva gli aggiornamenti a intervalli fissi (vedi QuoteStreamBridge in
+# graph.py), quindi centinaia di tick al secondo diventano al massimo un
+# aggiornamento per simbolo per intervallo.
+#
+# Il feed è intercambiabile: YahooQuoteFeed (yf.WebSocket) per l'uso reale,
+# JsonLinesQuoteFeed + FakeQuoteServer (tick registrati) per test e benchmark.
+
+Tick = namedtuple('Tick', ['symbol', 'price', 'ts', 'day_volume']) # ts in secondi unix
+
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 30.0
+
+
+def interval_seconds(interval):
+    """Durata in secondi di un intervallo Yahoo intraday ('2m' -> 120, '1h' -> 3600)."""
+    units = {'m': 60, 'h': 3600}
+    return int(interval[:-1]) * units[interval[-1]]
+
+
+def tick_from_message(message):
+    """Converte un messaggio (dict stile Yahoo: id, price, time in ms, day_volume) in Tick."""
+    try:
+        symbol = message.get('id') or message.get('symbol')
+        price = float(message['price'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not symbol:
+        return None
+    stamp = message.get('time')
+    try:
+        ts = float(stamp) / 1000.0 if stamp is not None else time.time()
+    except (TypeError, ValueError):
+        ts = time.time()
+    volume = message.get('day_volume', message.get('dayVolume'))
+    try:
+        volume = float(volume) if volume is not None else None
+    except (TypeError, ValueError):
+        volume = None
+    return Tick(symbol, price, ts, volume)
+
+
+def tick_to_message(tick):
+    return {'id': tick.symbol, 'price': tick.price, 'time': str(int(tick.ts * 1000)),
+            'day_volume': tick.day_volume}
+
+
+class QuoteFeed:
+    """
+    Interfaccia comune dei feed. on_tick(tick) viene chiamata dal thread del
+    feed: non deve toccare Qt (usare un TickAggregator).
+    """
+    name = "base"
+
+    def __init__(self):
+        self._symbols = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.on_tick = None
+        self.ticks_received = 0
+
+    @property
+    def symbols(self):
+        with self._lock:
+            return sorted(self._symbols)
+
+    def set_symbols(self, symbols):
+        """Allinea le sottoscrizioni alla lista indicata (aggiunge e rimuove)."""
+        symbols = set(symbols)
+        with self._lock:
+            added = symbols - self._symbols
+            removed = self._symbols - symbols
+            self._symbols = symbols
+        if self.is_running():
+            if removed:
+                self._send_unsubscribe(sorted(removed))
+            if added:
+                self._send_subscribe(sorted(added))
+
+    def start(self, on_tick):
+        if self.is_running():
+            return
+        self.on_tick = on_tick
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run_forever, name=f"QuoteFeed-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        self._close()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _emit(self, tick):
+        if tick is None:
+            return
+        with self._lock:
+            if tick.symbol not in self._symbols:
+                return
+        self.ticks_received += 1
+        if self.on_tick:
+            self.on_tick(tick)
+
+    def _run_forever(self):
+        """Mantiene la connessione aperta, con riconnessione e backoff."""
+        delay = RECONNECT_DELAY
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self._run()
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                print(f"[QuoteFeed] Connessione {self.name} persa: {e}")
+            if time.monotonic() - started > MAX_RECONNECT_DELAY:
+                delay = RECONNECT_DELAY # La connessione era stabile: si riparte da capo
+            if self._stop.wait(delay):
+                break
+            delay = min(MAX_RECONNECT_DELAY, delay * 2)
+
+    # Da implementare nei feed concreti
+    def _run(self):
+        raise NotImplementedError
+
+    def _send_subscribe(self, symbols):
+        raise NotImplementedError
+
+    def _send_unsubscribe(self, symbols):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+
+class JsonLinesQuoteFeed(QuoteFeed):
+    """
+    Client TCP con protocollo a righe JSON: invia {"subscribe": [...]} /
+    {"unsubscribe": [...]} e riceve un messaggio stile Yahoo per riga.
+    È il client del FakeQuoteServer.
+    """
+    name = "jsonl"
+
+    def __init__(self, host='127.0.0.1', port=8765, timeout=5.0):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._sock = None
+        self._send_lock = threading.Lock()
+
+    def _send(self, payload):
+        sock = self._sock
+        if sock is None:
+            return
+        with self._send_lock:
+            sock.sendall((json.dumps(payload) + "\n").encode())
+
+    def _send_subscribe(self, symbols):
+        self._send({'subscribe': symbols})
+
+    def _send_unsubscribe(self, symbols):
+        self._send({'unsubscribe': symbols})
+
+    def _run(self):
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+            sock.settimeout(1.0) # Per controllare periodicamente lo stop
+            self._sock = sock
+            try:
+                self._send_subscribe(self.symbols)
+                buffer = b""
+                while not self._stop.is_set():
+                    try:
+                        chunk = sock.recv(65536)
+                    except socket.timeout:
+                        continue
+                    if not chunk:
+                        raise ConnectionError("connessione chiusa dal server")
+                    buffer += chunk
+                    *lines, buffer = buffer.split(b"\n")
+                    for line in lines:
+                        if line.strip():
+                            self._emit(tick_from_message(json.loads(line)))
+            finally:
+                self._sock = None
+
+    def _close(self):
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class YahooQuoteFeed(QuoteFeed):
+    """Feed reale tramite lo streaming di Yahoo (yf.WebSocket, yfinance >= 0.2.55)."""
+    name = "yahoo"
+
+    def __init__(self):
+        super().__init__()
+        import yfinance as yf
+        if not hasattr(yf, 'WebSocket'):
+            raise RuntimeError("questa versione di yfinance non supporta lo streaming (yf.WebSocket)")
+        self._yf = yf
+        self._ws = None
+
+    def _send_subscribe(self, symbols):
+        if self._ws is not None and symbols:
+            self._ws.subscribe(symbols)
+
+    def _send_unsubscribe(self, symbols):
+        if self._ws is not None and symbols:
+            self._ws.unsubscribe(symbols)
+
+    def _run(self):
+        self._ws = self._yf.WebSocket(verbose=False)
+        try:
+            self._send_subscribe(self.symbols)
+            self._ws.listen(lambda message: self._emit(tick_from_message(message)))
+        finally:
+            ws, self._ws = self._ws, None
+            try:
+                ws.close()
+            except Exception:
+                pass
+
+    def _close(self):
+        if self._ws is not None:
+            try:
+                self._ws.close()
+            except Exception:
+                pass
+
+
+class TickAggregator:
+    """
+    Raccoglie i tick nella barra corrente di ogni simbolo (intervallo fisso,
+    allineato all'epoca come le barre di Yahoo). drain() restituisce solo i
+    simboli cambiati dall'ultima chiamata.
+    """
+    def __init__(self, interval_seconds=120):
+        self.interval = int(interval_seconds)
+        self._lock = threading.Lock()
+        self._bars = {} # symbol -> [start, open, high, low, close, volume]
+        self._day_volume = {}
+        self._dirty = set()
+        self.ticks = 0
+        self.drained = 0
+
+    def add(self, tick):
+        start = int(tick.ts // self.interval) * self.interval
+        with self._lock:
+            self.ticks += 1
+            volume = 0.0
+            if tick.day_volume is not None:
+                previous = self._day_volume.get(tick.symbol)
+                if previous is not None and tick.day_volume >= previous:
+                    volume = tick.day_volume - previous
+                self._day_volume[tick.symbol] = tick.day_volume
+
+            bar = self._bars.get(tick.symbol)
+            if bar is None or start > bar[0]:
+                self._bars[tick.symbol] = [start, tick.price, tick.price, tick.price, tick.price, volume]
+            elif start == bar[0]:
+                bar[2] = max(bar[2], tick.price)
+                bar[3] = min(bar[3], tick.price)
+                bar[4] = tick.price
+                bar[5] += volume
+            else:
+                return # Tick in ritardo su una barra già chiusa
+            self._dirty.add(tick.symbol)
+
+    def drain(self):
+        """{symbol: (start, open, high, low, close, volume)} dei simboli aggiornati."""
+        with self._lock:
+            updates = {symbol: tuple(self._bars[symbol]) for symbol in self._dirty}
+            self._dirty.clear()
+        self.drained += len(updates)
+        return updates
+
+    def stats(self):
+        with self._lock:
+            return {'ticks': self.ticks, 'updates': self.drained,
+                    'coalescing': (self.ticks / self.drained) if self.drained else 0.0}
+
+
+def merge_stream_bar(data, bar):
+    """
+    Applica una barra aggregata dallo stream a una serie OHLCV (indice UTC naive).
+    Se la barra esiste già (dallo storico) si estendono massimo/minimo e si
+    aggiorna la chiusura; altrimenti viene aggiunta in coda.
+    """
+    start, open_, high, low, close, volume = bar
+    stamp = pd.Timestamp(start, unit='s')
+    if data.index.tz is not None:
+        stamp = stamp.tz_localize('UTC').tz_convert(data.index.tz)
+    if not data.empty and stamp < data.index[-1]:
+        return data # Barra più vecchia dell'ultima mostrata: lo storico fa fede
+
+    data = data.copy()
+    if not data.empty and stamp == data.index[-1]:
+        row = data.iloc[-1]
+        data.iloc[-1, data.columns.get_loc('High')] = max(row['High'], high)
+        data.iloc[-1, data.columns.get_loc('Low')] = min(row['Low'], low)
+        data.iloc[-1, data.columns.get_loc('Close')] = close
+        if 'Volume' in data.columns:
+            data.iloc[-1, data.columns.get_loc('Volume')] = max(row['Volume'], volume)
+        return data
+    new_row = pd.DataFrame({'Open': [open_], 'High': [high], 'Low': [low], 'Close': [close],
+                            'Volume': [volume]}, index=[stamp])
+    return pd.concat([data, new_row[data.columns.intersection(new_row.columns)]])
+
+
+def load_ticks(path):
+    """Legge tick registrati (una riga JSON stile Yahoo per tick)."""
+    ticks = []
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                tick = tick_from_message(json.loads(line))
+                if tick:
+                    ticks.append(tick)
+    return ticks
+
+
+def synthetic_ticks(symbols, count, start=None, step=0.01, seed=0):
+    """Tick sintetici (random walk) per benchmark e test senza rete."""
+    import random
+    rng = random.Random(seed)
+    start = time.time() if start is None else start
+    prices = {symbol: 100.0 + 10 * i for i, symbol in enumerate(symbols)}
+    volumes = {symbol: 0.0 for symbol in symbols}
+    ticks = []
+    for i in range(count):
+        symbol = symbols[i % len(symbols)]
+        prices[symbol] *= 1 + rng.uniform(-0.001, 0.001)
+        volumes[symbol] += rng.randint(1, 500)
+        ticks.append(Tick(symbol, round(prices[symbol], 4), start + i * step, volumes[symbol]))
+    return ticks
+
+
+class FakeQuoteServer:
+    """
+    Server TCP locale che si sostituisce al feed reale: riproduce tick
+    registrati verso i client JsonLinesQuoteFeed, filtrati per sottoscrizione.
+    speed=1 rispetta i tempi originali, speed=0 invia il più veloce possibile.
+    """
+    def __init__(self, ticks, host='127.0.0.1', port=0, speed=1.0, loop=False):
+        self.ticks = list(ticks)
+        self.speed = speed
+        self.loop = loop
+        self._server = socket.create_server((host, port))
+        self._server.settimeout(0.5)
+        self.host, self.port = self._server.getsockname()[:2]
+        self._stop = threading.Event()
+        self._thread = None
+        self.sent = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._accept_loop, name="FakeQuoteServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(2.0)
+        self._server.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        subscribed = set()
+        lock = threading.Lock()
+        ready = threading.Event() # Primo comando ricevuto: si può iniziare a inviare
+
+        def read_commands():
+            buffer = b""
+            while not self._stop.is_set():
+                try:
+                    chunk = conn.recv(4096)
+                except OSError:
+                    return
+                if not chunk:
+                    return
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    command = json.loads(line)
+                    with lock:
+                        subscribed.update(command.get('subscribe', []))
+                        subscribed.difference_update(command.get('unsubscribe', []))
+                    ready.set()
+
+        threading.Thread(target=read_commands, daemon=True).start()
+        ready.wait(2.0)
+        with conn:
+            try:
+                while not self._stop.is_set():
+                    previous_ts = None
+                    for tick in self.ticks:
+                        if self._stop.is_set():
+                            return
+                        if self.speed and previous_ts is not None and tick.ts > previous_ts:
+                            time.sleep((tick.ts - previous_ts) / self.speed)
+                        previous_ts = tick.ts
+                        with lock:
+                            wanted = tick.symbol in subscribed
+                        if wanted:
+                            conn.sendall((json.dumps(tick_to_message(tick)) + "\n").encode())
+                            self.sent += 1
+                    if not self.loop:
+                        break
+                    time.sleep(0.05)
+                while not self._stop.is_set():
+                    time.sleep(0.1) # Tick finiti: la connessione resta aperta
+            except OSError:
+                pass
+
+
+def create_feed(spec):
+    """
+    Crea un feed dall'impostazione 'quote_stream':
+    'yahoo' -> YahooQuoteFeed, 'host:porta' -> JsonLinesQuoteFeed (es. FakeQuoteServer).
+    """
+    if not spec:
+        return None
+    if spec == 'yahoo':
+        return YahooQuoteFeed()
+    host, _, port = str(spec).rpartition(':')
+    return JsonLinesQuoteFeed(host or '127.0.0.1', int(port))
+
+
+# --- ESECUZIONE (per testare questo file) ---
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        # python quote_feed.py serve [file_tick.jsonl] [porta]: server finto per l'app
+        ticks = load_ticks(sys.argv[2]) if len(sys.argv) > 2 else \
+            synthetic_ticks(['AAPL', 'MSFT', 'NVDA', 'GC=F'], 100_000, step=0.005)
+        port = int(sys.argv[3]) if len(sys.argv) > 3 else 8765
+        server = FakeQuoteServer(ticks, port=port, loop=True).start()
+        print(f"[FakeQuoteServer] In ascolto su {server.host}:{server.port} "
+              f"(impostare \"quote_stream\": \"{server.host}:{server.port}\")")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.stop()
+        sys.exit(0)
+
+    # Benchmark: 200k tick su 50 simboli, inviati il più veloce possibile
+    symbols = [f"SYM{i}" for i in range(50)]
+    ticks = synthetic_ticks(symbols, 200_000, step=0.001)
+    aggregator = TickAggregator(interval_seconds=120)
+    flushes = []
+    with FakeQuoteServer(ticks, speed=0) as server:
+        feed = JsonLinesQuoteFeed(server.host, server.port)
+        feed.set_symbols(symbols)
+        start = time.monotonic()
+        feed.start(aggregator.add)
+        while aggregator.ticks < len(ticks) and time.monotonic() - start < 30:
+            time.sleep(0.1) # Flush a frequenza limitata, come il QTimer dell'interfaccia
+            flushes.append(len(aggregator.drain()))
+        elapsed = time.monotonic() - start
+        feed.stop()
+
+    print(f"{aggregator.ticks} tick in {elapsed:.2f}s ({aggregator.ticks / elapsed:,.0f} tick/s)")
+    print(f"{len(flushes)} flush, al massimo {max(flushes)} aggiornamenti per flush: {aggregator.stats()}")
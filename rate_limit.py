@@ -0,0 +1,280 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# --- RATE LIMITER CONDIVISO PER GLI ENDPOINT YAHOO ---
+# Token bucket per host + budget per endpoint, con backoff esponenziale
+# (jitter) e rispetto di Retry-After quando Yahoo risponde 429.
+
+# host -> (richieste al secondo, burst)
+DEFAULT_HOST_LIMITS = {
+    'query1.finance.yahoo.com': (4.0, 8),
+    'query2.finance.yahoo.com': (4.0, 8),
+    'finance.yahoo.com': (1.0, 3),
+}
+DEFAULT_HOST_LIMIT = (2.0, 4)
+
+# endpoint -> (host, richieste al secondo, burst)
+DEFAULT_ENDPOINT_LIMITS = {
+    'search': ('query1.finance.yahoo.com', 2.0, 4),
+    'history': ('query2.finance.yahoo.com', 3.0, 6),
+    'news': ('query2.finance.yahoo.com', 4.0, 8), # Burst = thread del fan-out di news.py (vedi news.configure_rate)
+    'article': ('finance.yahoo.com', 1.0, 2),
+}
+
+THROTTLE_STATUS = (429, 503)
+THROTTLE_MARKERS = ('too many requests', 'rate limit') # Non '429' da solo: compare in troppi messaggi
+
+
+class TokenBucket:
+    """Token bucket thread-safe: `rate` token al secondo, al massimo `capacity`."""
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, cost=1.0):
+        """
+        Attende finché ci sono `cost` token e li consuma. Restituisce i secondi attesi.
+        Un costo maggiore della capacità (es. yf.download di 40 ticker) viene
+        pagato a fette di `capacity` token, senza superare il rate.
+        """
+        cost = float(cost)
+        waited = 0.0
+        while cost > self.capacity:
+            waited += self._acquire(self.capacity)
+            cost -= self.capacity
+        return waited + self._acquire(cost)
+
+    def _acquire(self, cost):
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    return waited
+                delay = (cost - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def is_throttle_error(error):
+    """True se l'eccezione indica un rate limit di Yahoo (429 / YFRateLimitError)."""
+    if type(error).__name__ == 'YFRateLimitError':
+        return True
+    response = getattr(error, 'response', None)
+    if getattr(response, 'status_code', None) in THROTTLE_STATUS:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in THROTTLE_MARKERS)
+
+
+def parse_retry_after(value):
+    """Converte l'header Retry-After (secondi o data HTTP) in secondi di attesa."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_after_from(obj):
+    response = getattr(obj, 'response', obj)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    try:
+        return parse_retry_after(headers.get('Retry-After'))
+    except Exception:
+        return None
+
+
+class RateLimiter:
+    """
+    Limita e coordina tutte le chiamate verso Yahoo (ricerca, storico,
+    notizie, articoli) con un token bucket per host e uno per endpoint.
+    Su 429 mette in pausa l'intero host e ritenta con backoff.
+    """
+    def __init__(self, host_limits=None, endpoint_limits=None, max_retries=4,
+                 base_delay=1.0, max_delay=60.0):
+        self.host_limits = dict(DEFAULT_HOST_LIMITS if host_limits is None else host_limits)
+        self.endpoint_limits = dict(DEFAULT_ENDPOINT_LIMITS if endpoint_limits is None else endpoint_limits)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._host_buckets = {}
+        self._endpoint_buckets = {}
+        self._blocked_until = {} # host -> time.monotonic() di fine pausa
+        self._counters = {} # endpoint -> contatori
+
+    def _bucket(self, buckets, key, rate, capacity):
+        with self._lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = TokenBucket(rate, capacity)
+            return bucket
+
+    def _count(self, endpoint, name, amount=1):
+        with self._lock:
+            counters = self._counters.setdefault(endpoint, {
+                'calls': 0, 'throttled': 0, 'retried': 0, 'failed': 0, 'wait_s': 0.0})
+            counters[name] += amount
+
+    def set_limit(self, endpoint, rate, capacity, host=None):
+        """
+        Cambia il budget di un endpoint (e, se serve, alza quello del suo host
+        perché non diventi il tetto). Le richieste successive usano i nuovi valori.
+        """
+        with self._lock:
+            host = host or (self.endpoint_limits.get(endpoint) or (endpoint,))[0]
+            self.endpoint_limits[endpoint] = (host, float(rate), capacity)
+            self._endpoint_buckets.pop(endpoint, None)
+            host_rate, host_capacity = self.host_limits.get(host, DEFAULT_HOST_LIMIT)
+            if host_rate < rate or host_capacity < capacity:
+                self.host_limits[host] = (max(host_rate, float(rate)), max(host_capacity, capacity))
+                self._host_buckets.pop(host, None)
+
+    def host_for(self, endpoint, url=None):
+        """Host di riferimento: quello dell'URL se noto, altrimenti quello dell'endpoint."""
+        if url:
+            host = urlparse(url).netloc
+            if host:
+                return host
+        limits = self.endpoint_limits.get(endpoint)
+        return limits[0] if limits else endpoint
+
+    def acquire(self, endpoint, host=None, cost=1):
+        """Attende il permesso di fare `cost` richieste verso endpoint/host."""
+        host = host or self.host_for(endpoint)
+        waited = 0.0
+
+        with self._lock:
+            blocked_until = self._blocked_until.get(host, 0.0)
+        pause = blocked_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+            waited += pause
+
+        rate, capacity = self.host_limits.get(host, DEFAULT_HOST_LIMIT)
+        waited += self._bucket(self._host_buckets, host, rate, capacity).acquire(cost)
+        limits = self.endpoint_limits.get(endpoint)
+        if limits:
+            _, rate, capacity = limits
+            waited += self._bucket(self._endpoint_buckets, endpoint, rate, capacity).acquire(cost)
+        if waited:
+            self._count(endpoint, 'wait_s', waited)
+        return waited
+
+    def backoff_delay(self, attempt):
+        """Backoff esponenziale con jitter: metà fissa, metà casuale."""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _pause_host(self, host, delay):
+        with self._lock:
+            until = time.monotonic() + delay
+            self._blocked_until[host] = max(self._blocked_until.get(host, 0.0), until)
+
+    def call(self, endpoint, func, *args, host=None, cost=1, **kwargs):
+        """
+        Esegue func(*args, **kwargs) rispettando i limiti. Ritenta su 429
+        (eccezione o risposta HTTP) con Retry-After o backoff esponenziale.
+        """
+        host = host or self.host_for(endpoint)
+        for attempt in range(self.max_retries + 1):
+            self.acquire(endpoint, host, cost)
+            self._count(endpoint, 'calls')
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if not is_throttle_error(e):
+                    self._count(endpoint, 'failed')
+                    raise
+                error = e
+                result = None
+                retry_after = _retry_after_from(e)
+            else:
+                if getattr(result, 'status_code', None) not in THROTTLE_STATUS:
+                    return result
+                error = None
+                retry_after = _retry_after_from(result)
+
+            self._count(endpoint, 'throttled')
+            if attempt >= self.max_retries:
+                self._count(endpoint, 'failed')
+                if error is not None:
+                    raise error
+                return result # L'ultima risposta 429 viene restituita al chiamante
+
+            delay = min(self.max_delay, retry_after) if retry_after is not None else self.backoff_delay(attempt)
+            print(f"[RateLimit] {endpoint} limitato da {host}: nuovo tentativo tra {delay:.1f}s "
+                  f"({attempt + 1}/{self.max_retries}).")
+            self._pause_host(host, delay)
+            self._count(endpoint, 'retried')
+
+    def stats(self):
+        """Restituisce i contatori per endpoint (chiamate, limitate, ritentate, attese)."""
+        with self._lock:
+            return {endpoint: dict(counters) for endpoint, counters in self._counters.items()}
+
+
+# Istanza condivisa da graph.py, news.py e model.py
+default_limiter = RateLimiter()
+
+
+def limited_call(endpoint, func, *args, **kwargs):
+    """Scorciatoia: esegue func tramite il rate limiter condiviso."""
+    return default_limiter.call(endpoint, func, *args, **kwargs)
+
+
+# --- ESECUZIONE (per testare questo file) ---
+if __name__ == "__main__":
+    class FakeResponse:
+        def __init__(self, status_code, headers=None):
+            self.status_code = status_code
+            self.headers = headers or {}
+
+    class FakeThrottle(Exception):
+        pass
+
+    try:
+        RateLimiter(max_retries=1, base_delay=0.05).call('news', lambda: (_ for _ in ()).throw(FakeThrottle("429 Too Many Requests")))
+    except FakeThrottle:
+        print("Eccezione 429 propagata dopo i tentativi.")
+
+    responses = [FakeResponse(429, {'Retry-After': '0.2'}), FakeResponse(429), FakeResponse(200)]
+    limiter = RateLimiter(base_delay=0.1)
+    start = time.monotonic()
+    result = limiter.call('search', lambda: responses.pop(0))
+    print(f"Risposta finale {result.status_code} dopo {time.monotonic() - start:.2f}s")
+
+    start = time.monotonic()
+    for _ in range(10):
+        limiter.acquire('article')
+    print(f"10 richieste 'article' in {time.monotonic() - start:.2f}s")
+
+    # Costo oltre la capacità (download di molti ticker): pagato a fette, niente sconto
+    bucket = TokenBucket(rate=20.0, capacity=4)
+    start = time.monotonic()
+    bucket.acquire(24)
+    print(f"Costo 24 su capacità 4 a 20/s: {time.monotonic() - start:.2f}s (atteso ~1.0s)")
+    assert not is_throttle_error(ValueError("No data found for symbol XYZ4290"))
+    assert is_throttle_error(ValueError("Too Many Requests. Rate limited. Try after a while."))
+    print(f"Statistiche: {limiter.stats()}")
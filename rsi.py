@@ -1,4 +1,4 @@
-import pandas as pd
+import numpy as np
 import mplfinance as mpf
 
 def calculate_rsi(data, period=14):
@@ -13,46 +13,72 @@ def calculate_rsi(data, period=14):
     rsi = 100 - (100 / (1 + rs))
     return rsi
 
-def get_rsi_plot(data, ax_indicator):
+def calculate_rsi_values(close, period=14):
     """
-    Calcola l'RSI e prepara i dizionari addplot per mplfinance
-    usando la modalità Assi Esterni.
-    
+    Calcola l'RSI direttamente su un array NumPy di chiusure (stesso risultato
+    di calculate_rsi, senza passare da un DataFrame). Restituisce un array
+    float64 con NaN per le prime barre.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    rsi = np.full(len(close), np.nan)
+    if len(close) < period:
+        return rsi
+
+    delta = np.diff(close, prepend=np.nan)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+
+    # Media mobile semplice tramite somme cumulative
+    gain_sum = np.cumsum(gain)
+    loss_sum = np.cumsum(loss)
+    gain_sum[period:] = gain_sum[period:] - gain_sum[:-period]
+    loss_sum[period:] = loss_sum[period:] - loss_sum[:-period]
+    avg_gain = gain_sum[period - 1:] / period
+    avg_loss = loss_sum[period - 1:] / period
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        rsi[period - 1:] = 100 - (100 / (1 + rs))
+    return rsi
+
+def get_rsi_plot(rsi_values, ax_indicator):
+    """
+    Prepara i dizionari addplot per mplfinance usando la modalità Assi Esterni.
+
     Args:
-        data (pd.DataFrame): Il dataframe OHLCV (verrà modificato).
+        rsi_values (np.ndarray): I valori RSI (vedi calculate_rsi_values),
+                                 lunghi quanto le barre del grafico.
         ax_indicator (matplotlib.axis.Axes): L'asse su cui disegnare l'RSI.
 
     Returns:
         list: Una lista di dizionari 'addplot'.
     """
-    
-    # Calcola l'RSI e aggiungilo al dataframe (questo lo modifica)
-    data['RSI'] = calculate_rsi(data)
-    
+    n = len(rsi_values)
+
     # Prepara i plot
     rsi_plots = [
         # La linea RSI principale
-        mpf.make_addplot(data['RSI'], 
+        mpf.make_addplot(rsi_values,
                          ax=ax_indicator, # <-- MODIFICATO: da panel= a ax=
-                         color='cyan', 
-                         ylabel=f'RSI(14)', 
+                         color='cyan',
+                         ylabel=f'RSI(14)',
                          secondary_y=False),
-        
+
         # Linea ipercomprato (70)
-        mpf.make_addplot(pd.Series(70, index=data.index), 
+        mpf.make_addplot(np.full(n, 70.0),
                          ax=ax_indicator, # <-- MODIFICATO
                          color='#e05757', # Rosso
-                         linestyle='--', 
-                         alpha=0.7, 
+                         linestyle='--',
+                         alpha=0.7,
                          secondary_y=False),
-        
+
         # Linea ipervenduto (30)
-        mpf.make_addplot(pd.Series(30, index=data.index), 
+        mpf.make_addplot(np.full(n, 30.0),
                          ax=ax_indicator, # <-- MODIFICATO
                          color='#57e057', # Verde
-                         linestyle='--', 
-                         alpha=0.7, 
+                         linestyle='--',
+                         alpha=0.7,
                          secondary_y=False)
     ]
-    
-    return rsi_plots
\ No newline at end of file
+
+    return rsi_plots
@@ -0,0 +1,110 @@
+import re
+import threading
+
+from data_cache import DataCache
+
+# --- CACHE DELLE RISPOSTE DI RICERCA ---
+# Risposte di /v1/finance/search per query normalizzata, con TTL. Per una
+# query più lunga si riusano i risultati di un suo prefisso già in cache
+# (es. "AAP" -> "AAPL") filtrandoli in locale; se quella risposta non era
+# troncata, la richiesta di rete non serve.
+
+SEARCH_TTL = 10 * 60 # Secondi
+SEARCH_CACHE_BYTES = 4 * 1024 * 1024
+SEARCH_QUOTES_COUNT = 10 # quotesCount chiesto a Yahoo: una risposta più corta è completa
+
+_SPACES_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_query(query):
+    """Minuscolo, spazi compattati: 'AAPL ' e 'aapl' sono la stessa ricerca."""
+    return _SPACES_RE.sub(" ", query.strip().lower())
+
+
+def quote_matches(quote, query):
+    """True se ogni parola della query è prefisso del simbolo o di una parola del nome."""
+    symbol = (quote.get('symbol') or '').lower()
+    name = f"{quote.get('longname') or ''} {quote.get('shortname') or ''}".lower()
+    words = _WORD_RE.findall(name)
+    if symbol.startswith(query):
+        return True
+    return all(symbol.startswith(term) or any(word.startswith(term) for word in words)
+               for term in _WORD_RE.findall(query))
+
+
+class SearchCache:
+    """Cache TTL delle risposte di ricerca, con riuso dei risultati di un prefisso."""
+    def __init__(self, ttl=SEARCH_TTL, max_bytes=SEARCH_CACHE_BYTES):
+        self.ttl = ttl
+        self._cache = DataCache(max_bytes=max_bytes, name="SearchCache")
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.prefix_hits = 0
+        self.misses = 0
+
+    def put(self, query, results, truncated):
+        """Salva una risposta. truncated=True se Yahoo ha restituito il numero massimo di risultati."""
+        key = normalize_query(query)
+        if key:
+            self._cache.put(('search', key), {'results': list(results), 'truncated': bool(truncated)},
+                            ttl=self.ttl)
+
+    def lookup(self, query):
+        """
+        Restituisce (risultati, completi):
+        - risposta esatta in cache: (risultati, True), ma ([], False) se era
+          vuota: la rete può aver fallito, va ritentata;
+        - prefisso in cache: (risultati filtrati, True se la risposta del prefisso
+          non era troncata e il filtro ha trovato qualcosa);
+        - niente: (None, False).
+        """
+        key = normalize_query(query)
+        if not key:
+            return None, False
+        entry = self._cache.get(('search', key))
+        if entry is not None:
+            self._count('exact_hits')
+            return entry['results'], bool(entry['results'])
+
+        for length in range(len(key) - 1, 0, -1):
+            entry = self._cache.get(('search', key[:length].rstrip()))
+            if entry is None:
+                continue
+            # Si usa solo il prefisso più lungo in cache
+            results = [quote for quote in entry['results'] if quote_matches(quote, key)]
+            if results:
+                self._count('prefix_hits')
+                return results, not entry['truncated']
+            break
+        self._count('misses')
+        return None, False
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self):
+        with self._lock:
+            total = self.exact_hits + self.prefix_hits + self.misses
+            return {
+                'exact_hits': self.exact_hits,
+                'prefix_hits': self.prefix_hits,
+                'misses': self.misses,
+                'network_saved': ((self.exact_hits + self.prefix_hits) / total) if total else 0.0,
+                'entries': len(self._cache),
+            }
+
+
+# --- ESECUZIONE (per testare questo file) ---
+if __name__ == "__main__":
+    cache = SearchCache()
+    cache.put("AAP", [{'symbol': 'AAPL', 'longname': 'Apple Inc.'},
+                      {'symbol': 'AAP', 'longname': 'Advance Auto Parts, Inc.'}], truncated=False)
+    print(cache.lookup("aap "))   # Esatta (query normalizzata)
+    print(cache.lookup("AAPL"))   # Filtrata dal prefisso, completa: niente rete
+    print(cache.lookup("AAPX"))   # Nessun risultato dal prefisso: serve la rete
+    print(cache.lookup("MSFT"))
+    cache.put("ZZZZ", [], truncated=False)
+    print(cache.lookup("zzzz"))   # Risposta vuota in cache: non completa, si ritenta la rete
+    print(cache.stats())
@@ -127,7 +127,7 @@ class NewsCard(QFrame):
         title = news_item.get('title', 'Nessun Titolo')
         publisher = news_item.get('publisher', 'Sconosciuto')
         timestamp = news_item.get('timestamp')
-        ticker = news_item.get('ticker', '')
+        tickers = news_item.get('tickers') or [news_item.get('ticker', '')]
 
         layout = QVBoxLayout(self)
         layout.setSpacing(8)
@@ -137,11 +137,13 @@ class NewsCard(QFrame):
         title_label.setWordWrap(True)
         layout.addWidget(title_label)
         
-        time_str = timestamp.strftime('%H:%M') if timestamp else ''
-        info_str = f"{publisher} ({ticker}) - {time_str}"
-        info_label = QLabel(info_str)
-        info_label.setObjectName("NewsInfo")
-        layout.addWidget(info_label)
+        self.publisher = publisher
+        self.time_str = timestamp.strftime('%H:%M') if timestamp else ''
+        self.info_label = QLabel()
+        self.info_label.setObjectName("NewsInfo")
+        self.info_label.setWordWrap(True)
+        self.set_tickers(tickers)
+        layout.addWidget(self.info_label)
 
         text_content = news_item.get('text', '')
         if text_content:
@@ -183,6 +185,10 @@ class NewsCard(QFrame):
 
         self.setStyleSheet(STYLESHEET)
     
+    def set_tickers(self, tickers):
+        """Mostra tutti i ticker dell'articolo nella riga informativa."""
+        self.info_label.setText(f"{self.publisher} ({', '.join(tickers)}) - {self.time_str}")
+
     def mousePressEvent(self, event):
         """Apre il link della notizia nel browser."""
         if self.link:
@@ -193,6 +199,8 @@ class NewsSidebar(QFrame):
     """
     Una sidebar generica che può essere fissa (Sticky) o a comparsa (Flyout).
     """
+    filter_changed = pyqtSignal(str) # Testo del filtro (dopo una breve pausa di digitazione)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setFrameShape(QFrame.Shape.StyledPanel)
@@ -210,6 +218,19 @@ class NewsSidebar(QFrame):
         header_layout.addWidget(title_label)
         header_layout.addStretch()
         main_layout.addLayout(header_layout)
+
+        # Filtro sull'archivio notizie (visibile solo se l'archivio è disponibile)
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filtra: parole, $TICKER, last:7d")
+        self.filter_input.setClearButtonEnabled(True)
+        self.filter_input.hide()
+        main_layout.addWidget(self.filter_input)
+
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(300)
+        self.filter_timer.timeout.connect(lambda: self.filter_changed.emit(self.filter_text()))
+        self.filter_input.textChanged.connect(self.filter_timer.start)
         
         self.scroll_area = QScrollArea()
         self.scroll_area.setWidgetResizable(True)
@@ -227,8 +248,36 @@ class NewsSidebar(QFrame):
         
         self.setStyleSheet(STYLESHEET)
 
+    def enable_filter(self):
+        """Mostra la casella di filtro (serve l'archivio delle notizie)."""
+        self.filter_input.show()
+
+    def filter_text(self):
+        return self.filter_input.text().strip()
+
+    def set_cards(self, news_items):
+        """Sostituisce il contenuto del feed (notizie dalla più recente)."""
+        while self.card_container.count():
+            item = self.card_container.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+        for news_item in reversed(news_items):
+            self._insert_card(news_item)
+
+    def update_tickers(self, link, tickers):
+        """Aggiorna i ticker della card con questo link (se è nel feed)."""
+        for i in range(self.card_container.count()):
+            card = self.card_container.itemAt(i).widget()
+            if isinstance(card, NewsCard) and card.link == link:
+                card.set_tickers(tickers)
+
     def add_card(self, news_item):
-        """Aggiunge una nuova card in cima al feed."""
+        """Aggiunge una nuova card in cima al feed (non durante un filtro: è già in archivio)."""
+        if self.filter_text():
+            return None
+        return self._insert_card(news_item)
+
+    def _insert_card(self, news_item):
         card = NewsCard(news_item)
         self.card_container.insertWidget(0, card)
         
@@ -0,0 +1,41 @@
+import os
+import sqlite3
+import contextlib
+import threading
+
+# --- BASE COMUNE DEGLI ARCHIVI SQLITE ---
+# bar_store.py, news_store.py e article_cache.py aprono il database allo
+# stesso modo: cartella creata se manca, WAL, una connessione per operazione
+# (commit all'uscita, chiusura sempre) e un lock per serializzare le scritture.
+
+CONNECT_TIMEOUT = 10 # Secondi di attesa se un altro processo tiene il database bloccato
+
+
+class SQLiteStore:
+    """
+    Archivio su un file SQLite in modalità WAL.
+    Thread-safe: ogni operazione apre una propria connessione (_connect),
+    le scritture che leggono e poi modificano vanno fatte sotto _lock.
+    """
+    def __init__(self, db_path, schema):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(schema)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Apre una connessione, fa commit all'uscita e la chiude sempre."""
+        conn = sqlite3.connect(self.db_path, timeout=CONNECT_TIMEOUT)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
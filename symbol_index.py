@@ -0,0 +1,187 @@
+import bisect
+import difflib
+import json
+import os
+import re
+import sys
+
+# --- INDICE LOCALE DEI SIMBOLI ---
+# Ricerca istantanea (anche offline) per prefisso sul simbolo e sulle parole
+# del nome, con un fallback fuzzy sui nomi. Parte da un elenco incluso nel
+# progetto (symbols.json) e cresce con ogni risposta della ricerca Yahoo.
+
+# L'elenco incluso sta accanto a questo file, o nella cartella estratta da PyInstaller
+# (sys._MEIPASS, vedi graph.spec): non dipende dalla cartella di lavoro
+SEED_FILE = os.path.join(getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__))), 'symbols.json')
+DEFAULT_INDEX_PATH = os.path.join('cache', 'symbol_index.json')
+SEARCH_TYPES = ('EQUITY', 'ETF', 'CRYPTOCURRENCY', 'FUTURE') # Come SearchWorker
+RECORD_FIELDS = ('symbol', 'shortname', 'longname', 'quoteType', 'exchange')
+FUZZY_CUTOFF = 0.75
+BULK_INSERT = 256
+
+_WORD_RE = re.compile(r"[A-Z0-9]+")
+_MAX_CHAR = "\uffff" # Limite superiore per le ricerche di prefisso
+
+
+def _words(text):
+    return _WORD_RE.findall(text.upper()) if text else []
+
+
+class SymbolIndex:
+    """
+    Indice a array ordinati (bisect): uno sui simboli e uno sulle coppie
+    (parola del nome, simbolo). search() restituisce record nello stesso
+    formato dei 'quotes' di Yahoo.
+    """
+    def __init__(self, path=DEFAULT_INDEX_PATH, seed_file=SEED_FILE):
+        self.path = path
+        self._records = {} # symbol -> record
+        self._symbols = [] # Simboli in maiuscolo, ordinati
+        self._upper = {} # simbolo in maiuscolo -> simbolo originale
+        self._words = [] # (parola, simbolo), ordinati
+        self._dirty = False # Record nuovi da salvare
+        for source in (seed_file, path):
+            if source and os.path.exists(source):
+                try:
+                    with open(source, 'r') as f:
+                        self.add(json.load(f), persist=False)
+                except Exception as e:
+                    print(f"[SymbolIndex] Impossibile leggere {source}: {e}")
+
+    def __len__(self):
+        return len(self._records)
+
+    def add(self, quotes, persist=True):
+        """Aggiunge (o aggiorna) i record da una lista di 'quotes' Yahoo. Restituisce quanti sono nuovi."""
+        added = 0
+        new_symbols, new_words = [], []
+        for quote in quotes or []:
+            symbol = quote.get('symbol')
+            if not symbol or quote.get('quoteType') not in SEARCH_TYPES:
+                continue
+            record = {field: quote.get(field) for field in RECORD_FIELDS if quote.get(field)}
+            previous = self._records.get(symbol)
+            if previous == record:
+                continue
+            if previous is not None:
+                self._remove_words(symbol, previous)
+            else:
+                new_symbols.append(symbol.upper())
+                self._upper[symbol.upper()] = symbol
+                added += 1
+            self._records[symbol] = record
+            new_words.extend((word, symbol) for word in
+                             set(_words(record.get('longname')) + _words(record.get('shortname'))))
+            if persist:
+                self._dirty = True
+        self._insert_sorted(self._symbols, new_symbols)
+        self._insert_sorted(self._words, new_words)
+        return added
+
+    @staticmethod
+    def _insert_sorted(items, new_items):
+        """Pochi elementi (una risposta di ricerca): insort; lotti grandi (seed, file): un solo sort."""
+        if len(new_items) > BULK_INSERT:
+            items.extend(new_items)
+            items.sort()
+        else:
+            for item in new_items:
+                bisect.insort(items, item)
+
+    def _remove_words(self, symbol, record):
+        for word in set(_words(record.get('longname')) + _words(record.get('shortname'))):
+            i = bisect.bisect_left(self._words, (word, symbol))
+            if i < len(self._words) and self._words[i] == (word, symbol):
+                del self._words[i]
+
+    @staticmethod
+    def _prefix_range(items, prefix):
+        """Indici [lo, hi) delle stringhe ordinate che iniziano con prefix."""
+        return bisect.bisect_left(items, prefix), bisect.bisect_left(items, prefix + _MAX_CHAR)
+
+    def search(self, query, limit=10):
+        """Simboli per prefisso, poi nomi per prefisso di parola, poi nomi simili (fuzzy)."""
+        query = query.strip().upper()
+        if not query:
+            return []
+        found = {}
+
+        # 1. Prefisso del simbolo (i più corti, cioè i più vicini alla query, per primi)
+        lo, hi = self._prefix_range(self._symbols, query)
+        for symbol in sorted(self._symbols[lo:hi], key=len)[:limit]:
+            record = self._records[self._upper[symbol]]
+            found[record['symbol']] = record
+
+        # 2. Prefisso di una parola del nome (tutte le parole della query)
+        terms = _words(query)
+        if len(found) < limit and terms:
+            candidates, exact = None, set()
+            for term in terms:
+                lo = bisect.bisect_left(self._words, (term, ""))
+                hi = bisect.bisect_left(self._words, (term + _MAX_CHAR, ""))
+                symbols = {symbol for _, symbol in self._words[lo:hi]}
+                exact.update(symbol for word, symbol in self._words[lo:hi] if word == term)
+                candidates = symbols if candidates is None else candidates & symbols
+            # Prima chi contiene la parola intera ("GOLD" -> Gold prima di Goldman)
+            for symbol in sorted(candidates or (), key=lambda s: (s not in exact, len(s))):
+                if len(found) >= limit:
+                    break
+                found.setdefault(symbol, self._records[symbol])
+
+        # 3. Fuzzy sulle parole del nome con la stessa iniziale (es. errori di battitura)
+        if len(found) < limit and len(terms) == 1 and len(terms[0]) >= 4:
+            term = terms[0]
+            lo = bisect.bisect_left(self._words, (term[0], ""))
+            hi = bisect.bisect_left(self._words, (term[0] + _MAX_CHAR, ""))
+            words = {word for word, _ in self._words[lo:hi]}
+            for word in difflib.get_close_matches(term, words, n=limit, cutoff=FUZZY_CUTOFF):
+                i = bisect.bisect_left(self._words, (word, ""))
+                while i < len(self._words) and self._words[i][0] == word and len(found) < limit:
+                    symbol = self._words[i][1]
+                    found.setdefault(symbol, self._records[symbol])
+                    i += 1
+
+        return list(found.values())[:limit]
+
+    def save(self):
+        """Salva l'indice (seed + simboli imparati) se è cambiato."""
+        if not self._dirty or not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(list(self._records.values()), f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except Exception as e:
+            print(f"[SymbolIndex] Impossibile salvare l'indice: {e}")
+
+
+# --- ESECUZIONE (per testare questo file) ---
+if __name__ == "__main__":
+    import random
+    import string
+    import time
+
+    index = SymbolIndex(path=None)
+    print(f"Seed: {len(index)} simboli")
+    for query in ("NVD", "appl", "gold", "micr", "nvidai", "crude oil"):
+        start = time.perf_counter()
+        results = index.search(query)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{query!r:<12} {elapsed:6.2f} ms  {[r['symbol'] for r in results]}")
+
+    # Indice grande sintetico (50k simboli) per verificare i tempi
+    rng = random.Random(0)
+    words = ["".join(rng.choices(string.ascii_uppercase, k=rng.randint(4, 9))) for _ in range(5000)]
+    quotes = [{'symbol': "".join(rng.choices(string.ascii_uppercase, k=rng.randint(1, 5))) + str(i),
+               'longname': " ".join(rng.sample(words, 3)) + " Inc.", 'quoteType': 'EQUITY'}
+              for i in range(50_000)]
+    start = time.perf_counter()
+    index.add(quotes, persist=False)
+    print(f"50k simboli indicizzati in {time.perf_counter() - start:.2f}s")
+    for query in ("NVD", "AB", words[0][:3], words[1] + "X"):
+        start = time.perf_counter()
+        results = index.search(query)
+        print(f"{query!r:<12} {(time.perf_counter() - start) * 1000:6.2f} ms  {len(results)} risultati")
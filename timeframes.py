@@ -0,0 +1,114 @@
+import pandas as pd
+
+try:
+    import bar_store
+except ImportError:
+    bar_store = None
+
+# --- PIRAMIDE DEI TIMEFRAME ---
+# Invece di una richiesta Yahoo per ogni pulsante, si scarica una sola serie
+# "base" per simbolo e si derivano le viste in locale (slice + resample).
+
+BASE_SERIES = {
+    'daily': {'period': '5y', 'interval': '1d'},
+    'intraday': {'period': '5d', 'interval': '2m'},
+}
+
+# Timeframe UI -> serie base, periodo da mostrare e (opzionale) regola di resample
+TIMEFRAME_VIEWS = {
+    '1d': {'base': 'intraday', 'period': '1d', 'resample': None},
+    '5d': {'base': 'intraday', 'period': '5d', 'resample': '15min'},
+    '1m': {'base': 'daily', 'period': '1mo', 'resample': None},
+    '3m': {'base': 'daily', 'period': '3mo', 'resample': None},
+    '6m': {'base': 'daily', 'period': '6mo', 'resample': None},
+    '1y': {'base': 'daily', 'period': '1y', 'resample': None},
+    '5y': {'base': 'daily', 'period': '5y', 'resample': 'W-MON'}, # Settimane da lunedì, come Yahoo
+}
+
+OHLCV_AGG = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum',
+}
+
+
+def get_base_params(timeframe):
+    """Restituisce i parametri Yahoo della serie base per un timeframe UI (o None)."""
+    view = TIMEFRAME_VIEWS.get(timeframe)
+    if not view:
+        return None
+    return BASE_SERIES[view['base']]
+
+
+def series_cache_key(ticker, interval):
+    """Chiave di una serie base nella cache in memoria."""
+    return (ticker, '@base', interval)
+
+
+def base_cache_key(ticker, timeframe):
+    """Chiave della serie base nella cache in memoria, condivisa da tutte le viste derivate."""
+    params = get_base_params(timeframe)
+    if not params:
+        return None
+    return series_cache_key(ticker, params['interval'])
+
+
+def resample_ohlcv(data, rule):
+    """
+    Aggrega le barre OHLCV a un intervallo più lungo (es. '15min', 'W-MON').
+    Le barre sono etichettate con l'inizio dell'intervallo; i bin vuoti
+    (notte, weekend) vengono scartati.
+    """
+    agg = {col: how for col, how in OHLCV_AGG.items() if col in data.columns}
+    resampled = data.resample(rule, label='left', closed='left').agg(agg)
+    return resampled.dropna(subset=['Open', 'Close'])
+
+
+def derive_view(base_data, timeframe):
+    """Deriva la vista di un timeframe UI dalla sua serie base (nessuna richiesta di rete)."""
+    view = TIMEFRAME_VIEWS.get(timeframe)
+    if not view or base_data is None or base_data.empty:
+        return None
+
+    data = base_data
+    if bar_store:
+        data = bar_store.slice_period(data, view['period'])
+    if view['resample']:
+        data = resample_ohlcv(data, view['resample'])
+    return data
+
+
+# --- ESECUZIONE (per testare questo file) ---
+if __name__ == "__main__":
+    import numpy as np
+
+    index = pd.date_range('2020-01-01', '2024-12-31', freq='B', tz='America/New_York')
+    close = 100 + np.random.randn(len(index)).cumsum()
+    daily = pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1,
+                          'Close': close, 'Volume': 1000.0}, index=index)
+    for tf in ['1m', '3m', '6m', '1y', '5y']:
+        view = derive_view(daily, tf)
+        print(f"{tf}: {len(view)} barre, dal {view.index[0].date()} al {view.index[-1].date()}")
+
+    intraday_index = pd.date_range('2024-12-23 14:30', periods=195, freq='2min')
+    intraday_index = intraday_index.append([intraday_index + pd.Timedelta(days=d) for d in range(1, 5)])
+    intraday = pd.DataFrame({'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5,
+                             'Volume': 10.0}, index=intraday_index)
+    for tf in ['1d', '5d']:
+        print(f"{tf}: {len(derive_view(intraday, tf))} barre")
+
+    # Futures (GC=F): sedute Globex dalle 23:00 alle 22:00 UTC del giorno dopo, barre in UTC naive.
+    # Alle 00:10 UTC la vista '1d' deve partire dalle 23:00, non dalla mezzanotte.
+    sessions = [pd.date_range(f'2024-12-{day} 23:00', f'2024-12-{day + 1} 21:58', freq='2min')
+                for day in (14, 15, 16, 17, 18)]
+    futures_index = sessions[0].append(sessions[1:]).append(pd.date_range('2024-12-19 23:00', '2024-12-20 00:10',
+                                                                          freq='2min'))
+    futures = pd.DataFrame({'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5, 'Volume': 10.0},
+                           index=futures_index)
+    view = derive_view(futures, '1d')
+    print(f"Futures 1d: {len(view)} barre dalle {view.index[0]}")
+    assert view.index[0] == pd.Timestamp('2024-12-19 23:00')
+    view = derive_view(futures, '5d')
+    assert view.index[0] == pd.Timestamp('2024-12-15 23:00')
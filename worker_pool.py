@@ -0,0 +1,165 @@
+from collections import deque
+from PyQt6.QtCore import QObject, pyqtSlot
+
+# --- POOL DI WORKER CON CORSIE DI PRIORITÀ ---
+# Tutti i QThread "usa e getta" (grafico, ricerca, prefetch, analisi AI) passano
+# da qui: il pool limita i thread attivi, avvia prima le corsie più importanti
+# e ripulisce automaticamente i worker terminati.
+
+LANE_INTERACTIVE = 'interactive' # Grafico che l'utente sta guardando
+LANE_SEARCH = 'search'
+LANE_PREFETCH = 'prefetch'
+LANE_ANALYSIS = 'analysis'
+
+# corsia -> (priorità, massimo worker concorrenti); priorità più bassa = più importante
+# I worker di analisi passano quasi tutto il tempo in attesa del servizio di inferenza
+# (inference_service.py): 4 in parallelo riempiono un lotto.
+# I posti della corsia più importante (il grafico) sono riservati: le altre corsie
+# non li occupano mai, quindi un click sul grafico parte subito anche durante un
+# burst di analisi. Le altre si dividono i 6 posti restanti (a ogni posto che si
+# libera parte la corsia più importante in attesa): l'analisi al massimo ne
+# occupa 4, quindi per ricerca e prefetch ne restano sempre almeno 2.
+DEFAULT_LANES = {
+    LANE_INTERACTIVE: (0, 2),
+    LANE_SEARCH: (1, 2),
+    LANE_PREFETCH: (2, 1),
+    LANE_ANALYSIS: (3, 4),
+}
+DEFAULT_MAX_THREADS = 8
+
+
+class WorkerPool(QObject):
+    """
+    Esecutore centrale per i QThread delle richieste. Ogni worker viene
+    accodato in una corsia; appena c'è posto (limite globale e di corsia)
+    parte il primo worker della corsia a priorità più alta. I posti liberi
+    della corsia più importante restano riservati a lei.
+    """
+    def __init__(self, max_threads=DEFAULT_MAX_THREADS, lanes=None, parent=None):
+        super().__init__(parent)
+        self.max_threads = max_threads
+        self.lanes = dict(lanes or DEFAULT_LANES)
+        self._lane_order = sorted(self.lanes, key=lambda lane: self.lanes[lane][0])
+        self._pending = {lane: deque() for lane in self.lanes}
+        self._running = {lane: set() for lane in self.lanes}
+        self._lane_of = {} # worker -> corsia
+        self._callbacks = {} # worker -> on_done(worker)
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.peak_running = 0
+
+    def submit(self, worker, lane, on_done=None):
+        """
+        Accoda un QThread (non ancora avviato) nella corsia indicata.
+        on_done(worker) viene chiamato quando il worker termina o viene scartato.
+        """
+        if lane not in self.lanes:
+            raise ValueError(f"Corsia sconosciuta: {lane}")
+        self._lane_of[worker] = lane
+        self._callbacks[worker] = on_done
+        worker.finished.connect(self._on_worker_finished)
+        self._pending[lane].append(worker)
+        self.submitted += 1
+        self._dispatch()
+        return worker
+
+    def cancel(self, worker):
+        """
+        Annulla un worker: se è in coda viene scartato subito, se è in
+        esecuzione riceve una richiesta di interruzione cooperativa.
+        """
+        lane = self._lane_of.get(worker)
+        if lane is None:
+            return
+        if worker in self._pending[lane]:
+            self._pending[lane].remove(worker)
+            self._finalize(worker, lane)
+            self.dropped += 1
+        elif worker in self._running[lane]:
+            worker.requestInterruption()
+
+    def is_active(self, worker):
+        """True se il worker è in coda o in esecuzione."""
+        return worker in self._lane_of
+
+    def running_count(self, lane=None):
+        if lane:
+            return len(self._running[lane])
+        return sum(len(workers) for workers in self._running.values())
+
+    def pending_count(self, lane=None):
+        if lane:
+            return len(self._pending[lane])
+        return sum(len(queue) for queue in self._pending.values())
+
+    def _dispatch(self):
+        """Avvia i worker in coda finché ci sono posti liberi."""
+        while self.running_count() < self.max_threads:
+            worker, lane = self._next_pending()
+            if worker is None:
+                break
+            self._running[lane].add(worker)
+            worker.start()
+        self.peak_running = max(self.peak_running, self.running_count())
+
+    def _reserved_slots(self):
+        """Posti ancora liberi della corsia più importante: le altre non possono usarli."""
+        top_lane = self._lane_order[0]
+        free = max(0, self.lanes[top_lane][1] - len(self._running[top_lane]))
+        return min(free, self.max_threads - 1) # Almeno un posto per le altre corsie
+
+    def _next_pending(self):
+        shared_free = self.max_threads - self.running_count() - self._reserved_slots()
+        for position, lane in enumerate(self._lane_order):
+            max_concurrency = self.lanes[lane][1]
+            if not self._pending[lane] or len(self._running[lane]) >= max_concurrency:
+                continue
+            if position and shared_free <= 0:
+                break # Restano solo i posti riservati
+            return self._pending[lane].popleft(), lane
+        return None, None
+
+    @pyqtSlot()
+    def _on_worker_finished(self):
+        worker = self.sender()
+        lane = self._lane_of.get(worker)
+        if lane is None:
+            return
+        self._running[lane].discard(worker)
+        self.completed += 1
+        self._finalize(worker, lane)
+        self._dispatch()
+
+    def _finalize(self, worker, lane):
+        """Notifica il chiamante e libera il worker."""
+        self._lane_of.pop(worker, None)
+        on_done = self._callbacks.pop(worker, None)
+        if on_done:
+            try:
+                on_done(worker)
+            except Exception as e:
+                print(f"[WorkerPool] Errore nel callback di fine worker ({lane}): {e}")
+        worker.deleteLater()
+
+    def shutdown(self, wait_ms=5000):
+        """Scarta i worker in coda e interrompe quelli in esecuzione (alla chiusura)."""
+        for lane in self._lane_order:
+            while self._pending[lane]:
+                self._finalize(self._pending[lane].popleft(), lane)
+                self.dropped += 1
+        for lane in self._lane_order:
+            for worker in list(self._running[lane]):
+                worker.requestInterruption()
+                worker.wait(wait_ms)
+
+    def stats(self):
+        """Restituisce i contatori del pool."""
+        return {
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'dropped': self.dropped,
+            'peak_running': self.peak_running,
+            'running': {lane: len(self._running[lane]) for lane in self._lane_order},
+            'pending': {lane: len(self._pending[lane]) for lane in self._lane_order},
+        }